@@ -1,5 +1,7 @@
-from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
+
+from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
@@ -11,9 +13,93 @@ class Settings(BaseSettings):
     # Banco de Dados (OBRIGATÓRIO no .env)
     DATABASE_URL: str
 
+    # Modo assíncrono (AsyncSession + asyncpg) para as rotas async
+    DATABASE_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None  # padrão: DATABASE_URL com asyncpg
+
+    # Pool de conexões (por engine, por worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # segundos esperando uma conexão livre
+    DB_POOL_RECYCLE: int = 1800  # segundos (-1 desativa)
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None  # statement_timeout do Postgres
+
     # CORS - Permite requests da extensão
     ALLOWED_ORIGINS: list[str]
 
+    # Cache de usuários autenticados (evita um SELECT por request)
+    AUTH_CACHE_MAXSIZE: int = 1024
+    AUTH_CACHE_TTL_SECONDS: int = 60
+
+    # Cache das estatísticas do dashboard ("memory" ou "redis")
+    STATS_CACHE_BACKEND: str = "memory"
+    STATS_CACHE_MAXSIZE: int = 1024
+    STATS_CACHE_TTL_SECONDS: int = 60
+    REDIS_URL: Optional[str] = None
+
+    # DDI assumido para telefones digitados sem código do país
+    TELEFONE_DDI_PADRAO: str = "55"
+
+    # Índice de autocomplete de clientes em memória (por worker)
+    AUTOCOMPLETE_MAX_CHAVES: int = 2_000_000  # soma de todos os usuários
+    AUTOCOMPLETE_TTL_SECONDS: int = 300  # recarrega do banco após esse tempo
+
+    # Transcrição ao vivo: trechos guardados em memória e gravados em lote
+    TRANSCRICAO_LOTE_SEGMENTOS: int = 50
+    TRANSCRICAO_FLUSH_SECONDS: float = 5.0  # idade máxima de um trecho pendente
+
+    # Nível do zstd nas colunas de texto comprimidas (transcrições e chat)
+    COMPRESSAO_NIVEL: int = 3
+
+    # Gateway de IA: sugestões geradas no servidor ("gemini" ou "falso")
+    IA_PROVEDOR: str = "gemini"
+    IA_MODELO: str = "gemini-2.0-flash"
+    GEMINI_API_KEY: Optional[str] = None
+    IA_CONCORRENCIA: int = 4  # chamadas simultâneas ao provedor (por worker)
+    IA_FILA_MAX: int = 64  # prompts distintos pendentes antes de rejeitar (503)
+    IA_TIMEOUT_SECONDS: float = 30.0
+    IA_CACHE_BACKEND: str = "memory"  # "memory" ou "redis" (REDIS_URL)
+    IA_CACHE_MAXSIZE: int = 4096
+    IA_CACHE_TTL_SECONDS: int = 3600
+
+    # Índice das sugestões aceitas: contextos parecidos são respondidos com
+    # uma sugestão já aceita, sem chamar o provedor de IA
+    INDICE_SUGESTOES_ARQUIVO: Optional[str] = "indice_sugestoes.npy"  # None: só memória
+    INDICE_SUGESTOES_LIMIAR: float = 0.8  # similaridade de cosseno mínima
+    INDICE_SUGESTOES_APROXIMADO: bool = False  # compara só vetores de código próximo
+
+    # Histórico de chat: partições mensais por data_envio e retenção
+    HISTORICO_CHAT_RETENCAO_MESES: Optional[int] = None  # None: guarda tudo
+    HISTORICO_CHAT_MESES_FUTUROS: int = 3  # partições criadas com antecedência
+    HISTORICO_CHAT_MANUTENCAO_SECONDS: float = 3600.0
+    HISTORICO_CHAT_LIMPEZA_LOTE: int = 1000  # mensagens por transação ao limpar
+    HISTORICO_CHAT_LIMPEZA_PAUSA_SECONDS: float = 0.05
+    # Limpeza sem progresso por esse tempo é retomada por outro worker
+    HISTORICO_CHAT_LIMPEZA_ABANDONADA_SECONDS: float = 300
+    # Write-behind das mensagens: POST responde na hora e grava em lote
+    HISTORICO_CHAT_WRITE_BEHIND: bool = False
+    HISTORICO_CHAT_LOTE: int = 200  # mensagens por INSERT
+    HISTORICO_CHAT_FLUSH_SECONDS: float = 0.2  # idade máxima de uma pendente
+    HISTORICO_CHAT_BUFFER_MAX: int = 10_000  # pendentes antes de rejeitar (503)
+
+    # Contexto do chat (GET /historico-chat/contexto): tamanhos em cache
+    CONTEXTO_CHAT_CACHE_USUARIOS: int = 1024
+    CONTEXTO_CHAT_MAX_MENSAGENS: int = 2000  # mensagens recentes por usuário
+
+    # Eventos em tempo real (SSE em /eventos)
+    EVENTOS_BROKER: str = "memory"  # "memory" (um worker) ou "redis" (REDIS_URL)
+    EVENTOS_BUFFER: int = 100  # eventos pendentes por conexão
+    EVENTOS_HEARTBEAT_SECONDS: float = 15.0
+
+    # Hash de senhas (Argon2) - custo e pool de processos dedicado
+    ARGON2_ROUNDS: int = 4
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    HASH_POOL_WORKERS: int = 2  # 0 = executa no thread do request
+    HASH_QUEUE_MAX: int = 32
+    HASH_TIMEOUT_SECONDS: float = 10.0
+
     class Config:
         env_file = ".env"
         case_sensitive = True
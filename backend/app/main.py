@@ -1,12 +1,40 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
-from app.routers import auth, chamada, clientes, historico_chat, sugestoes, user, vendas
-from app.utils.database import Base, engine
+from app.routers import (
+    auth,
+    chamada,
+    clientes,
+    eventos,
+    historico_chat,
+    sugestoes,
+    user,
+    vendas,
+)
+from app.utils.autocomplete import autocomplete_clientes
+from app.utils.buffer_chat import buffer_mensagens
+from app.utils.dashboard_cache import dashboard_cache
+from app.utils.database import async_engine, engine
+from app.utils.eventos import eventos as barramento_eventos
+from app.utils.gateway_ia import gateway_ia
+from app.utils.hashing import hashing_service
+from app.utils.historico_chat import manter_periodicamente, retomar_limpezas
+from app.utils.indice_sugestoes import indice_sugestoes, preparar_indice
+from app.utils.migracoes import marcar_colunas_em_texto
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.pool import pool_status
+from app.utils.security import user_cache
+from app.utils.transcricao import descarregar_periodicamente, descarregar_tudo
+
+# O esquema (e as partições do histórico) é criado e atualizado por
+# scripts.migrar, uma vez por deploy
 
-# Criar as tabelas no banco de dados
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
 
 # Inicializar FastAPI
 app = FastAPI(
@@ -22,6 +50,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Incluir rotas
@@ -32,6 +61,42 @@ app.include_router(clientes.router)
 app.include_router(sugestoes.router)
 app.include_router(vendas.router)
 app.include_router(historico_chat.router)
+app.include_router(eventos.router)
+
+
+@app.on_event("startup")
+async def startup():
+    # Antes de atender: colunas comprimidas ainda em TEXT gravam o texto puro
+    pendentes = await run_in_threadpool(marcar_colunas_em_texto, engine)
+    if pendentes:
+        logger.warning(
+            "Colunas ainda em TEXT (%s): rode scripts.comprimir_textos e "
+            "reinicie os workers em seguida",
+            ", ".join(f"{t.name}.{c.name}" for t, c in pendentes),
+        )
+    app.state.transcricoes = asyncio.create_task(descarregar_periodicamente())
+    barramento_eventos.iniciar()
+    app.state.historico_chat = asyncio.create_task(manter_periodicamente())
+    # Limpezas do histórico interrompidas por um worker encerrado no meio
+    app.state.limpezas_historico = asyncio.create_task(retomar_limpezas())
+    buffer_mensagens.iniciar()
+    # Em segundo plano: até terminar, as sugestões vêm só do provedor de IA
+    app.state.indice_sugestoes = asyncio.create_task(run_in_threadpool(preparar_indice))
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.transcricoes.cancel()
+    app.state.historico_chat.cancel()
+    app.state.limpezas_historico.cancel()
+    descarregar_tudo()
+    await buffer_mensagens.fechar()
+    await gateway_ia.fechar()
+    barramento_eventos.fechar()
+    await run_in_threadpool(indice_sugestoes.salvar)
+    hashing_service.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 @app.get("/")
@@ -46,3 +111,46 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/cache")
+def cache_stats():
+    """Contadores de hit/miss dos caches em memória"""
+    return {
+        "auth": user_cache.stats(),
+        "dashboard": dashboard_cache.stats(),
+        "autocomplete": autocomplete_clientes.stats(),
+    }
+
+
+@app.get("/health/hashing")
+def hashing_stats():
+    """Uso do pool de hashing de senhas"""
+    return hashing_service.stats()
+
+
+@app.get("/health/ia")
+def ia_stats():
+    """Uso do gateway de IA (chamadas ao provedor, deduplicação e cache)"""
+    return {**gateway_ia.stats(), "indice": indice_sugestoes.stats()}
+
+
+@app.get("/health/eventos")
+def eventos_stats():
+    """Conexões SSE abertas neste worker e eventos entregues/descartados"""
+    return barramento_eventos.stats()
+
+
+@app.get("/health/historico-chat")
+def historico_chat_stats():
+    """Mensagens do chat pendentes no write-behind deste worker"""
+    return buffer_mensagens.stats()
+
+
+@app.get("/health/pool")
+def pool_stats():
+    """Uso dos pools de conexão com o banco (por worker)"""
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine if async_engine else None),
+    }
@@ -1,15 +1,21 @@
 from app.models.chamada import Chamada
 from app.models.cliente import ClienteLead
 from app.models.historico_chat import HistoricoChat
+from app.models.limpeza_historico import LimpezaHistorico
 from app.models.sugestao_ia import SugestaoIA
+from app.models.transcricao_segmento import TranscricaoSegmento
 from app.models.user import User
 from app.models.venda import Venda
+from app.models.venda_resumo import VendaResumoMensal
 
 __all__ = [
     "User",
     "ClienteLead",
     "Venda",
+    "VendaResumoMensal",
     "Chamada",
+    "TranscricaoSegmento",
     "SugestaoIA",
     "HistoricoChat",
+    "LimpezaHistorico",
 ]
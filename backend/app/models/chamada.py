@@ -6,18 +6,31 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
-    Text,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
+from app.utils.compressao import TextoComprimido
 from app.utils.database import Base
 
 
 class Chamada(Base):
     __tablename__ = "chamadas"
+    __table_args__ = (
+        # Listagem por usuário, mais recentes primeiro (keyset pagination)
+        Index("ix_chamadas_usuario_data_hora", "id_usuario", "data_hora", "id_chamada"),
+        # Filtro por resultado dentro do histórico do usuário
+        Index(
+            "ix_chamadas_usuario_resultado_data_hora",
+            "id_usuario",
+            "resultado",
+            "data_hora",
+            "id_chamada",
+        ),
+    )
 
     id_chamada = Column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
@@ -29,7 +42,7 @@ class Chamada(Base):
         CheckConstraint("resultado IN ('sucesso', 'falha', 'em_andamento')"),
         nullable=True,
     )
-    transcricao = Column(Text, nullable=True)
+    transcricao = Column(TextoComprimido, nullable=True)  # zstd
     id_usuario = Column(
         UUID(as_uuid=True),
         ForeignKey("usuarios.id_usuario", ondelete="CASCADE"),
@@ -39,11 +52,13 @@ class Chamada(Base):
         UUID(as_uuid=True),
         ForeignKey("clientesleads.id_cliente", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     id_venda = Column(
         UUID(as_uuid=True),
         ForeignKey("vendas.id_venda", ondelete="SET NULL"),
         nullable=True,
+        index=True,
     )
 
     # Relacionamentos
@@ -1,24 +1,39 @@
 import uuid
 
-from sqlalchemy import Column, ForeignKey, String
+from sqlalchemy import Column, ForeignKey, Index, String, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
+from app.utils.busca import normalizar_busca, vetor_busca
 from app.utils.database import Base
+from app.utils.telefone import normalizar_telefone
 
 
 class ClienteLead(Base):
     __tablename__ = "clientesleads"
+    __table_args__ = (
+        # Listagem por usuário em ordem alfabética (keyset pagination)
+        Index("ix_clientesleads_usuario_nome", "id_usuario", "nome", "id_cliente"),
+        # Verificação de email duplicado por usuário (criação e importação)
+        Index("ix_clientesleads_usuario_email", "id_usuario", "e_mail"),
+        # Identificação do cliente pelo número da chamada
+        Index("ix_clientesleads_usuario_telefone", "id_usuario", "telefone_e164"),
+    )
 
     id_cliente = Column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
     )
     nome = Column(String(100), nullable=False, index=True)
     telefone = Column(String(15), nullable=True)
+    telefone_e164 = Column(String(16), nullable=True)  # ex.: +5511987654321
     e_mail = Column(String(100), nullable=True)
     empresa = Column(String(100), nullable=True)
     observacao = Column(String(100), nullable=True)
 
+    # Nome e empresa sem acentos e em minúsculas (busca textual)
+    nome_busca = Column(String(100), nullable=True)
+    empresa_busca = Column(String(100), nullable=True)
+
     # NOVO: Relacionamento com o usuário que criou o cliente
     id_usuario = Column(
         UUID(as_uuid=True),
@@ -32,3 +47,36 @@ class ClienteLead(Base):
 
     def __repr__(self):
         return f"<ClienteLead {self.nome}>"
+
+
+# Índices GIN da busca por palavras (prefixo) em nome e empresa
+Index(
+    "ix_clientesleads_nome_busca",
+    vetor_busca(ClienteLead.nome_busca),
+    postgresql_using="gin",
+)
+Index(
+    "ix_clientesleads_empresa_busca",
+    vetor_busca(ClienteLead.empresa_busca),
+    postgresql_using="gin",
+)
+
+
+def campos_normalizados(nome, empresa, telefone) -> dict:
+    """
+    Colunas derivadas de nome, empresa e telefone. Inserções em massa (Core)
+    não passam pelos eventos do ORM e devem incluí-las explicitamente.
+    """
+    return {
+        "nome_busca": normalizar_busca(nome),
+        "empresa_busca": normalizar_busca(empresa),
+        "telefone_e164": normalizar_telefone(telefone),
+    }
+
+
+@event.listens_for(ClienteLead, "before_insert")
+@event.listens_for(ClienteLead, "before_update")
+def _atualizar_campos_normalizados(mapper, connection, cliente: ClienteLead) -> None:
+    campos = campos_normalizados(cliente.nome, cliente.empresa, cliente.telefone)
+    for campo, valor in campos.items():
+        setattr(cliente, campo, valor)
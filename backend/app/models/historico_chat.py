@@ -1,21 +1,34 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
+from app.utils.compressao import TextoComprimido
 from app.utils.database import Base
 
 
 class HistoricoChat(Base):
     __tablename__ = "historicochat"
+    __table_args__ = (
+        # Histórico por usuário, mais recentes primeiro (keyset pagination)
+        Index(
+            "ix_historicochat_usuario_data_envio",
+            "id_usuario",
+            "data_envio",
+            "id_mensagem",
+        ),
+        # Uma partição por mês (app.utils.historico_chat cria e remove)
+        {"postgresql_partition_by": "RANGE (data_envio)"},
+    )
 
     id_mensagem = Column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
     )
-    interacao = Column(Text, nullable=False)
-    data_envio = Column(DateTime, default=datetime.utcnow)
+    interacao = Column(TextoComprimido, nullable=False)  # zstd
+    # Na chave primária porque é a chave de particionamento
+    data_envio = Column(DateTime, primary_key=True, default=datetime.utcnow)
     id_usuario = Column(
         UUID(as_uuid=True),
         ForeignKey("usuarios.id_usuario", ondelete="CASCADE"),
@@ -0,0 +1,63 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.utils.database import Base
+
+# Limpeza ainda não terminada (no máximo uma por usuário)
+STATUS_ATIVOS = ("pendente", "em_andamento")
+_ATIVA = text("status IN ('pendente', 'em_andamento')")
+
+
+class LimpezaHistorico(Base):
+    """
+    Limpeza do histórico de chat de um usuário, executada em lotes em segundo
+    plano. O progresso fica no banco: qualquer worker o informa, e uma limpeza
+    interrompida (worker reiniciado) é retomada.
+    """
+
+    __tablename__ = "limpezas_historico"
+    __table_args__ = (
+        Index(
+            "ux_limpezas_historico_ativa",
+            "id_usuario",
+            unique=True,
+            postgresql_where=_ATIVA,
+            sqlite_where=_ATIVA,
+        ),
+    )
+
+    id_limpeza = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id_usuario = Column(
+        UUID(as_uuid=True),
+        ForeignKey("usuarios.id_usuario", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # Só as mensagens enviadas até o pedido; as novas são mantidas
+    ate = Column(DateTime, nullable=False, default=datetime.utcnow)
+    status = Column(String(20), nullable=False, default="pendente")
+    total = Column(Integer, nullable=True)  # conhecido ao começar
+    removidas = Column(Integer, nullable=False, default=0)
+    iniciada_em = Column(DateTime, nullable=False, default=datetime.utcnow)
+    concluida_em = Column(DateTime, nullable=True)
+    # Atualizada a cada lote: sem progresso por muito tempo, foi abandonada
+    atualizada_em = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @property
+    def ativa(self) -> bool:
+        return self.status in STATUS_ATIVOS
+
+    def resumo(self) -> dict:
+        return {
+            "id_limpeza": self.id_limpeza,
+            "status": self.status,
+            "total": self.total,
+            "removidas": self.removidas,
+            "iniciada_em": self.iniciada_em,
+            "concluida_em": self.concluida_em,
+        }
+
+    def __repr__(self):
+        return f"<LimpezaHistorico {self.status} - {self.removidas}/{self.total}>"
@@ -1,9 +1,21 @@
 import uuid
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    Text,
+    event,
+    func,
+    literal_column,
+    select,
+)
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 
+from app.models.chamada import Chamada
 from app.utils.database import Base
 
 
@@ -16,14 +28,58 @@ class SugestaoIA(Base):
     conteudo = Column(Text, nullable=False)
     momento = Column(Integer, nullable=True)  # Momento da chamada em segundos
     aceita = Column(Boolean, default=False)
+    # Trecho da conversa que a sugestão respondeu (índice de sugestões aceitas)
+    contexto = Column(Text, nullable=True)
     id_chamada = Column(
         UUID(as_uuid=True),
         ForeignKey("chamadas.id_chamada", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
+    # Dono da chamada, copiado na criação: filtra as sugestões do usuário sem
+    # join com chamadas (o dono de uma chamada não muda). Preenchido nas
+    # sugestões antigas por scripts.migrar
+    id_usuario = Column(
+        UUID(as_uuid=True),
+        ForeignKey("usuarios.id_usuario", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    # Chave de ordenação por momento; sem momento vem primeiro (NULL quebraria
+    # a comparação do cursor). Literal -1 para coincidir com a expressão dos índices
+    momento_ordem = column_property(func.coalesce(momento, literal_column("-1")))
 
     # Relacionamentos
     chamada = relationship("Chamada", backref="sugestoes")
 
     def __repr__(self):
         return f"<SugestaoIA - Aceita: {self.aceita}>"
+
+
+# Sugestões de uma chamada em ordem de momento (keyset pagination)
+Index(
+    "ix_sugestoesia_chamada_momento",
+    SugestaoIA.id_chamada,
+    SugestaoIA.momento_ordem.expression,
+    SugestaoIA.id_sugestao,
+)
+# Sugestões do usuário (todas as chamadas), na mesma ordem
+Index(
+    "ix_sugestoesia_usuario_chamada_momento",
+    SugestaoIA.id_usuario,
+    SugestaoIA.id_chamada,
+    SugestaoIA.momento_ordem.expression,
+    SugestaoIA.id_sugestao,
+)
+
+
+@event.listens_for(SugestaoIA, "before_insert")
+def _preencher_usuario(mapper, connection, sugestao: SugestaoIA) -> None:
+    """
+    Copia o dono da chamada quando não informado. Inserções em massa (Core)
+    não passam por aqui e devem incluir id_usuario.
+    """
+    if sugestao.id_usuario is None:
+        sugestao.id_usuario = connection.scalar(
+            select(Chamada.id_usuario).where(Chamada.id_chamada == sugestao.id_chamada)
+        )
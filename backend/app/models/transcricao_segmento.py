@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.utils.database import Base
+
+
+class TranscricaoSegmento(Base):
+    """
+    Trecho da transcrição de uma chamada em andamento. Os trechos são juntados
+    em Chamada.transcricao quando a chamada é finalizada (e então apagados).
+    """
+
+    __tablename__ = "transcricao_segmentos"
+    __table_args__ = (
+        # Montagem da transcrição na ordem dos trechos
+        Index(
+            "ix_transcricao_segmentos_chamada_momento",
+            "id_chamada",
+            "momento",
+            "id_segmento",
+        ),
+    )
+
+    # BigInteger sequencial desempata trechos com o mesmo momento
+    id_segmento = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    id_chamada = Column(
+        UUID(as_uuid=True),
+        ForeignKey("chamadas.id_chamada", ondelete="CASCADE"),
+        nullable=False,
+    )
+    momento = Column(DateTime, nullable=False, default=datetime.utcnow)
+    texto = Column(Text, nullable=False)
+
+    def __repr__(self):
+        return f"<TranscricaoSegmento {self.id_chamada} {self.momento}>"
@@ -1,7 +1,7 @@
 import uuid
 from datetime import date
 
-from sqlalchemy import Column, Date, String
+from sqlalchemy import Column, Date, DateTime, String
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.utils.database import Base
@@ -19,6 +19,8 @@ class User(Base):
     tipo_usuario = Column(String(20), nullable=True)
     data_criacao = Column(Date, default=date.today)
     ultimo_login = Column(Date, nullable=True)
+    # Tokens emitidos antes deste instante (UTC, em segundos) são recusados
+    tokens_revogados_em = Column(DateTime, nullable=True)
 
     def __repr__(self):
         return f"<User {self.nome} ({self.tipo_usuario})>"
@@ -1,7 +1,16 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, Date, DateTime, ForeignKey, Numeric, String, Text
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Numeric,
+    String,
+    Text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -10,6 +19,20 @@ from app.utils.database import Base
 
 class Venda(Base):
     __tablename__ = "vendas"
+    __table_args__ = (
+        # Listagem por usuário, mais recentes primeiro (keyset pagination)
+        Index(
+            "ix_vendas_usuario_data_criacao", "id_usuario", "data_criacao", "id_venda"
+        ),
+        # Listagem filtrada por status (status_filter)
+        Index(
+            "ix_vendas_usuario_status_data_criacao",
+            "id_usuario",
+            "status",
+            "data_criacao",
+            "id_venda",
+        ),
+    )
 
     id_venda = Column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
@@ -23,13 +46,15 @@ class Venda(Base):
         UUID(as_uuid=True),
         ForeignKey("clientesleads.id_cliente", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     id_usuario = Column(
         UUID(as_uuid=True),
         ForeignKey("usuarios.id_usuario", ondelete="SET NULL"),
         nullable=True,
     )
-    data_criacao = Column(DateTime, default=datetime.utcnow)
+    # NOT NULL: chave do cursor da listagem (ver scripts.migrar)
+    data_criacao = Column(DateTime, nullable=False, default=datetime.utcnow)
     data_atualizacao = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
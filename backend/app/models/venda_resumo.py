@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, Numeric, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.utils.database import Base
+
+
+class VendaResumoMensal(Base):
+    """Agregado de vendas por usuário, mês (data_criacao) e status"""
+
+    __tablename__ = "vendas_resumo_mensal"
+
+    id_usuario = Column(
+        UUID(as_uuid=True),
+        ForeignKey("usuarios.id_usuario", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    mes = Column(Date, primary_key=True)  # Primeiro dia do mês
+    status = Column(String(50), primary_key=True)
+    quantidade = Column(Integer, nullable=False, default=0)
+    valor_total = Column(Numeric(14, 2), nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<VendaResumoMensal {self.mes} {self.status} - {self.quantidade}>"
@@ -7,12 +7,13 @@ from sqlalchemy.orm import Session
 
 from app.models.user import User
 from app.schemas.user import Token, UserCreate, UserLogin, UserResponse
-from app.utils.database import get_db
+from app.utils.database import DBSession, get_async_db, get_db, run_db
 from app.utils.security import (
     create_access_token,
-    get_current_user,
+    get_current_user_async,
     get_password_hash,
-    verify_password,
+    revoke_user_tokens,
+    verify_and_update_password,
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -53,13 +54,23 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
     # Busca usuário pelo email
     user = db.query(User).filter(User.e_mail == user_data.e_mail).first()
 
-    if not user or not verify_password(user_data.senha, user.senha_hash):
+    senha_valida, novo_hash = (
+        verify_and_update_password(user_data.senha, user.senha_hash)
+        if user
+        else (False, None)
+    )
+
+    if not senha_valida:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Rehash transparente quando os parâmetros do Argon2 mudaram
+    if novo_hash:
+        user.senha_hash = novo_hash
+
     # Atualizar último login
     user.ultimo_login = date.today()
     db.commit()
@@ -71,14 +82,24 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user_async)):
     """Retorna dados do usuário autenticado"""
     return current_user
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(current_user: User = Depends(get_current_user)):
+async def refresh_token(current_user: User = Depends(get_current_user_async)):
     """Renova o token de acesso"""
     access_token = create_access_token(data={"sub": str(current_user.id_usuario)})
 
     return {"access_token": access_token, "token_type": "bearer", "user": current_user}
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    db: DBSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """Revoga os tokens emitidos para o usuário autenticado"""
+    await run_db(db, revoke_user_tokens, current_user.id_usuario)
+    return None
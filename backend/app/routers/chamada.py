@@ -1,16 +1,91 @@
+import json
+import uuid
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
 from app.models.chamada import Chamada
+from app.models.sugestao_ia import SugestaoIA
 from app.models.user import User
-from app.schemas.chamada import ChamadaCreate, ChamadaResponse, ChamadaUpdate
-from app.utils.database import get_db
-from app.utils.security import get_current_user
+from app.schemas.chamada import (
+    ChamadaCreate,
+    ChamadaResponse,
+    ChamadaUpdate,
+    TranscricaoSegmentoCreate,
+)
+from app.schemas.sugestao_ia import (
+    SugestaoIAAceite,
+    SugestaoIAAceiteResponse,
+    SugestaoIAGerar,
+    SugestaoIALoteItem,
+    SugestaoIALoteResponse,
+    SugestaoIAResponse,
+)
+from app.utils.campos import (
+    campos_da_resposta,
+    carregar_campos,
+    resposta_com_campos,
+    schema_com_campos,
+)
+from app.utils.database import DBSession, get_async_db, get_db, run_db
+from app.utils.eventos import eventos
+from app.utils.exportacao import resposta_exportacao
+from app.utils.gateway_ia import ErroProvedorIA, GatewaySaturadoError, gateway_ia
+from app.utils.indice_sugestoes import atualizar_aceite, indice_sugestoes
+from app.utils.pagination import definir_proximo_cursor, paginar
+from app.utils.security import (
+    get_current_user,
+    get_current_user_async,
+    usuario_do_token,
+)
+from app.utils.transcricao import (
+    buffer_transcricoes,
+    descarregar,
+    gravar_pendentes,
+    gravar_segmentos,
+    montar_transcricao,
+    novos_segmentos,
+)
 
 router = APIRouter(prefix="/chamadas", tags=["Chamadas"])
 
+# Resposta com ?fields=: só os campos pedidos
+ChamadaCampos = schema_com_campos(ChamadaResponse)
+
+_trechos = TypeAdapter(List[TranscricaoSegmentoCreate])
+
+# Colunas omitidas da listagem (a menos que pedidas em ?fields=)
+CAMPOS_PESADOS = ("transcricao",)
+
+# Máximo de sugestões por request nas rotas em lote
+LIMITE_LOTE_SUGESTOES = 500
+
+
+def _publicar_chamada(id_usuario: UUID, chamada: Chamada) -> None:
+    """Avisa as conexões do dono (evento "chamada", sem a transcrição)"""
+    eventos.publicar(
+        id_usuario,
+        "chamada",
+        ChamadaResponse.model_validate(chamada).model_dump(
+            mode="json", exclude=set(CAMPOS_PESADOS)
+        ),
+    )
+
 
 @router.post("/", response_model=ChamadaResponse, status_code=status.HTTP_201_CREATED)
 def criar_chamada(
@@ -24,26 +99,34 @@ def criar_chamada(
         duracao=chamada.duracao,
         resultado=chamada.resultado,
         transcricao=chamada.transcricao,
-        id_usuario=chamada.id_usuario,
+        id_usuario=current_user.id_usuario,
         id_cliente=chamada.id_cliente,
         id_venda=chamada.id_venda,
     )
     db.add(nova_chamada)
     db.commit()
     db.refresh(nova_chamada)
+    _publicar_chamada(current_user.id_usuario, nova_chamada)
     return nova_chamada
 
 
-@router.get("/", response_model=list[ChamadaResponse])
+@router.get("/", response_model=list[ChamadaCampos], response_model_exclude_unset=True)
 def listar_chamadas(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str = None,
     resultado: str = None,
     id_cliente: UUID = None,
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Lista todas as chamadas do usuário atual"""
+    """
+    Lista todas as chamadas do usuário atual (mais recentes primeiro), sem a
+    transcrição; fields=campo1,campo2 escolhe os campos retornados.
+    O header X-Next-Cursor traz o cursor da próxima página.
+    """
     query = db.query(Chamada).filter(Chamada.id_usuario == current_user.id_usuario)
 
     if resultado:
@@ -52,19 +135,59 @@ def listar_chamadas(
     if id_cliente:
         query = query.filter(Chamada.id_cliente == id_cliente)
 
-    chamadas = query.order_by(Chamada.data_hora.desc()).offset(skip).limit(limit).all()
-    return chamadas
+    ordem = (Chamada.data_hora, Chamada.id_chamada)
+    campos = campos_da_resposta(ChamadaResponse, fields, CAMPOS_PESADOS)
+    query = carregar_campos(query, Chamada, campos, ordem)
+    chamadas = paginar(query, ordem, cursor, desc=True, skip=skip).limit(limit).all()
+    definir_proximo_cursor(response, chamadas, limit, ordem)
+    return resposta_com_campos(chamadas, campos)
+
+
+@router.get("/exportar")
+def exportar_chamadas(
+    request: Request,
+    formato: str = Query("csv", pattern="^(csv|ndjson)$"),
+    resultado: str = None,
+    id_cliente: UUID = None,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Exporta todas as chamadas do usuário atual (mais recentes primeiro) em CSV
+    ou NDJSON, em streaming. Compactado em gzip se o cliente aceitar.
+    """
+    consulta = select(
+        Chamada.id_chamada,
+        Chamada.data_hora,
+        Chamada.duracao,
+        Chamada.resultado,
+        Chamada.transcricao,
+        Chamada.id_cliente,
+        Chamada.id_venda,
+    ).where(Chamada.id_usuario == current_user.id_usuario)
+
+    if resultado:
+        consulta = consulta.where(Chamada.resultado == resultado)
+
+    if id_cliente:
+        consulta = consulta.where(Chamada.id_cliente == id_cliente)
+
+    consulta = consulta.order_by(Chamada.data_hora.desc(), Chamada.id_chamada.desc())
+    return resposta_exportacao(consulta, formato, "chamadas", request)
 
 
-@router.get("/{id_chamada}", response_model=ChamadaResponse)
+@router.get(
+    "/{id_chamada}", response_model=ChamadaCampos, response_model_exclude_unset=True
+)
 def obter_chamada(
     id_chamada: UUID,
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Obtém uma chamada específica"""
+    """Obtém uma chamada específica (fields=campo1,campo2 limita os campos)"""
+    campos = campos_da_resposta(ChamadaResponse, fields)
     chamada = (
-        db.query(Chamada)
+        carregar_campos(db.query(Chamada), Chamada, campos)
         .filter(
             Chamada.id_chamada == id_chamada,
             Chamada.id_usuario == current_user.id_usuario,
@@ -76,7 +199,7 @@ def obter_chamada(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Chamada não encontrada"
         )
-    return chamada
+    return resposta_com_campos(chamada, campos)
 
 
 @router.put("/{id_chamada}", response_model=ChamadaResponse)
@@ -107,9 +230,292 @@ def atualizar_chamada(
 
     db.commit()
     db.refresh(chamada)
+    _publicar_chamada(current_user.id_usuario, chamada)
+    return chamada
+
+
+def _verificar_chamada(db: Session, id_chamada: UUID, id_usuario: UUID) -> None:
+    existe = db.scalar(
+        select(Chamada.id_chamada).where(
+            Chamada.id_chamada == id_chamada, Chamada.id_usuario == id_usuario
+        )
+    )
+    if not existe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Chamada não encontrada"
+        )
+
+
+def _finalizar_transcricao(db: Session, id_chamada: UUID, id_usuario: UUID):
+    # FOR UPDATE: espera as gravações de trechos em andamento (gravar_pendentes)
+    # e um finalizar simultâneo, que não junta os mesmos trechos duas vezes
+    chamada = (
+        db.query(Chamada)
+        .filter(Chamada.id_chamada == id_chamada, Chamada.id_usuario == id_usuario)
+        .with_for_update()
+        .first()
+    )
+
+    if not chamada:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Chamada não encontrada"
+        )
+
+    montar_transcricao(db, chamada)
+    db.commit()
+    db.refresh(chamada)
+    _publicar_chamada(id_usuario, chamada)
     return chamada
 
 
+@router.post("/{id_chamada}/transcricao", status_code=status.HTTP_204_NO_CONTENT)
+def adicionar_transcricao(
+    id_chamada: UUID,
+    trechos: List[TranscricaoSegmentoCreate],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Acrescenta trechos à transcrição de uma chamada em andamento, sem reenviar
+    o texto inteiro. Cada request é gravado como um lote; os trechos só entram
+    em transcricao ao finalizar.
+    """
+    _verificar_chamada(db, id_chamada, current_user.id_usuario)
+    gravar_segmentos(db, novos_segmentos(id_chamada, trechos))
+    return None
+
+
+@router.post("/{id_chamada}/transcricao/finalizar", response_model=ChamadaResponse)
+def finalizar_transcricao(
+    id_chamada: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Junta os trechos recebidos, em ordem, ao fim da transcrição da chamada.
+    Trechos de um WebSocket ainda aberto em outro worker ficam de fora.
+    """
+    return _finalizar_transcricao(db, id_chamada, current_user.id_usuario)
+
+
+@router.post(
+    "/{id_chamada}/sugestoes/batch",
+    response_model=SugestaoIALoteResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def criar_sugestoes_em_lote(
+    id_chamada: UUID,
+    sugestoes: List[SugestaoIALoteItem] = Body(..., max_length=LIMITE_LOTE_SUGESTOES),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Cria várias sugestões de IA da chamada com um único INSERT e retorna os
+    ids na ordem enviada
+    """
+    _verificar_chamada(db, id_chamada, current_user.id_usuario)
+
+    linhas = [
+        {
+            "id_sugestao": uuid.uuid4(),
+            "id_chamada": id_chamada,
+            "id_usuario": current_user.id_usuario,
+            **s.model_dump(),
+        }
+        for s in sugestoes
+    ]
+    if linhas:
+        db.execute(insert(SugestaoIA), linhas)
+        db.commit()
+        eventos.publicar(
+            current_user.id_usuario,
+            "sugestoes",
+            [SugestaoIAResponse.model_validate(linha) for linha in linhas],
+        )
+    for linha in linhas:
+        if linha["aceita"]:
+            atualizar_aceite(
+                current_user.id_usuario, linha["id_sugestao"], linha["contexto"], True
+            )
+    return {"ids": [linha["id_sugestao"] for linha in linhas]}
+
+
+@router.patch("/{id_chamada}/sugestoes/batch", response_model=SugestaoIAAceiteResponse)
+def aceitar_sugestoes_em_lote(
+    id_chamada: UUID,
+    aceites: List[SugestaoIAAceite] = Body(..., max_length=LIMITE_LOTE_SUGESTOES),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Marca várias sugestões da chamada como aceitas (ou não) em uma transação:
+    um UPDATE para as aceitas e outro para as recusadas
+    """
+    _verificar_chamada(db, id_chamada, current_user.id_usuario)
+
+    # Um id repetido vale pelo último valor enviado
+    valores = {a.id_sugestao: a.aceita for a in aceites}
+    atualizadas = {}
+    for aceita in (True, False):
+        ids = [id_sugestao for id_sugestao, v in valores.items() if v is aceita]
+        if not ids:
+            continue
+        atualizadas.update(
+            db.execute(
+                update(SugestaoIA)
+                .where(
+                    SugestaoIA.id_chamada == id_chamada,
+                    SugestaoIA.id_sugestao.in_(ids),
+                )
+                .values(aceita=aceita)
+                .returning(SugestaoIA.id_sugestao, SugestaoIA.contexto),
+                execution_options={"synchronize_session": False},
+            ).tuples()
+        )
+    db.commit()
+
+    for id_sugestao, contexto in atualizadas.items():
+        atualizar_aceite(
+            current_user.id_usuario, id_sugestao, contexto, valores[id_sugestao]
+        )
+
+    return {
+        "atualizadas": len(atualizadas),
+        "nao_encontradas": [i for i in valores if i not in atualizadas],
+    }
+
+
+@router.post(
+    "/{id_chamada}/sugestoes/gerar",
+    response_model=SugestaoIAResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def gerar_sugestao(
+    id_chamada: UUID,
+    pedido: SugestaoIAGerar,
+    db: DBSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Gera uma sugestão para o trecho da conversa e a grava na chamada. Se uma
+    sugestão aceita antes respondeu um contexto parecido, ela é reaproveitada;
+    senão o texto vem do provedor de IA do servidor (com cache e deduplicação
+    de prompts iguais).
+    """
+
+    def buscar_aceita(db: Session) -> Optional[str]:
+        """Verifica a chamada e procura uma sugestão aceita para o contexto"""
+        _verificar_chamada(db, id_chamada, current_user.id_usuario)
+        texto = None
+        encontrada = indice_sugestoes.buscar(
+            current_user.id_usuario, [pedido.contexto]
+        )[0]
+        if encontrada is not None:
+            texto = db.scalar(
+                select(SugestaoIA.conteudo).where(
+                    SugestaoIA.id_sugestao == encontrada[0],
+                    SugestaoIA.id_usuario == current_user.id_usuario,
+                    SugestaoIA.aceita.is_(True),
+                )
+            )
+            if texto is None:  # excluída ou recusada em outro worker
+                indice_sugestoes.remover(encontrada[0])
+        db.rollback()  # devolve a conexão ao pool enquanto o provedor responde
+        return texto
+
+    texto = await run_db(db, buscar_aceita)
+
+    if texto is None:
+        try:
+            texto = await gateway_ia.gerar(pedido.contexto)
+        except GatewaySaturadoError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado, tente novamente em instantes",
+                headers={"Retry-After": "1"},
+            )
+        except ErroProvedorIA as e:
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
+
+    def gravar(db: Session) -> SugestaoIA:
+        sugestao = SugestaoIA(
+            conteudo=texto,
+            momento=pedido.momento,
+            id_chamada=id_chamada,
+            id_usuario=current_user.id_usuario,
+            contexto=pedido.contexto,
+        )
+        db.add(sugestao)
+        db.commit()
+        db.refresh(sugestao)
+        eventos.publicar(
+            current_user.id_usuario,
+            "sugestao",
+            SugestaoIAResponse.model_validate(sugestao),
+        )
+        return sugestao
+
+    return await run_db(db, gravar)
+
+
+@router.websocket("/{id_chamada}/transcricao/ws")
+async def transcricao_ao_vivo(
+    websocket: WebSocket,
+    id_chamada: UUID,
+    token: str,
+    db: DBSession = Depends(get_async_db),
+):
+    """
+    Transcrição ao vivo (token JWT em ?token=). Cada mensagem traz um trecho
+    {"texto", "momento"} ou uma lista deles; os trechos ficam em memória e são
+    gravados em lote. {"fim": true} junta os trechos em transcricao, devolve
+    a chamada e fecha a conexão.
+    """
+
+    def autorizar(db: Session, id_usuario: UUID) -> None:
+        _verificar_chamada(db, id_chamada, id_usuario)
+        # Libera a conexão: o WebSocket fica aberto durante toda a chamada
+        db.rollback()
+
+    try:
+        usuario = await usuario_do_token(token, db)
+        await run_db(db, autorizar, usuario.id_usuario)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    buffer_transcricoes.registrar(id_chamada)
+    try:
+        while True:
+            try:
+                dados = json.loads(await websocket.receive_text())
+                if isinstance(dados, dict) and dados.get("fim"):
+                    chamada = await run_db(
+                        db, _finalizar_transcricao, id_chamada, usuario.id_usuario
+                    )
+                    await websocket.send_text(
+                        ChamadaResponse.model_validate(chamada).model_dump_json()
+                    )
+                    await websocket.close()
+                    return
+                trechos = _trechos.validate_python(
+                    dados if isinstance(dados, list) else [dados]
+                )
+            except (json.JSONDecodeError, ValidationError) as e:
+                await websocket.send_json({"erro": str(e)})
+                continue
+
+            segmentos = novos_segmentos(id_chamada, trechos)
+            if buffer_transcricoes.adicionar(id_chamada, segmentos):
+                await run_db(db, descarregar, id_chamada)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Grava o que ficou pendente (conexão encerrada com ou sem "fim")
+        await run_db(db, gravar_pendentes, [id_chamada], buffer_transcricoes.liberar)
+
+
 @router.delete("/{id_chamada}", status_code=status.HTTP_204_NO_CONTENT)
 def deletar_chamada(
     id_chamada: UUID,
@@ -133,4 +539,7 @@ def deletar_chamada(
 
     db.delete(chamada)
     db.commit()
+    eventos.publicar(
+        current_user.id_usuario, "chamada_removida", {"id_chamada": id_chamada}
+    )
     return None
@@ -1,102 +1,257 @@
 # app/routers/clientes.py - CRUD de Clientes/Leads com segurança por usuário
 
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from app.models.cliente import ClienteLead
 from app.models.user import User
 from app.schemas.cliente import (
+    ClienteAutocompleteResponse,
     ClienteLeadCreate,
     ClienteLeadResponse,
     ClienteLeadUpdate,
+    ImportacaoClientesResponse,
+)
+from app.utils.autocomplete import autocomplete_clientes
+from app.utils.busca import consulta_prefixos, filtro_busca, relevancia
+from app.utils.campos import (
+    campos_da_resposta,
+    carregar_campos,
+    resposta_com_campos,
+    schema_com_campos,
+)
+from app.utils.dashboard_cache import (
+    invalidar_estatisticas,
+    invalidar_estatisticas_async,
+)
+from app.utils.database import DBSession, get_async_db, get_db, run_db
+from app.utils.importacao import (
+    detectar_formato,
+    importar_registros,
+    ler_csv,
+    ler_ndjson,
 )
-from app.utils.database import get_db
-from app.utils.security import get_current_user
+from app.utils.pagination import definir_proximo_cursor, paginar
+from app.utils.security import get_current_user, get_current_user_async
+from app.utils.telefone import normalizar_telefone
 
 router = APIRouter(prefix="/clientes", tags=["Clientes/Leads"])
 
+# Resposta com ?fields=: só os campos pedidos
+ClienteLeadCampos = schema_com_campos(ClienteLeadResponse)
+
+# Máximo de resultados por página nas buscas
+LIMITE_BUSCA = 100
+LIMITE_AUTOCOMPLETE = 20
+
 
 @router.post(
     "/", response_model=ClienteLeadResponse, status_code=status.HTTP_201_CREATED
 )
 async def criar_cliente(
     cliente_data: ClienteLeadCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: DBSession = Depends(get_async_db),
 ):
     """Criar novo cliente/lead"""
 
-    # Verificar se email já existe PARA ESTE USUÁRIO (se fornecido)
-    if cliente_data.e_mail:
-        existing = (
-            db.query(ClienteLead)
-            .filter(
-                ClienteLead.e_mail == cliente_data.e_mail,
-                ClienteLead.id_usuario == current_user.id_usuario,
+    def criar(db: Session) -> ClienteLead:
+        # Verificar se email já existe PARA ESTE USUÁRIO (se fornecido)
+        if cliente_data.e_mail:
+            existing = (
+                db.query(ClienteLead)
+                .filter(
+                    ClienteLead.e_mail == cliente_data.e_mail,
+                    ClienteLead.id_usuario == current_user.id_usuario,
+                )
+                .first()
             )
-            .first()
+            if existing:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Você já tem um cliente com este email",
+                )
+
+        # Criar cliente vinculado ao usuário atual
+        novo_cliente = ClienteLead(
+            nome=cliente_data.nome,
+            telefone=cliente_data.telefone,
+            e_mail=cliente_data.e_mail,
+            empresa=cliente_data.empresa,
+            observacao=cliente_data.observacao,
+            id_usuario=current_user.id_usuario,  # ✅ VINCULAR AO USUÁRIO
         )
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Você já tem um cliente com este email",
-            )
 
-    # Criar cliente vinculado ao usuário atual
-    novo_cliente = ClienteLead(
-        nome=cliente_data.nome,
-        telefone=cliente_data.telefone,
-        e_mail=cliente_data.e_mail,
-        empresa=cliente_data.empresa,
-        observacao=cliente_data.observacao,
-        id_usuario=current_user.id_usuario,  # ✅ VINCULAR AO USUÁRIO
-    )
+        db.add(novo_cliente)
+        db.commit()
+        db.refresh(novo_cliente)
 
-    db.add(novo_cliente)
-    db.commit()
-    db.refresh(novo_cliente)
+        return novo_cliente
 
+    novo_cliente = await run_db(db, criar)
+    autocomplete_clientes.salvar_cliente(novo_cliente)
+    await invalidar_estatisticas_async(current_user.id_usuario)
     return novo_cliente
 
 
-@router.get("/", response_model=List[ClienteLeadResponse])
+@router.post("/importar", response_model=ImportacaoClientesResponse)
+def importar_clientes(
+    arquivo: UploadFile = File(...),
+    formato: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Importar clientes em massa de um arquivo CSV (cabeçalho com os campos de
+    criação: nome, telefone, e_mail, empresa, observacao) ou NDJSON (um objeto
+    por linha). O arquivo é lido em streaming e gravado em lotes; linhas
+    inválidas ou com email repetido são ignoradas e listadas no relatório.
+    """
+    formato = detectar_formato(formato, arquivo.filename, arquivo.content_type)
+    leitor = ler_ndjson if formato == "ndjson" else ler_csv
+
+    try:
+        relatorio = importar_registros(
+            db, leitor(arquivo.file), current_user.id_usuario
+        )
+    finally:
+        # Lotes já confirmados continuam gravados mesmo se o arquivo falhar
+        invalidar_estatisticas(current_user.id_usuario)
+        autocomplete_clientes.invalidar(current_user.id_usuario)
+
+    return relatorio
+
+
+@router.get(
+    "/", response_model=list[ClienteLeadCampos], response_model_exclude_unset=True
+)
 async def listar_clientes(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: str = None,
+    fields: str = None,
+    current_user: User = Depends(get_current_user_async),
+    db: DBSession = Depends(get_async_db),
 ):
-    """Listar todos os clientes/leads DO USUÁRIO ATUAL"""
+    """
+    Listar todos os clientes/leads DO USUÁRIO ATUAL (ordem alfabética).
+    fields=campo1,campo2 escolhe os campos retornados.
+    O header X-Next-Cursor traz o cursor da próxima página.
+    """
+    ordem = (ClienteLead.nome, ClienteLead.id_cliente)
+    campos = campos_da_resposta(ClienteLeadResponse, fields)
 
     # ✅ FILTRAR APENAS CLIENTES DO USUÁRIO LOGADO
-    clientes = (
-        db.query(ClienteLead)
-        .filter(ClienteLead.id_usuario == current_user.id_usuario)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    def listar(db: Session) -> List[ClienteLead]:
+        query = db.query(ClienteLead).filter(
+            ClienteLead.id_usuario == current_user.id_usuario
+        )
+        query = carregar_campos(query, ClienteLead, campos, ordem)
+        return paginar(query, ordem, cursor, skip=skip).limit(limit).all()
 
-    return clientes
+    clientes = await run_db(db, listar)
+    definir_proximo_cursor(response, clientes, limit, ordem)
+    return resposta_com_campos(clientes, campos)
 
 
-@router.get("/{id_cliente}", response_model=ClienteLeadResponse)
-async def obter_cliente(
-    id_cliente: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+@router.get("/autocomplete", response_model=List[ClienteAutocompleteResponse])
+async def autocomplete(
+    q: str,
+    limit: int = Query(10, ge=1, le=LIMITE_AUTOCOMPLETE),
+    current_user: User = Depends(get_current_user_async),
+    db: DBSession = Depends(get_async_db),
 ):
-    """Obter cliente específico por ID (apenas se pertencer ao usuário)"""
+    """
+    Sugestões de clientes enquanto o vendedor digita (HUD): cada palavra de q
+    casa como prefixo de uma palavra do nome, empresa ou e-mail, sem acentos.
+    Responde de um índice em memória; enquanto o índice do usuário é
+    carregado, usa a busca indexada do banco (nome e empresa).
+    """
+    resultado = autocomplete_clientes.buscar(current_user.id_usuario, q, limit)
+    if resultado is not None:
+        return resultado
+
+    def buscar(db: Session) -> List[ClienteLead]:
+        if consulta_prefixos(q) is None:
+            return []
+        return (
+            db.query(ClienteLead)
+            .filter(
+                ClienteLead.id_usuario == current_user.id_usuario,
+                or_(
+                    filtro_busca(ClienteLead.nome_busca, q),
+                    filtro_busca(ClienteLead.empresa_busca, q),
+                ),
+            )
+            .order_by(relevancia(ClienteLead.nome_busca, q).desc())
+            .limit(limit)
+            .all()
+        )
+
+    return await run_db(db, buscar)
 
+
+@router.get("/por-telefone/{numero}", response_model=ClienteLeadResponse)
+async def buscar_por_telefone(
+    numero: str,
+    current_user: User = Depends(get_current_user_async),
+    db: DBSession = Depends(get_async_db),
+):
+    """
+    Identificar o cliente pelo número de uma chamada (apenas do usuário atual).
+    Aceita o número em qualquer formato; a comparação é feita em E.164.
+    """
+    telefone = normalizar_telefone(numero)
+    if telefone is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Telefone inválido"
+        )
+
+    def buscar(db: Session) -> ClienteLead:
+        cliente = (
+            db.query(ClienteLead)
+            .filter(
+                ClienteLead.id_usuario == current_user.id_usuario,
+                ClienteLead.telefone_e164 == telefone,
+            )
+            .order_by(ClienteLead.nome, ClienteLead.id_cliente)
+            .first()
+        )
+        if not cliente:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado"
+            )
+        return cliente
+
+    return await run_db(db, buscar)
+
+
+def _buscar_cliente_do_usuario(
+    db: Session,
+    id_cliente: UUID,
+    id_usuario: UUID,
+    campos: Optional[List[str]] = None,
+) -> ClienteLead:
     # ✅ VERIFICAR SE O CLIENTE PERTENCE AO USUÁRIO
     cliente = (
-        db.query(ClienteLead)
+        carregar_campos(db.query(ClienteLead), ClienteLead, campos)
         .filter(
             ClienteLead.id_cliente == id_cliente,
-            ClienteLead.id_usuario == current_user.id_usuario,
+            ClienteLead.id_usuario == id_usuario,
         )
         .first()
     )
@@ -109,126 +264,160 @@ async def obter_cliente(
     return cliente
 
 
+@router.get(
+    "/{id_cliente}", response_model=ClienteLeadCampos, response_model_exclude_unset=True
+)
+async def obter_cliente(
+    id_cliente: UUID,
+    fields: str = None,
+    current_user: User = Depends(get_current_user_async),
+    db: DBSession = Depends(get_async_db),
+):
+    """
+    Obter cliente específico por ID (apenas se pertencer ao usuário).
+    fields=campo1,campo2 limita os campos retornados.
+    """
+    campos = campos_da_resposta(ClienteLeadResponse, fields)
+    cliente = await run_db(
+        db, _buscar_cliente_do_usuario, id_cliente, current_user.id_usuario, campos
+    )
+    return resposta_com_campos(cliente, campos)
+
+
 @router.put("/{id_cliente}", response_model=ClienteLeadResponse)
 async def atualizar_cliente(
     id_cliente: UUID,
     cliente_data: ClienteLeadUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: DBSession = Depends(get_async_db),
 ):
     """Atualizar dados do cliente (apenas se pertencer ao usuário)"""
 
-    # ✅ VERIFICAR SE O CLIENTE PERTENCE AO USUÁRIO
-    cliente = (
-        db.query(ClienteLead)
-        .filter(
-            ClienteLead.id_cliente == id_cliente,
-            ClienteLead.id_usuario == current_user.id_usuario,
-        )
-        .first()
-    )
-
-    if not cliente:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado"
-        )
-
-    # Atualizar apenas campos fornecidos
-    update_data = cliente_data.dict(exclude_unset=True)
-
-    # Verificar email duplicado se estiver sendo atualizado (apenas para este usuário)
-    if "e_mail" in update_data and update_data["e_mail"]:
-        existing = (
-            db.query(ClienteLead)
-            .filter(
-                ClienteLead.e_mail == update_data["e_mail"],
-                ClienteLead.id_cliente != id_cliente,
-                ClienteLead.id_usuario
-                == current_user.id_usuario,  # ✅ APENAS DESTE USUÁRIO
-            )
-            .first()
-        )
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Você já tem um cliente com este email",
+    def atualizar(db: Session) -> ClienteLead:
+        cliente = _buscar_cliente_do_usuario(db, id_cliente, current_user.id_usuario)
+
+        # Atualizar apenas campos fornecidos
+        update_data = cliente_data.dict(exclude_unset=True)
+
+        # Verificar email duplicado se estiver sendo atualizado
+        # (apenas para este usuário)
+        if "e_mail" in update_data and update_data["e_mail"]:
+            existing = (
+                db.query(ClienteLead)
+                .filter(
+                    ClienteLead.e_mail == update_data["e_mail"],
+                    ClienteLead.id_cliente != id_cliente,
+                    ClienteLead.id_usuario
+                    == current_user.id_usuario,  # ✅ APENAS DESTE USUÁRIO
+                )
+                .first()
             )
+            if existing:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Você já tem um cliente com este email",
+                )
+
+        for field, value in update_data.items():
+            setattr(cliente, field, value)
 
-    for field, value in update_data.items():
-        setattr(cliente, field, value)
+        db.commit()
+        db.refresh(cliente)
 
-    db.commit()
-    db.refresh(cliente)
+        return cliente
 
+    cliente = await run_db(db, atualizar)
+    autocomplete_clientes.salvar_cliente(cliente)
+    await invalidar_estatisticas_async(current_user.id_usuario)
     return cliente
 
 
 @router.delete("/{id_cliente}", status_code=status.HTTP_204_NO_CONTENT)
 async def deletar_cliente(
     id_cliente: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: DBSession = Depends(get_async_db),
 ):
     """Deletar cliente (apenas se pertencer ao usuário)"""
 
-    # ✅ VERIFICAR SE O CLIENTE PERTENCE AO USUÁRIO
-    cliente = (
-        db.query(ClienteLead)
-        .filter(
-            ClienteLead.id_cliente == id_cliente,
-            ClienteLead.id_usuario == current_user.id_usuario,
-        )
-        .first()
-    )
-
-    if not cliente:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado"
-        )
+    def deletar(db: Session) -> None:
+        cliente = _buscar_cliente_do_usuario(db, id_cliente, current_user.id_usuario)
+        db.delete(cliente)
+        db.commit()
 
-    db.delete(cliente)
-    db.commit()
+    await run_db(db, deletar)
+    autocomplete_clientes.remover_cliente(current_user.id_usuario, id_cliente)
+    await invalidar_estatisticas_async(current_user.id_usuario)
 
     return None
 
 
+def _buscar_clientes(coluna, termo: str, id_usuario: UUID, cursor, limit: int):
+    """
+    Monta a busca por palavras (prefixo, sem acentos) na coluna normalizada,
+    ordenada por relevância. Retorna a função para run_db e as colunas do
+    cursor; cada cliente retornado recebe o atributo "relevancia".
+    """
+    pontuacao = relevancia(coluna, termo).label("relevancia")
+    ordem = (pontuacao, ClienteLead.id_cliente)
+
+    def buscar(db: Session) -> List[ClienteLead]:
+        if consulta_prefixos(termo) is None:
+            return []
+
+        # ✅ FILTRAR APENAS CLIENTES DO USUÁRIO
+        query = db.query(ClienteLead, pontuacao).filter(
+            ClienteLead.id_usuario == id_usuario,
+            filtro_busca(coluna, termo),
+        )
+        clientes = []
+        for cliente, valor in paginar(query, ordem, cursor, desc=True).limit(limit):
+            cliente.relevancia = valor
+            clientes.append(cliente)
+        return clientes
+
+    return buscar, ordem
+
+
 @router.get("/buscar/nome/{nome}", response_model=List[ClienteLeadResponse])
 async def buscar_por_nome(
     nome: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: int = Query(20, ge=1, le=LIMITE_BUSCA),
+    cursor: str = None,
+    current_user: User = Depends(get_current_user_async),
+    db: DBSession = Depends(get_async_db),
 ):
-    """Buscar clientes por nome (busca parcial) - apenas do usuário atual"""
-
-    # ✅ FILTRAR APENAS CLIENTES DO USUÁRIO
-    clientes = (
-        db.query(ClienteLead)
-        .filter(
-            ClienteLead.nome.ilike(f"%{nome}%"),
-            ClienteLead.id_usuario == current_user.id_usuario,
-        )
-        .all()
+    """
+    Buscar clientes por nome - apenas do usuário atual.
+    Cada palavra casa como prefixo, sem diferenciar acentos e maiúsculas
+    ("joao sil" encontra "João Silva"); resultados mais relevantes primeiro.
+    O header X-Next-Cursor traz o cursor da próxima página.
+    """
+    buscar, ordem = _buscar_clientes(
+        ClienteLead.nome_busca, nome, current_user.id_usuario, cursor, limit
     )
-
+    clientes = await run_db(db, buscar)
+    definir_proximo_cursor(response, clientes, limit, ordem)
     return clientes
 
 
 @router.get("/buscar/empresa/{empresa}", response_model=List[ClienteLeadResponse])
 async def buscar_por_empresa(
     empresa: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: int = Query(20, ge=1, le=LIMITE_BUSCA),
+    cursor: str = None,
+    current_user: User = Depends(get_current_user_async),
+    db: DBSession = Depends(get_async_db),
 ):
-    """Buscar clientes por empresa - apenas do usuário atual"""
-
-    # ✅ FILTRAR APENAS CLIENTES DO USUÁRIO
-    clientes = (
-        db.query(ClienteLead)
-        .filter(
-            ClienteLead.empresa.ilike(f"%{empresa}%"),
-            ClienteLead.id_usuario == current_user.id_usuario,
-        )
-        .all()
+    """
+    Buscar clientes por empresa - apenas do usuário atual.
+    Mesmas regras da busca por nome.
+    """
+    buscar, ordem = _buscar_clientes(
+        ClienteLead.empresa_busca, empresa, current_user.id_usuario, cursor, limit
     )
-
+    clientes = await run_db(db, buscar)
+    definir_proximo_cursor(response, clientes, limit, ordem)
     return clientes
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.database import DBSession, get_async_db, run_db
+from app.utils.eventos import eventos
+from app.utils.security import usuario_do_token
+
+router = APIRouter(prefix="/eventos", tags=["Eventos"])
+
+
+def _liberar_conexao(db: Session) -> None:
+    # A conexão SSE fica aberta por horas: não segura uma conexão do pool
+    db.rollback()
+
+
+@router.get("/")
+async def assinar_eventos(token: str, db: DBSession = Depends(get_async_db)):
+    """
+    Canal Server-Sent Events do usuário (token JWT em ?token=, pois o
+    EventSource do navegador não envia headers). Eventos: "sugestao",
+    "sugestoes" (lote), "chamada", "chamada_removida" e "mensagem", com o
+    JSON de resposta das rotas em data; "sincronizar" avisa que eventos
+    foram descartados e as listagens devem ser recarregadas.
+    """
+    usuario = await usuario_do_token(token, db)
+    await run_db(db, _liberar_conexao)
+
+    return StreamingResponse(
+        eventos.transmitir(usuario.id_usuario, settings.EVENTOS_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,64 +1,176 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
 from sqlalchemy.orm import Session
 
 from app.models.historico_chat import HistoricoChat
 from app.models.user import User
-from app.schemas.historico_chat import HistoricoChatCreate, HistoricoChatResponse
-from app.utils.database import get_db
-from app.utils.security import get_current_user
+from app.schemas.historico_chat import (
+    ContextoChatResponse,
+    HistoricoChatCreate,
+    HistoricoChatResponse,
+    LimpezaHistoricoResponse,
+)
+from app.utils.buffer_chat import BufferCheioError, buffer_mensagens
+from app.utils.campos import (
+    campos_da_resposta,
+    carregar_campos,
+    resposta_com_campos,
+    schema_com_campos,
+)
+from app.utils.contexto_chat import contexto_chat, estimar_tokens
+from app.utils.database import DBSession, get_async_db, get_db, run_db
+from app.utils.eventos import eventos
+from app.utils.historico_chat import limpezas_historico
+from app.utils.pagination import definir_proximo_cursor, paginar
+from app.utils.security import get_current_user, get_current_user_async
 
 router = APIRouter(prefix="/historico-chat", tags=["Histórico de Chat"])
 
+# Resposta com ?fields=: só os campos pedidos
+HistoricoChatCampos = schema_com_campos(HistoricoChatResponse)
+
 
 @router.post(
     "/", response_model=HistoricoChatResponse, status_code=status.HTTP_201_CREATED
 )
-def criar_mensagem(
+async def criar_mensagem(
     mensagem: HistoricoChatCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    """Cria uma nova mensagem no histórico de chat"""
-    nova_mensagem = HistoricoChat(
-        interacao=mensagem.interacao,
-        id_usuario=mensagem.id_usuario,
+    """
+    Cria uma nova mensagem no histórico de chat do usuário autenticado. Com
+    HISTORICO_CHAT_WRITE_BEHIND, responde na hora (id e data_envio gerados no
+    servidor) e a mensagem é gravada em lote logo depois.
+    """
+    if buffer_mensagens.aceitando:
+        try:
+            return buffer_mensagens.adicionar(
+                current_user.id_usuario, mensagem.interacao
+            )
+        except BufferCheioError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado, tente novamente em instantes",
+                headers={"Retry-After": "1"},
+            )
+
+    def criar(db: Session) -> HistoricoChat:
+        nova_mensagem = HistoricoChat(
+            interacao=mensagem.interacao,
+            id_usuario=current_user.id_usuario,
+        )
+        db.add(nova_mensagem)
+        db.commit()
+        db.refresh(nova_mensagem)
+        return nova_mensagem
+
+    nova_mensagem = await run_db(db, criar)
+    contexto_chat.adicionar(nova_mensagem.id_usuario, nova_mensagem)
+    eventos.publicar(
+        nova_mensagem.id_usuario,
+        "mensagem",
+        HistoricoChatResponse.model_validate(nova_mensagem),
     )
-    db.add(nova_mensagem)
-    db.commit()
-    db.refresh(nova_mensagem)
     return nova_mensagem
 
 
-@router.get("/", response_model=list[HistoricoChatResponse])
+@router.get(
+    "/", response_model=list[HistoricoChatCampos], response_model_exclude_unset=True
+)
 def listar_mensagens(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str = None,
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Lista todo o histórico de chat do usuário atual"""
-    mensagens = (
-        db.query(HistoricoChat)
-        .filter(HistoricoChat.id_usuario == current_user.id_usuario)
-        .order_by(HistoricoChat.data_envio.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    """
+    Lista todo o histórico de chat do usuário atual (mais recentes primeiro);
+    fields limita os campos (ex.: fields=id_mensagem,data_envio, sem o texto).
+    O header X-Next-Cursor traz o cursor da próxima página.
+    """
+    query = db.query(HistoricoChat).filter(
+        HistoricoChat.id_usuario == current_user.id_usuario
+    )
+    ordem = (HistoricoChat.data_envio, HistoricoChat.id_mensagem)
+    campos = campos_da_resposta(HistoricoChatResponse, fields)
+    query = carregar_campos(query, HistoricoChat, campos, ordem)
+    mensagens = paginar(query, ordem, cursor, desc=True, skip=skip).limit(limit).all()
+    definir_proximo_cursor(response, mensagens, limit, ordem)
+    return resposta_com_campos(mensagens, campos)
+
+
+@router.get("/contexto", response_model=ContextoChatResponse)
+def montar_contexto(
+    max_caracteres: int = Query(None, ge=1),
+    max_tokens: int = Query(None, ge=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Mensagens mais recentes do usuário que cabem no orçamento (caracteres
+    e/ou tokens estimados), em ordem cronológica, prontas para o prompt.
+    Para na primeira mensagem que não cabe; truncado indica que há mais antigas.
+    """
+    if max_caracteres is None and max_tokens is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe max_caracteres e/ou max_tokens",
+        )
+    mensagens, truncado = contexto_chat.montar(
+        db, current_user.id_usuario, max_caracteres, max_tokens
     )
-    return mensagens
+    return {
+        "mensagens": mensagens,
+        "caracteres": sum(len(m.interacao) for m in mensagens),
+        "tokens": sum(estimar_tokens(m.interacao) for m in mensagens),
+        "truncado": truncado,
+    }
+
+
+@router.get("/limpeza", response_model=LimpezaHistoricoResponse)
+def progresso_limpeza(
+    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+):
+    """
+    Progresso da última limpeza do histórico do usuário (gravado no banco a
+    cada lote, visto de qualquer worker)
+    """
+    limpeza = limpezas_historico.obter(db, current_user.id_usuario)
+    if limpeza is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Nenhuma limpeza encontrada"
+        )
+    return limpeza.resumo()
 
 
-@router.get("/{id_mensagem}", response_model=HistoricoChatResponse)
+@router.get(
+    "/{id_mensagem}",
+    response_model=HistoricoChatCampos,
+    response_model_exclude_unset=True,
+)
 def obter_mensagem(
     id_mensagem: UUID,
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Obtém uma mensagem específica do histórico"""
+    """Obtém uma mensagem específica do histórico (fields limita os campos)"""
+    campos = campos_da_resposta(HistoricoChatResponse, fields)
     mensagem = (
-        db.query(HistoricoChat)
+        carregar_campos(db.query(HistoricoChat), HistoricoChat, campos)
         .filter(
             HistoricoChat.id_mensagem == id_mensagem,
             HistoricoChat.id_usuario == current_user.id_usuario,
@@ -70,7 +182,7 @@ def obter_mensagem(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Mensagem não encontrada"
         )
-    return mensagem
+    return resposta_com_campos(mensagem, campos)
 
 
 @router.delete("/{id_mensagem}", status_code=status.HTTP_204_NO_CONTENT)
@@ -96,17 +208,26 @@ def deletar_mensagem(
 
     db.delete(mensagem)
     db.commit()
+    contexto_chat.invalidar(current_user.id_usuario)
     return None
 
 
-@router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/",
+    response_model=LimpezaHistoricoResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 def limpar_historico(
+    tarefas: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Limpa todo o histórico de chat do usuário"""
-    db.query(HistoricoChat).filter(
-        HistoricoChat.id_usuario == current_user.id_usuario
-    ).delete()
-    db.commit()
-    return None
+    """
+    Limpa o histórico de chat do usuário (mensagens enviadas até o pedido) em
+    segundo plano, em lotes. Acompanhe em GET /historico-chat/limpeza; se já
+    há uma limpeza em andamento, ela é retornada (e retomada se foi abandonada).
+    """
+    limpeza, executar = limpezas_historico.iniciar(db, current_user.id_usuario)
+    if executar:
+        tarefas.add_task(limpezas_historico.executar, limpeza)
+    return limpeza.resumo()
@@ -1,8 +1,9 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
+from app.models.chamada import Chamada
 from app.models.sugestao_ia import SugestaoIA
 from app.models.user import User
 from app.schemas.sugestao_ia import (
@@ -10,11 +11,23 @@ from app.schemas.sugestao_ia import (
     SugestaoIAResponse,
     SugestaoIAUpdate,
 )
+from app.utils.campos import (
+    campos_da_resposta,
+    carregar_campos,
+    resposta_com_campos,
+    schema_com_campos,
+)
 from app.utils.database import get_db
+from app.utils.eventos import eventos
+from app.utils.indice_sugestoes import atualizar_aceite
+from app.utils.pagination import definir_proximo_cursor, paginar
 from app.utils.security import get_current_user
 
 router = APIRouter(prefix="/sugestoes", tags=["Sugestões IA"])
 
+# Resposta com ?fields=: só os campos pedidos
+SugestaoIACampos = schema_com_campos(SugestaoIAResponse)
+
 
 @router.post(
     "/", response_model=SugestaoIAResponse, status_code=status.HTTP_201_CREATED
@@ -24,34 +37,67 @@ def criar_sugestao(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Cria uma nova sugestão de IA"""
+    """Cria uma nova sugestão de IA (em uma chamada do usuário)"""
+    chamada = (
+        db.query(Chamada.id_chamada)
+        .filter(
+            Chamada.id_chamada == sugestao.id_chamada,
+            Chamada.id_usuario == current_user.id_usuario,
+        )
+        .first()
+    )
+    if not chamada:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Chamada não encontrada"
+        )
+
     nova_sugestao = SugestaoIA(
         conteudo=sugestao.conteudo,
         momento=sugestao.momento,
         aceita=sugestao.aceita,
         id_chamada=sugestao.id_chamada,
+        id_usuario=current_user.id_usuario,
+        contexto=sugestao.contexto,
     )
     db.add(nova_sugestao)
     db.commit()
     db.refresh(nova_sugestao)
+    eventos.publicar(
+        current_user.id_usuario,
+        "sugestao",
+        SugestaoIAResponse.model_validate(nova_sugestao),
+    )
+    if nova_sugestao.aceita:
+        atualizar_aceite(
+            current_user.id_usuario,
+            nova_sugestao.id_sugestao,
+            nova_sugestao.contexto,
+            True,
+        )
     return nova_sugestao
 
 
-@router.get("/", response_model=list[SugestaoIAResponse])
+@router.get(
+    "/", response_model=list[SugestaoIACampos], response_model_exclude_unset=True
+)
 def listar_sugestoes(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str = None,
     aceita: bool = None,
     id_chamada: UUID = None,
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Lista todas as sugestões de IA vinculadas às chamadas do usuário"""
-    # Join com Chamada para filtrar pelo usuário autenticado
-    query = (
-        db.query(SugestaoIA)
-        .join(SugestaoIA.chamada)
-        .filter(SugestaoIA.chamada.has(id_usuario=current_user.id_usuario))
+    """
+    Lista as sugestões de IA das chamadas do usuário, por chamada e em ordem
+    de momento (fields=campo1,campo2 escolhe os campos retornados).
+    O header X-Next-Cursor traz o cursor da próxima página.
+    """
+    query = db.query(SugestaoIA).filter(
+        SugestaoIA.id_usuario == current_user.id_usuario
     )
 
     if aceita is not None:
@@ -60,23 +106,30 @@ def listar_sugestoes(
     if id_chamada:
         query = query.filter(SugestaoIA.id_chamada == id_chamada)
 
-    sugestoes = query.offset(skip).limit(limit).all()
-    return sugestoes
+    ordem = (SugestaoIA.id_chamada, SugestaoIA.momento_ordem, SugestaoIA.id_sugestao)
+    campos = campos_da_resposta(SugestaoIAResponse, fields)
+    query = carregar_campos(query, SugestaoIA, campos, ordem)
+    sugestoes = paginar(query, ordem, cursor, skip=skip).limit(limit).all()
+    definir_proximo_cursor(response, sugestoes, limit, ordem)
+    return resposta_com_campos(sugestoes, campos)
 
 
-@router.get("/{id_sugestao}", response_model=SugestaoIAResponse)
+@router.get(
+    "/{id_sugestao}", response_model=SugestaoIACampos, response_model_exclude_unset=True
+)
 def obter_sugestao(
     id_sugestao: UUID,
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Obtém uma sugestão específica"""
+    """Obtém uma sugestão específica (fields=campo1,campo2 limita os campos)"""
+    campos = campos_da_resposta(SugestaoIAResponse, fields)
     sugestao = (
-        db.query(SugestaoIA)
-        .join(SugestaoIA.chamada)
+        carregar_campos(db.query(SugestaoIA), SugestaoIA, campos)
         .filter(
             SugestaoIA.id_sugestao == id_sugestao,
-            SugestaoIA.chamada.has(id_usuario=current_user.id_usuario),
+            SugestaoIA.id_usuario == current_user.id_usuario,
         )
         .first()
     )
@@ -85,7 +138,7 @@ def obter_sugestao(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Sugestão não encontrada"
         )
-    return sugestao
+    return resposta_com_campos(sugestao, campos)
 
 
 @router.put("/{id_sugestao}", response_model=SugestaoIAResponse)
@@ -98,10 +151,9 @@ def atualizar_sugestao(
     """Atualiza uma sugestão existente (marcar como aceita/não aceita)"""
     sugestao = (
         db.query(SugestaoIA)
-        .join(SugestaoIA.chamada)
         .filter(
             SugestaoIA.id_sugestao == id_sugestao,
-            SugestaoIA.chamada.has(id_usuario=current_user.id_usuario),
+            SugestaoIA.id_usuario == current_user.id_usuario,
         )
         .first()
     )
@@ -117,6 +169,13 @@ def atualizar_sugestao(
 
     db.commit()
     db.refresh(sugestao)
+    if "aceita" in update_data:
+        atualizar_aceite(
+            current_user.id_usuario,
+            sugestao.id_sugestao,
+            sugestao.contexto,
+            sugestao.aceita,
+        )
     return sugestao
 
 
@@ -129,10 +188,9 @@ def aceitar_sugestao(
     """Marca uma sugestão como aceita"""
     sugestao = (
         db.query(SugestaoIA)
-        .join(SugestaoIA.chamada)
         .filter(
             SugestaoIA.id_sugestao == id_sugestao,
-            SugestaoIA.chamada.has(id_usuario=current_user.id_usuario),
+            SugestaoIA.id_usuario == current_user.id_usuario,
         )
         .first()
     )
@@ -145,6 +203,10 @@ def aceitar_sugestao(
     sugestao.aceita = True
     db.commit()
     db.refresh(sugestao)
+    # Contextos parecidos passam a ser respondidos com esta sugestão
+    atualizar_aceite(
+        current_user.id_usuario, sugestao.id_sugestao, sugestao.contexto, True
+    )
     return sugestao
 
 
@@ -157,10 +219,9 @@ def deletar_sugestao(
     """Deleta uma sugestão"""
     sugestao = (
         db.query(SugestaoIA)
-        .join(SugestaoIA.chamada)
         .filter(
             SugestaoIA.id_sugestao == id_sugestao,
-            SugestaoIA.chamada.has(id_usuario=current_user.id_usuario),
+            SugestaoIA.id_usuario == current_user.id_usuario,
         )
         .first()
     )
@@ -170,6 +231,9 @@ def deletar_sugestao(
             status_code=status.HTTP_404_NOT_FOUND, detail="Sugestão não encontrada"
         )
 
+    aceita = sugestao.aceita
     db.delete(sugestao)
     db.commit()
+    if aceita:
+        atualizar_aceite(current_user.id_usuario, id_sugestao, None, False)
     return None
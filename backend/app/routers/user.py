@@ -1,22 +1,24 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime
 from decimal import Decimal
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import extract, func
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.models.cliente import ClienteLead
 from app.models.user import User
-from app.models.venda import Venda
+from app.models.venda_resumo import VendaResumoMensal
 from app.schemas.user import UserResponse
-from app.utils.database import get_db
-from app.utils.security import get_current_user
+from app.utils.dashboard_cache import guardar_estatisticas, obter_estatisticas_em_cache
+from app.utils.database import DBSession, get_async_db, run_db
+from app.utils.security import get_current_user_async
 
 router = APIRouter(prefix="/user", tags=["User"])
 
 
 @router.get("/dashboard", response_model=UserResponse)
-async def get_dashboard(current_user: User = Depends(get_current_user)):
+async def get_dashboard(current_user: User = Depends(get_current_user_async)):
     """
     Endpoint protegido - Dashboard do usuário
     Retorna informações do usuário autenticado
@@ -24,53 +26,90 @@ async def get_dashboard(current_user: User = Depends(get_current_user)):
     return current_user
 
 
-@router.get("/dashboard/stats")
-async def get_dashboard_stats(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
-):
-    """
-    Retorna estatísticas do dashboard do usuário
-    """
+MESES = [
+    "Jan",
+    "Fev",
+    "Mar",
+    "Abr",
+    "Mai",
+    "Jun",
+    "Jul",
+    "Ago",
+    "Set",
+    "Out",
+    "Nov",
+    "Dez",
+]
+
+
+def _meses_anteriores(referencia: datetime, quantidade: int) -> list[date]:
+    """Primeiro dia dos últimos `quantidade` meses de calendário (o atual por último)"""
+    meses = []
+    ano, mes = referencia.year, referencia.month
+    for _ in range(quantidade):
+        meses.append(date(ano, mes, 1))
+        ano, mes = (ano - 1, 12) if mes == 1 else (ano, mes - 1)
+    return list(reversed(meses))
+
+
+def _calcular_estatisticas(db: Session, id_usuario: UUID) -> dict:
+    """Calcula as estatísticas do dashboard (executado fora do event loop)"""
 
-    # Data atual e mês anterior
     now = datetime.now()
-    primeiro_dia_mes = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    primeiro_dia_mes_anterior = (primeiro_dia_mes - timedelta(days=1)).replace(day=1)
-    ultimo_dia_mes_anterior = primeiro_dia_mes - timedelta(seconds=1)
+    meses = _meses_anteriores(now, 7)  # 7 meses (incluindo o atual)
+    primeiro_dia_mes = meses[-1]
+    primeiro_dia_mes_anterior = meses[-2]
 
     # ========================================
-    # VENDAS DO MÊS ATUAL
+    # UMA ÚNICA CONSULTA ao resumo mensal (O(meses) linhas por usuário),
+    # com agregados condicionais por status
+    # (o total de clientes vem como subconsulta escalar, avaliada uma vez)
     # ========================================
-    vendas_mes_atual = db.query(func.sum(Venda.valor)).filter(
-        Venda.id_usuario == current_user.id_usuario,
-        Venda.data_criacao >= primeiro_dia_mes,
-        Venda.status == "fechada",
-    ).scalar() or Decimal(0)
-
-    # VENDAS DO MÊS ANTERIOR
-    vendas_mes_anterior = db.query(func.sum(Venda.valor)).filter(
-        Venda.id_usuario == current_user.id_usuario,
-        Venda.data_criacao >= primeiro_dia_mes_anterior,
-        Venda.data_criacao <= ultimo_dia_mes_anterior,
-        Venda.status == "fechada",
-    ).scalar() or Decimal(0)
+    fechada = VendaResumoMensal.status == "fechada"
+    total_clientes_sq = (
+        select(func.count(ClienteLead.id_cliente))
+        .where(ClienteLead.id_usuario == id_usuario)
+        .scalar_subquery()
+    )
+
+    linhas = db.execute(
+        select(
+            VendaResumoMensal.mes,
+            func.sum(VendaResumoMensal.quantidade).label("total"),
+            func.coalesce(
+                func.sum(VendaResumoMensal.quantidade).filter(fechada), 0
+            ).label("fechadas"),
+            func.sum(VendaResumoMensal.valor_total)
+            .filter(fechada)
+            .label("valor_fechadas"),
+            total_clientes_sq.label("total_clientes"),
+        )
+        .where(VendaResumoMensal.id_usuario == id_usuario)
+        .group_by(VendaResumoMensal.mes)
+    ).all()
+
+    if linhas:
+        total_clientes = linhas[0].total_clientes or 0
+    else:
+        total_clientes = db.execute(select(total_clientes_sq)).scalar() or 0
+
+    por_mes = {linha.mes: linha for linha in linhas}
+
+    def valor_fechado(inicio: date) -> Decimal:
+        linha = por_mes.get(inicio)
+        return (linha.valor_fechadas or Decimal(0)) if linha else Decimal(0)
 
     # ========================================
-    # TOTAL DE CLIENTES (LEADS ATIVOS)
+    # TOTAIS
     # ========================================
-    total_clientes = (
-        db.query(func.count(ClienteLead.id_cliente))
-        .filter(ClienteLead.id_usuario == current_user.id_usuario)
-        .scalar()
-        or 0
+    total_vendas = sum(linha.total for linha in linhas)
+    total_vendas_fechadas = sum(linha.fechadas for linha in linhas)
+    valor_total_fechado = sum(
+        (linha.valor_fechadas or Decimal(0) for linha in linhas), Decimal(0)
     )
 
-    total_vendas = (
-        db.query(func.count(Venda.id_cliente))
-        .filter(Venda.id_usuario == current_user.id_usuario)
-        .scalar()
-        or 0
-    )
+    vendas_mes_atual = valor_fechado(primeiro_dia_mes)
+    vendas_mes_anterior = valor_fechado(primeiro_dia_mes_anterior)
 
     # Clientes criados no mês anterior (para comparação)
     # Como não temos data_criacao em ClienteLead, vamos usar uma estimativa
@@ -78,15 +117,8 @@ async def get_dashboard_stats(
     total_clientes_mes_anterior = total_clientes  # Placeholder
 
     # ========================================
-    # CONVERSÃO (Vendas fechadas / Total de clientes)
+    # CONVERSÃO (Vendas fechadas / Total de vendas)
     # ========================================
-    total_vendas_fechadas = (
-        db.query(func.count(Venda.id_venda))
-        .filter(Venda.id_usuario == current_user.id_usuario, Venda.status == "fechada")
-        .scalar()
-        or 0
-    )
-
     conversao_rate = (
         (total_vendas_fechadas / total_vendas * 100) if total_vendas > 0 else 0
     )
@@ -94,66 +126,24 @@ async def get_dashboard_stats(
     # ========================================
     # TICKET MÉDIO
     # ========================================
-    ticket_medio = db.query(func.avg(Venda.valor)).filter(
-        Venda.id_usuario == current_user.id_usuario, Venda.status == "fechada"
-    ).scalar() or Decimal(0)
+    ticket_medio = (
+        valor_total_fechado / total_vendas_fechadas
+        if total_vendas_fechadas > 0
+        else Decimal(0)
+    )
 
     # ========================================
     # VENDAS POR MÊS (últimos 7 meses)
     # ========================================
     vendas_por_mes = []
-
-    for i in range(6, -1, -1):  # 7 meses (incluindo o atual)
-        data_ref = now - timedelta(days=30 * i)
-        primeiro_dia = data_ref.replace(
-            day=1, hour=0, minute=0, second=0, microsecond=0
-        )
-
-        if i > 0:
-            ultimo_dia = (primeiro_dia + timedelta(days=32)).replace(day=1) - timedelta(
-                seconds=1
-            )
-        else:
-            ultimo_dia = now
-
-        total_mes = db.query(func.sum(Venda.valor)).filter(
-            Venda.id_usuario == current_user.id_usuario,
-            Venda.data_criacao >= primeiro_dia,
-            Venda.data_criacao <= ultimo_dia,
-            Venda.status == "fechada",
-        ).scalar() or Decimal(0)
-
-        quantidade_mes = (
-            db.query(func.count(Venda.id_venda))
-            .filter(
-                Venda.id_usuario == current_user.id_usuario,
-                Venda.data_criacao >= primeiro_dia,
-                Venda.data_criacao <= ultimo_dia,
-                Venda.status == "fechada",
-            )
-            .scalar()
-            or 0
-        )
-
-        # Nome do mês em português
-        meses = [
-            "Jan",
-            "Fev",
-            "Mar",
-            "Abr",
-            "Mai",
-            "Jun",
-            "Jul",
-            "Ago",
-            "Set",
-            "Out",
-            "Nov",
-            "Dez",
-        ]
-        mes_nome = meses[data_ref.month - 1]
-
+    for inicio in meses:
+        linha = por_mes.get(inicio)
         vendas_por_mes.append(
-            {"mes": mes_nome, "total": float(total_mes), "quantidade": quantidade_mes}
+            {
+                "mes": MESES[inicio.month - 1],
+                "total": float(valor_fechado(inicio)),
+                "quantidade": linha.fechadas if linha else 0,
+            }
         )
 
     # ========================================
@@ -179,3 +169,18 @@ async def get_dashboard_stats(
         "vendas_por_mes": vendas_por_mes,
         "total_vendas": total_vendas,
     }
+
+
+@router.get("/dashboard/stats")
+async def get_dashboard_stats(
+    current_user: User = Depends(get_current_user_async),
+    db: DBSession = Depends(get_async_db),
+):
+    """
+    Retorna estatísticas do dashboard do usuário
+    """
+    estatisticas = await obter_estatisticas_em_cache(current_user.id_usuario)
+    if estatisticas is None:
+        estatisticas = await run_db(db, _calcular_estatisticas, current_user.id_usuario)
+        await guardar_estatisticas(current_user.id_usuario, estatisticas)
+    return estatisticas
@@ -1,16 +1,33 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.models.user import User
 from app.models.venda import Venda
 from app.schemas.venda import VendaCreate, VendaResponse, VendaUpdate
+from app.utils.campos import (
+    campos_da_resposta,
+    carregar_campos,
+    resposta_com_campos,
+    schema_com_campos,
+)
+from app.utils.dashboard_cache import invalidar_estatisticas
 from app.utils.database import get_db
+from app.utils.exportacao import resposta_exportacao
+from app.utils.pagination import definir_proximo_cursor, paginar
+from app.utils.resumo_vendas import aplicar_venda
 from app.utils.security import get_current_user
 
 router = APIRouter(prefix="/vendas", tags=["Vendas"])
 
+# Resposta com ?fields=: só os campos pedidos
+VendaCampos = schema_com_campos(VendaResponse)
+
+# Colunas omitidas da listagem (a menos que pedidas em ?fields=)
+CAMPOS_PESADOS = ("observacoes",)
+
 
 @router.post("/", response_model=VendaResponse, status_code=status.HTTP_201_CREATED)
 def criar_venda(
@@ -29,38 +46,86 @@ def criar_venda(
         id_usuario=venda.id_usuario or current_user.id_usuario,
     )
     db.add(nova_venda)
+    db.flush()  # preenche data_criacao para o resumo mensal
+    aplicar_venda(db, nova_venda)
     db.commit()
     db.refresh(nova_venda)
+    invalidar_estatisticas(nova_venda.id_usuario)
     return nova_venda
 
 
-@router.get("/", response_model=list[VendaResponse])
+@router.get("/", response_model=list[VendaCampos], response_model_exclude_unset=True)
 def listar_vendas(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str = None,
     status_filter: str = None,
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Lista todas as vendas do usuário atual"""
+    """
+    Lista todas as vendas do usuário atual (mais recentes primeiro), sem as
+    observações; fields=campo1,campo2 escolhe os campos retornados.
+    O header X-Next-Cursor traz o cursor da próxima página.
+    """
     query = db.query(Venda).filter(Venda.id_usuario == current_user.id_usuario)
 
     if status_filter:
         query = query.filter(Venda.status == status_filter)
 
-    vendas = query.offset(skip).limit(limit).all()
-    return vendas
+    ordem = (Venda.data_criacao, Venda.id_venda)
+    campos = campos_da_resposta(VendaResponse, fields, CAMPOS_PESADOS)
+    query = carregar_campos(query, Venda, campos, ordem)
+    vendas = paginar(query, ordem, cursor, desc=True, skip=skip).limit(limit).all()
+    definir_proximo_cursor(response, vendas, limit, ordem)
+    return resposta_com_campos(vendas, campos)
+
+
+@router.get("/exportar")
+def exportar_vendas(
+    request: Request,
+    formato: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status_filter: str = None,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Exporta todas as vendas do usuário atual (mais recentes primeiro) em CSV
+    ou NDJSON, em streaming. Compactado em gzip se o cliente aceitar.
+    """
+    consulta = select(
+        Venda.id_venda,
+        Venda.titulo,
+        Venda.valor,
+        Venda.status,
+        Venda.data_fechamento,
+        Venda.observacoes,
+        Venda.id_cliente,
+        Venda.data_criacao,
+        Venda.data_atualizacao,
+    ).where(Venda.id_usuario == current_user.id_usuario)
 
+    if status_filter:
+        consulta = consulta.where(Venda.status == status_filter)
 
-@router.get("/{id_venda}", response_model=VendaResponse)
+    consulta = consulta.order_by(Venda.data_criacao.desc(), Venda.id_venda.desc())
+    return resposta_exportacao(consulta, formato, "vendas", request)
+
+
+@router.get(
+    "/{id_venda}", response_model=VendaCampos, response_model_exclude_unset=True
+)
 def obter_venda(
     id_venda: UUID,
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Obtém uma venda específica"""
+    """Obtém uma venda específica (fields=campo1,campo2 limita os campos)"""
+    campos = campos_da_resposta(VendaResponse, fields)
     venda = (
-        db.query(Venda)
+        carregar_campos(db.query(Venda), Venda, campos)
         .filter(Venda.id_venda == id_venda, Venda.id_usuario == current_user.id_usuario)
         .first()
     )
@@ -69,7 +134,7 @@ def obter_venda(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Venda não encontrada"
         )
-    return venda
+    return resposta_com_campos(venda, campos)
 
 
 @router.put("/{id_venda}", response_model=VendaResponse)
@@ -80,9 +145,12 @@ def atualizar_venda(
     current_user: User = Depends(get_current_user),
 ):
     """Atualiza uma venda existente"""
+    # FOR UPDATE: duas alterações simultâneas da mesma venda retiram do resumo
+    # a versão que de fato está no banco, uma depois da outra
     venda = (
         db.query(Venda)
         .filter(Venda.id_venda == id_venda, Venda.id_usuario == current_user.id_usuario)
+        .with_for_update()
         .first()
     )
 
@@ -92,11 +160,21 @@ def atualizar_venda(
         )
 
     update_data = venda_update.model_dump(exclude_unset=True)
+
+    # Status e valor entram no resumo mensal: retira a versão antiga e soma a nova
+    altera_resumo = "status" in update_data or "valor" in update_data
+    if altera_resumo:
+        aplicar_venda(db, venda, -1)
+
     for field, value in update_data.items():
         setattr(venda, field, value)
 
+    if altera_resumo:
+        aplicar_venda(db, venda)
+
     db.commit()
     db.refresh(venda)
+    invalidar_estatisticas(venda.id_usuario)
     return venda
 
 
@@ -110,6 +188,7 @@ def deletar_venda(
     venda = (
         db.query(Venda)
         .filter(Venda.id_venda == id_venda, Venda.id_usuario == current_user.id_usuario)
+        .with_for_update()
         .first()
     )
 
@@ -118,6 +197,8 @@ def deletar_venda(
             status_code=status.HTTP_404_NOT_FOUND, detail="Venda não encontrada"
         )
 
+    aplicar_venda(db, venda, -1)
     db.delete(venda)
     db.commit()
+    invalidar_estatisticas(current_user.id_usuario)
     return None
@@ -2,18 +2,29 @@ from app.schemas.chamada import (
     ChamadaCreate,
     ChamadaResponse,
     ChamadaUpdate,
+    TranscricaoSegmentoCreate,
 )
 from app.schemas.cliente import (
+    ClienteAutocompleteResponse,
     ClienteLeadCreate,
     ClienteLeadResponse,
     ClienteLeadUpdate,
+    ImportacaoClientesResponse,
+    ImportacaoErro,
 )
 from app.schemas.historico_chat import (
+    ContextoChatResponse,
     HistoricoChatCreate,
     HistoricoChatResponse,
+    LimpezaHistoricoResponse,
 )
 from app.schemas.sugestao_ia import (
+    SugestaoIAAceite,
+    SugestaoIAAceiteResponse,
     SugestaoIACreate,
+    SugestaoIAGerar,
+    SugestaoIALoteItem,
+    SugestaoIALoteResponse,
     SugestaoIAResponse,
     SugestaoIAUpdate,
 )
@@ -39,6 +50,9 @@ __all__ = [
     "ClienteLeadCreate",
     "ClienteLeadUpdate",
     "ClienteLeadResponse",
+    "ClienteAutocompleteResponse",
+    "ImportacaoClientesResponse",
+    "ImportacaoErro",
     # Venda
     "VendaCreate",
     "VendaUpdate",
@@ -47,11 +61,19 @@ __all__ = [
     "ChamadaCreate",
     "ChamadaUpdate",
     "ChamadaResponse",
+    "TranscricaoSegmentoCreate",
     # Sugestão IA
     "SugestaoIACreate",
     "SugestaoIAUpdate",
     "SugestaoIAResponse",
+    "SugestaoIALoteItem",
+    "SugestaoIALoteResponse",
+    "SugestaoIAAceite",
+    "SugestaoIAAceiteResponse",
+    "SugestaoIAGerar",
     # Histórico Chat
     "HistoricoChatCreate",
     "HistoricoChatResponse",
+    "LimpezaHistoricoResponse",
+    "ContextoChatResponse",
 ]
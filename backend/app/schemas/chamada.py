@@ -11,7 +11,7 @@ class ChamadaCreate(BaseModel):
     duracao: Optional[int] = Field(None, ge=0)
     resultado: Optional[str] = Field(None, pattern="^(sucesso|falha|em_andamento)$")
     transcricao: Optional[str] = None
-    id_usuario: UUID
+    id_usuario: Optional[UUID] = None  # ignorado: a chamada é do usuário autenticado
     id_cliente: UUID
     id_venda: Optional[UUID] = None
 
@@ -24,6 +24,12 @@ class ChamadaUpdate(BaseModel):
     id_venda: Optional[UUID] = None
 
 
+# Trecho da transcrição de uma chamada em andamento
+class TranscricaoSegmentoCreate(BaseModel):
+    texto: str = Field(..., min_length=1)
+    momento: Optional[datetime] = None  # padrão: instante do recebimento
+
+
 # Schema de resposta da chamada
 class ChamadaResponse(BaseModel):
     id_chamada: UUID
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, EmailStr, Field
@@ -36,3 +36,29 @@ class ClienteLeadResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Schema de resposta do autocomplete (campos exibidos no HUD)
+class ClienteAutocompleteResponse(BaseModel):
+    id_cliente: UUID
+    nome: str
+    empresa: Optional[str]
+    e_mail: Optional[str]
+    telefone: Optional[str]
+
+    class Config:
+        from_attributes = True
+
+
+# Erro de uma linha da importação em massa
+class ImportacaoErro(BaseModel):
+    linha: int
+    erros: List[str]
+
+
+# Relatório da importação em massa de clientes
+class ImportacaoClientesResponse(BaseModel):
+    total: int
+    importados: int
+    com_erro: int
+    erros: List[ImportacaoErro]  # limitado às primeiras linhas com erro
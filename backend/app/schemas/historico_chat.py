@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -8,7 +8,7 @@ from pydantic import BaseModel, Field
 # Schema para criação de mensagem
 class HistoricoChatCreate(BaseModel):
     interacao: str = Field(..., min_length=1)
-    id_usuario: UUID
+    id_usuario: Optional[UUID] = None  # ignorado: a mensagem é do usuário autenticado
 
 
 # Schema de resposta da mensagem
@@ -20,3 +20,21 @@ class HistoricoChatResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Progresso da limpeza do histórico (DELETE /historico-chat)
+class LimpezaHistoricoResponse(BaseModel):
+    id_limpeza: UUID
+    status: str  # pendente, em_andamento, concluida ou falha
+    total: Optional[int]  # mensagens a remover (conhecido ao começar)
+    removidas: int
+    iniciada_em: datetime
+    concluida_em: Optional[datetime]
+
+
+# Mensagens mais recentes que cabem no orçamento (ordem cronológica)
+class ContextoChatResponse(BaseModel):
+    mensagens: List[HistoricoChatResponse]
+    caracteres: int
+    tokens: int  # estimativa (~4 caracteres por token)
+    truncado: bool  # há mensagens mais antigas fora do contexto
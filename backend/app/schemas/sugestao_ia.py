@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -10,6 +10,7 @@ class SugestaoIACreate(BaseModel):
     momento: Optional[int] = Field(None, ge=0)
     aceita: bool = False
     id_chamada: UUID
+    contexto: Optional[str] = Field(None, max_length=20000)  # trecho da conversa
 
 
 # Schema para atualização de sugestão
@@ -17,6 +18,37 @@ class SugestaoIAUpdate(BaseModel):
     aceita: Optional[bool] = None
 
 
+# Sugestão do lote de uma chamada (id_chamada vem da URL)
+class SugestaoIALoteItem(BaseModel):
+    conteudo: str = Field(..., min_length=10)
+    momento: Optional[int] = Field(None, ge=0)
+    aceita: bool = False
+    contexto: Optional[str] = Field(None, max_length=20000)
+
+
+# Ids das sugestões criadas em lote (na ordem enviada)
+class SugestaoIALoteResponse(BaseModel):
+    ids: List[UUID]
+
+
+# Aceite (ou recusa) de uma sugestão no lote
+class SugestaoIAAceite(BaseModel):
+    id_sugestao: UUID
+    aceita: bool = True
+
+
+# Resultado do aceite em lote
+class SugestaoIAAceiteResponse(BaseModel):
+    atualizadas: int
+    nao_encontradas: List[UUID]
+
+
+# Pedido de sugestão ao gateway de IA (trecho recente da conversa)
+class SugestaoIAGerar(BaseModel):
+    contexto: str = Field(..., min_length=1, max_length=20000)
+    momento: Optional[int] = Field(None, ge=0)
+
+
 # Schema de resposta da sugestão
 class SugestaoIAResponse(BaseModel):
     id_sugestao: UUID
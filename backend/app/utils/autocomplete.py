@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.cliente import ClienteLead
+from app.utils.busca import normalizar_busca, palavras_busca
+from app.utils.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Máximo de entradas do índice examinadas por consulta: mantém a latência
+# constante mesmo para prefixos muito comuns ("a", "jo")
+MAX_CANDIDATOS = 500
+
+
+class ClienteResumo(NamedTuple):
+    id_cliente: UUID
+    nome: str
+    empresa: Optional[str]
+    e_mail: Optional[str]
+    telefone: Optional[str]
+
+
+def _texto_do_cliente(nome_busca, empresa_busca, e_mail) -> str:
+    """Palavras normalizadas de nome, empresa e e-mail, separadas por espaço"""
+    return " ".join(
+        palavras_busca(nome_busca)
+        + palavras_busca(empresa_busca)
+        + palavras_busca(e_mail)
+    )
+
+
+def resumo_do_cliente(cliente: ClienteLead) -> tuple[ClienteResumo, str]:
+    """Dados exibidos e texto indexado de um cliente já gravado"""
+    resumo = ClienteResumo(
+        cliente.id_cliente,
+        cliente.nome,
+        cliente.empresa,
+        cliente.e_mail,
+        cliente.telefone,
+    )
+    texto = _texto_do_cliente(cliente.nome_busca, cliente.empresa_busca, cliente.e_mail)
+    return resumo, texto
+
+
+class IndicePrefixos:
+    """
+    Palavras de nome, empresa e e-mail dos clientes de um usuário: lista
+    ordenada das palavras distintas (busca por prefixo com bisect) e, para
+    cada palavra, os clientes que a contêm.
+    """
+
+    def __init__(self):
+        self._palavras: list[str] = []
+        self._postings: dict[str, list[int]] = {}
+        self._clientes: dict[int, tuple[ClienteResumo, str]] = {}
+        self._slot_por_id: dict[UUID, int] = {}
+        self._proximo_slot = 0
+        self._entradas = 0
+        self.criado_em = time.monotonic()
+
+    @classmethod
+    def construir(cls, linhas) -> "IndicePrefixos":
+        """linhas: (resumo, texto normalizado) de cada cliente"""
+        indice = cls()
+        postings = indice._postings
+        for resumo, texto in linhas:
+            slot = indice._novo_slot(resumo, texto)
+            for palavra in set(texto.split()):
+                postings.setdefault(palavra, []).append(slot)
+                indice._entradas += 1
+        indice._palavras = sorted(postings)
+        return indice
+
+    def __len__(self) -> int:
+        return self._entradas
+
+    def _novo_slot(self, resumo: ClienteResumo, texto: str) -> int:
+        slot = self._proximo_slot
+        self._proximo_slot += 1
+        self._clientes[slot] = (resumo, texto)
+        self._slot_por_id[resumo.id_cliente] = slot
+        return slot
+
+    def salvar(self, resumo: ClienteResumo, texto: str) -> None:
+        """Insere ou substitui um cliente"""
+        self.remover(resumo.id_cliente)
+        slot = self._novo_slot(resumo, texto)
+        for palavra in set(texto.split()):
+            slots = self._postings.get(palavra)
+            if slots is None:
+                insort(self._palavras, palavra)
+                slots = self._postings[palavra] = []
+            slots.append(slot)
+            self._entradas += 1
+
+    def remover(self, id_cliente: UUID) -> None:
+        slot = self._slot_por_id.pop(id_cliente, None)
+        if slot is None:
+            return
+        _, texto = self._clientes.pop(slot)
+        for palavra in set(texto.split()):
+            slots = self._postings[palavra]
+            slots.remove(slot)
+            self._entradas -= 1
+            if not slots:
+                del self._postings[palavra]
+                del self._palavras[bisect_left(self._palavras, palavra)]
+
+    def buscar(self, termo: str, limit: int) -> list[ClienteResumo]:
+        """
+        Clientes em que cada palavra do termo é prefixo de alguma palavra do
+        nome, empresa ou e-mail. Nomes que começam com o termo vêm primeiro.
+        """
+        palavras = palavras_busca(termo)
+        if not palavras:
+            return []
+
+        # A palavra mais longa costuma ser a mais seletiva
+        sonda = max(palavras, key=len)
+        outras = [" " + p for p in palavras if p != sonda]
+
+        encontrados = []
+        vistos = set()
+        i = bisect_left(self._palavras, sonda)
+        while (
+            i < len(self._palavras)
+            and self._palavras[i].startswith(sonda)
+            and len(vistos) < MAX_CANDIDATOS
+        ):
+            for slot in self._postings[self._palavras[i]][
+                : MAX_CANDIDATOS - len(vistos)
+            ]:
+                if slot in vistos:
+                    continue
+                vistos.add(slot)
+                resumo, texto = self._clientes[slot]
+                if all(o in " " + texto for o in outras):
+                    encontrados.append((resumo, texto))
+            i += 1
+
+        inicio = " ".join(palavras)
+        encontrados.sort(
+            key=lambda item: (
+                not item[1].startswith(inicio),
+                len(item[0].nome),
+                item[0].nome,
+            )
+        )
+        return [resumo for resumo, _ in encontrados[:limit]]
+
+
+def carregar_indice(db: Session, id_usuario: UUID) -> IndicePrefixos:
+    """Monta o índice com todos os clientes do usuário"""
+    linhas = db.execute(
+        select(
+            ClienteLead.id_cliente,
+            ClienteLead.nome,
+            ClienteLead.empresa,
+            ClienteLead.e_mail,
+            ClienteLead.telefone,
+            ClienteLead.nome_busca,
+            ClienteLead.empresa_busca,
+        ).where(ClienteLead.id_usuario == id_usuario)
+    ).tuples()
+
+    return IndicePrefixos.construir(
+        (
+            ClienteResumo(id_cliente, nome, empresa, e_mail, telefone),
+            _texto_do_cliente(
+                nome_busca or normalizar_busca(nome),
+                empresa_busca or normalizar_busca(empresa),
+                e_mail,
+            ),
+        )
+        for (
+            id_cliente,
+            nome,
+            empresa,
+            e_mail,
+            telefone,
+            nome_busca,
+            empresa_busca,
+        ) in linhas
+    )
+
+
+def _carregar_do_banco(id_usuario: UUID) -> IndicePrefixos:
+    db = SessionLocal()
+    try:
+        return carregar_indice(db, id_usuario)
+    finally:
+        db.close()
+
+
+class AutocompleteClientes:
+    """
+    Índices de prefixo por usuário mantidos em memória. Limitado pelo total de
+    palavras indexadas: ao passar do limite, descarta os usuários usados há
+    mais tempo (LRU). Cada índice é recarregado do banco após o TTL, o que
+    também recolhe gravações feitas por outros workers.
+    """
+
+    def __init__(self, max_chaves: int, ttl: float):
+        self.max_chaves = max_chaves
+        self.ttl = ttl
+        self._indices: "OrderedDict[UUID, IndicePrefixos]" = OrderedDict()
+        # Contador de gravações por usuário: um índice carregado enquanto o
+        # usuário gravava clientes sai desatualizado e não é guardado
+        self._geracoes: dict[UUID, int] = {}
+        self._carregando: dict[UUID, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _instalar(self, id_usuario: UUID, indice: IndicePrefixos, geracao: int):
+        with self._lock:
+            if self._geracoes.get(id_usuario, 0) != geracao or self.max_chaves <= 0:
+                return
+            self._indices[id_usuario] = indice
+            self._indices.move_to_end(id_usuario)
+            total = sum(len(i) for i in self._indices.values())
+            while total > self.max_chaves and len(self._indices) > 1:
+                _, descartado = self._indices.popitem(last=False)
+                total -= len(descartado)
+                self.evictions += 1
+
+    async def _carregar(self, id_usuario: UUID, geracao: int) -> None:
+        try:
+            indice = await run_in_threadpool(_carregar_do_banco, id_usuario)
+        except Exception:
+            # A próxima busca do usuário tenta de novo
+            logger.exception("Falha ao carregar o autocomplete de %s", id_usuario)
+            return
+        finally:
+            with self._lock:
+                self._carregando.pop(id_usuario, None)
+        self._instalar(id_usuario, indice, geracao)
+
+    def buscar(
+        self, id_usuario: UUID, termo: str, limit: int
+    ) -> Optional[list[ClienteResumo]]:
+        """
+        Busca no índice do usuário (chamar de dentro do event loop). Retorna
+        None se o índice ainda não está em memória: ele passa a ser carregado
+        em segundo plano e a rota responde pelo banco enquanto isso. Um índice
+        vencido (TTL) continua respondendo enquanto é recarregado.
+        """
+        with self._lock:
+            indice = self._indices.get(id_usuario)
+            vencido = indice is None or indice.criado_em + self.ttl <= time.monotonic()
+            if vencido and id_usuario not in self._carregando:
+                geracao = self._geracoes.get(id_usuario, 0)
+                self._carregando[id_usuario] = asyncio.get_running_loop().create_task(
+                    self._carregar(id_usuario, geracao)
+                )
+
+            if indice is None:
+                self.misses += 1
+                return None
+            self._indices.move_to_end(id_usuario)
+            self.hits += 1
+            return indice.buscar(termo, limit)
+
+    def salvar_cliente(self, cliente: ClienteLead) -> None:
+        """Atualiza o índice após criar/alterar um cliente (se estiver carregado)"""
+        resumo, texto = resumo_do_cliente(cliente)
+        with self._lock:
+            self._geracoes[cliente.id_usuario] = (
+                self._geracoes.get(cliente.id_usuario, 0) + 1
+            )
+            indice = self._indices.get(cliente.id_usuario)
+            if indice is not None:
+                indice.salvar(resumo, texto)
+
+    def remover_cliente(self, id_usuario: UUID, id_cliente: UUID) -> None:
+        """Retira um cliente excluído do índice (se estiver carregado)"""
+        with self._lock:
+            self._geracoes[id_usuario] = self._geracoes.get(id_usuario, 0) + 1
+            indice = self._indices.get(id_usuario)
+            if indice is not None:
+                indice.remover(id_cliente)
+
+    def invalidar(self, id_usuario: UUID) -> None:
+        """Descarta o índice do usuário (ex.: após gravações em massa)"""
+        with self._lock:
+            self._geracoes[id_usuario] = self._geracoes.get(id_usuario, 0) + 1
+            self._indices.pop(id_usuario, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "usuarios": len(self._indices),
+                "chaves": sum(len(i) for i in self._indices.values()),
+                "max_chaves": self.max_chaves,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+autocomplete_clientes = AutocompleteClientes(
+    max_chaves=settings.AUTOCOMPLETE_MAX_CHAVES,
+    ttl=settings.AUTOCOMPLETE_TTL_SECONDS,
+)
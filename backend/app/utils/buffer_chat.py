@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.historico_chat import HistoricoChat
+from app.schemas.historico_chat import HistoricoChatResponse
+from app.utils.contexto_chat import contexto_chat
+from app.utils.database import SessionLocal
+from app.utils.eventos import eventos
+
+logger = logging.getLogger(__name__)
+
+
+class BufferCheioError(Exception):
+    """Buffer de mensagens cheio - o request deve ser rejeitado"""
+
+
+def gravar_mensagens(db: Session, linhas: list[dict]) -> None:
+    """Grava as mensagens com um único INSERT (executemany)"""
+    db.execute(insert(HistoricoChat), linhas)
+    db.commit()
+
+
+def _gravar_uma_a_uma(db: Session, linhas: list[dict]) -> list[dict]:
+    """Grava as linhas válidas do lote; descarta as que violam restrições"""
+    gravadas = []
+    for linha in linhas:
+        try:
+            with db.begin_nested():
+                db.execute(insert(HistoricoChat), linha)
+            gravadas.append(linha)
+        except IntegrityError:
+            logger.warning(
+                "Mensagem %s descartada (usuário %s removido?)",
+                linha["id_mensagem"],
+                linha["id_usuario"],
+            )
+    db.commit()
+    return gravadas
+
+
+class BufferMensagens:
+    """
+    Write-behind das mensagens do chat (por worker): POST /historico-chat
+    valida a mensagem, gera id e data_envio no servidor e responde na hora;
+    uma tarefa grava as pendentes em lote ao juntar `lote` mensagens ou a
+    cada `intervalo` segundos. Com `maximo` mensagens pendentes (banco lento
+    ou fora do ar), novas mensagens são rejeitadas. No desligamento, grava
+    tudo antes de sair.
+    """
+
+    def __init__(self, ativo: bool, lote: int, intervalo: float, maximo: int):
+        self.ativo = ativo
+        self.lote = lote
+        self.intervalo = intervalo
+        self.maximo = maximo
+        self._pendentes: deque[dict] = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._acordar: Optional[asyncio.Event] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._fechando = False
+        self.gravadas = 0
+        self.lotes = 0
+        self.rejeitadas = 0
+        self.falhas = 0
+
+    @property
+    def aceitando(self) -> bool:
+        """False antes de iniciar e ao fechar: a rota grava direto no banco"""
+        return self._tarefa is not None and not self._fechando
+
+    def iniciar(self) -> None:
+        """Inicia a tarefa de gravação (no startup, dentro do event loop)"""
+        if not self.ativo or self._tarefa is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._acordar = asyncio.Event()
+        self._fechando = False
+        self._tarefa = asyncio.create_task(self._descarregar_periodicamente())
+
+    def adicionar(self, id_usuario: UUID, interacao: str) -> dict:
+        """Guarda a mensagem e retorna a linha (com id e data_envio) gravada depois"""
+        with self._lock:
+            if len(self._pendentes) >= self.maximo:
+                self.rejeitadas += 1
+                raise BufferCheioError()
+            # data_envio sob o lock: o lote sai na ordem das chaves
+            linha = {
+                "id_mensagem": uuid.uuid4(),
+                "interacao": interacao,
+                "data_envio": datetime.utcnow(),
+                "id_usuario": id_usuario,
+            }
+            self._pendentes.append(linha)
+            cheio = len(self._pendentes) >= self.lote
+        if cheio and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._acordar.set)
+        return linha
+
+    def _retirar(self, todos: bool) -> list[dict]:
+        """Próximo lote; sem `todos`, só lotes cheios"""
+        with self._lock:
+            if not todos and len(self._pendentes) < self.lote:
+                return []
+            n = min(self.lote, len(self._pendentes))
+            return [self._pendentes.popleft() for _ in range(n)]
+
+    def _devolver(self, linhas: list[dict]) -> None:
+        """Lote que falhou volta para o início (tenta de novo no próximo ciclo)"""
+        with self._lock:
+            self._pendentes.extendleft(reversed(linhas))
+
+    def _gravar(self, linhas: list[dict]) -> list[dict]:
+        db = SessionLocal()
+        try:
+            try:
+                gravar_mensagens(db, linhas)
+                return linhas
+            except IntegrityError:
+                # Uma linha inválida não pode travar as demais
+                db.rollback()
+                return _gravar_uma_a_uma(db, linhas)
+        finally:
+            db.close()
+
+    def _confirmar(self, linhas: list[dict]) -> None:
+        """Depois do commit: cache do contexto e evento "mensagem" (como na rota)"""
+        self.gravadas += len(linhas)
+        self.lotes += 1
+        for linha in linhas:
+            mensagem = HistoricoChatResponse(**linha)
+            contexto_chat.adicionar(mensagem.id_usuario, mensagem)
+            eventos.publicar(mensagem.id_usuario, "mensagem", mensagem)
+
+    async def descarregar(self, todos: bool = True) -> bool:
+        """
+        Grava os lotes pendentes (todos=False: só os cheios, o resto espera o
+        intervalo); False se o banco falhou
+        """
+        while linhas := self._retirar(todos):
+            try:
+                gravadas = await run_in_threadpool(self._gravar, linhas)
+            except Exception:
+                self._devolver(linhas)
+                self.falhas += 1
+                logger.exception("Falha ao gravar %d mensagens do chat", len(linhas))
+                return False
+            self._confirmar(gravadas)
+        return True
+
+    async def _descarregar_periodicamente(self) -> None:
+        while not self._fechando:
+            try:
+                await asyncio.wait_for(self._acordar.wait(), self.intervalo)
+                vencido = False  # acordada por um lote cheio
+            except asyncio.TimeoutError:
+                vencido = True
+            self._acordar.clear()
+            await self.descarregar(todos=vencido or self._fechando)
+
+    async def fechar(self) -> None:
+        """Termina o lote em andamento e grava todas as pendentes (shutdown)"""
+        if self._tarefa is None:
+            return
+        self._fechando = True
+        self._acordar.set()
+        await self._tarefa
+        self._tarefa = None
+        for _ in range(3):
+            if await self.descarregar():
+                return
+            await asyncio.sleep(self.intervalo)
+        logger.error(
+            "%d mensagens do chat não foram gravadas no desligamento",
+            len(self._pendentes),
+        )
+
+    def stats(self) -> dict:
+        return {
+            "ativo": self.aceitando,
+            "pendentes": len(self._pendentes),
+            "maximo": self.maximo,
+            "gravadas": self.gravadas,
+            "lotes": self.lotes,
+            "rejeitadas": self.rejeitadas,
+            "falhas": self.falhas,
+        }
+
+
+buffer_mensagens = BufferMensagens(
+    ativo=settings.HISTORICO_CHAT_WRITE_BEHIND,
+    lote=settings.HISTORICO_CHAT_LOTE,
+    intervalo=settings.HISTORICO_CHAT_FLUSH_SECONDS,
+    maximo=settings.HISTORICO_CHAT_BUFFER_MAX,
+)
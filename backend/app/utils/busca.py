@@ -0,0 +1,64 @@
+import re
+import unicodedata
+from typing import Optional
+
+from sqlalchemy import Float, case, cast, func, text
+
+# Configuração de texto sem stemming nem stopwords: nomes próprios e empresas
+# são indexados palavra por palavra (acentos já removidos em Python)
+CONFIG_BUSCA = text("'simple'::regconfig")
+
+_PALAVRA = re.compile(r"\w+")
+
+
+def normalizar_busca(texto: Optional[str]) -> Optional[str]:
+    """Texto em minúsculas e sem acentos ("João Conceição" -> "joao conceicao")"""
+    if texto is None:
+        return None
+    if texto.isascii():
+        return " ".join(texto.lower().split())
+    decomposto = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.lower().split())
+
+
+def palavras_busca(texto: Optional[str]) -> list[str]:
+    """Palavras normalizadas de um texto ("João da Silva" -> ["joao", "da", "silva"])"""
+    return _PALAVRA.findall(normalizar_busca(texto) or "")
+
+
+def vetor_busca(coluna):
+    """tsvector de uma coluna normalizada (mesma expressão dos índices GIN)"""
+    return func.to_tsvector(CONFIG_BUSCA, coluna)
+
+
+def consulta_prefixos(termo: str) -> Optional[str]:
+    """
+    Monta um tsquery em que cada palavra do termo casa como prefixo
+    ("jo silv" -> "jo:* & silv:*"). Retorna None se não houver palavras.
+    """
+    palavras = palavras_busca(termo)
+    if not palavras:
+        return None
+    return " & ".join(f"{palavra}:*" for palavra in palavras)
+
+
+def relevancia(coluna, termo: str):
+    """
+    Pontuação da busca: nome igual ao termo > começa com o termo > contém as
+    palavras; no mesmo nível, textos mais curtos (mais próximos do termo) antes.
+    Não recalcula o tsvector de cada linha como o ts_rank faria.
+    """
+    normalizado = normalizar_busca(termo)
+    nivel = case(
+        (coluna == normalizado, 2),
+        (coluna.startswith(normalizado, autoescape=True), 1),
+        else_=0,
+    )
+    return cast(nivel + 1.0 / (1 + func.length(coluna)), Float)
+
+
+def filtro_busca(coluna, termo: str):
+    """Condição WHERE que usa o índice GIN da coluna normalizada"""
+    consulta = func.to_tsquery(CONFIG_BUSCA, consulta_prefixos(termo))
+    return vetor_busca(coluna).op("@@")(consulta)
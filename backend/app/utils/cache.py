@@ -0,0 +1,210 @@
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Cache em memória limitado (LRU) com expiração por tempo (TTL)"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor em cache ou None (conta hit/miss)"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expira_em, value = item
+            if expira_em <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Armazena um valor, removendo o menos usado se o cache estiver cheio"""
+        if self.maxsize <= 0:
+            return
+
+        expira_em = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expira_em, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove uma chave do cache (se existir)"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Esvazia o cache"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Contadores de uso do cache"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class CacheBackend(ABC):
+    """Interface dos backends de cache de respostas"""
+
+    # True quando cada operação faz IO de rede (deve sair do event loop)
+    remote = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Valor em cache ou None (quem chama calcula o valor)"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Armazena o valor (ttl=None: o TTL do backend)"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a chave (se existir)"""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Contadores de uso do backend"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Cache LRU em memória (um por worker)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._cache.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self._cache.invalidate(key)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **self._cache.stats()}
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache compartilhado entre workers em qualquer servidor com protocolo Redis.
+    Com o Redis fora do ar, as leituras contam como miss (o valor é calculado)
+    e as gravações são ignoradas; as falhas aparecem em stats().
+    """
+
+    remote = True
+
+    def __init__(self, url: str, ttl: float, prefix: str = "vendaai:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "O backend de cache 'redis' requer o pacote redis (pip install redis)"
+            ) from e
+
+        # Timeouts curtos: com o Redis fora do ar é mais rápido calcular o valor
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=1, socket_connect_timeout=1
+        )
+        self._erros = redis.RedisError
+        self.ttl = ttl
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.falhas = 0
+
+    def _contar(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _falhou(self, operacao: str, key: str, erro: Exception) -> None:
+        with self._lock:
+            self.falhas += 1
+        logger.warning("Cache redis indisponível (%s %s): %s", operacao, key, erro)
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self._client.get(self.prefix + key)
+        except self._erros as e:
+            self._falhou("get", key, e)
+            raw = None
+        self._contar(raw is not None)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl_ms = int((self.ttl if ttl is None else ttl) * 1000)
+        try:
+            self._client.set(self.prefix + key, json.dumps(value), px=ttl_ms)
+        except self._erros as e:
+            self._falhou("set", key, e)
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(self.prefix + key)
+        except self._erros as e:
+            # A chave expira pelo TTL
+            self._falhou("delete", key, e)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "falhas": self.falhas,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def create_cache_backend(
+    backend: str, maxsize: int, ttl: float, redis_url: Optional[str] = None
+) -> CacheBackend:
+    """Cria o backend de cache configurado ("memory" ou "redis")"""
+    if backend == "memory":
+        return MemoryCacheBackend(maxsize=maxsize, ttl=ttl)
+    if backend == "redis":
+        if not redis_url:
+            raise RuntimeError("REDIS_URL é obrigatório para o backend 'redis'")
+        return RedisCacheBackend(redis_url, ttl=ttl)
+    raise ValueError(f"Backend de cache desconhecido: {backend}")
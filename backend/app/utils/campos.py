@@ -0,0 +1,83 @@
+from functools import lru_cache
+from typing import Collection, Optional, Sequence, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import Query, load_only
+
+
+def campos_da_resposta(
+    schema: Type[BaseModel], fields: Optional[str], pesados: Collection[str] = ()
+) -> Optional[list[str]]:
+    """
+    Campos pedidos em ?fields= (nomes do schema separados por vírgula). Sem
+    fields, todos menos os pesados; None quando a resposta é o schema inteiro.
+    """
+    if not fields:
+        if not pesados:
+            return None
+        return [c for c in schema.model_fields if c not in pesados]
+
+    campos = list(dict.fromkeys(c.strip() for c in fields.split(",") if c.strip()))
+    invalidos = [c for c in campos if c not in schema.model_fields]
+    if invalidos or not campos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Campos inválidos em fields: {', '.join(invalidos) or '(vazio)'}. "
+                f"Disponíveis: {', '.join(schema.model_fields)}"
+            ),
+        )
+    return campos
+
+
+def carregar_campos(
+    query: Query, modelo, campos: Optional[list[str]], extras: Sequence = ()
+) -> Query:
+    """
+    Carrega do banco só as colunas pedidas (mais as extras, ex.: as usadas no
+    cursor); as demais ficam adiadas (deferred) e não saem do banco.
+    """
+    if campos is None:
+        return query
+    colunas = inspect(modelo).columns
+    return query.options(
+        load_only(
+            *(getattr(modelo, c) for c in campos if c in colunas),
+            *extras,
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def schema_com_campos(schema: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    O schema com todos os campos opcionais: response_model das rotas com
+    ?fields= (com response_model_exclude_unset=True), que devolvem só os campos
+    pedidos e continuam validadas por ele.
+    """
+    return create_model(
+        f"{schema.__name__}Campos",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            nome: (Optional[campo.annotation], None)
+            for nome, campo in schema.model_fields.items()
+        },
+    )
+
+
+def resposta_com_campos(dados, campos: Optional[list[str]]):
+    """
+    Só os campos pedidos de cada item (o response_model da rota valida e omite
+    os ausentes). Com campos=None, devolve os próprios dados.
+    """
+    if campos is None:
+        return dados
+
+    def serializar(item) -> dict:
+        return {c: getattr(item, c) for c in campos}
+
+    if isinstance(dados, (list, tuple)):
+        return [serializar(item) for item in dados]
+    return serializar(dados)
@@ -0,0 +1,115 @@
+import threading
+from typing import Optional, Union
+
+import zstandard
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.config import settings
+
+# Início de todo frame zstd; texto UTF-8 válido nunca começa assim
+# (0xB5 não pode seguir um caractere ASCII)
+MAGICA_ZSTD = b"\x28\xb5\x2f\xfd"
+
+# Textos menores que isso são gravados sem compressão (não compensa)
+MINIMO_PARA_COMPRIMIR = 64
+
+# Compressores e descompressores zstd não podem ser usados por duas threads
+# ao mesmo tempo: um par por thread
+_local = threading.local()
+
+
+def _compressor() -> zstandard.ZstdCompressor:
+    compressor = getattr(_local, "compressor", None)
+    if compressor is None:
+        compressor = _local.compressor = zstandard.ZstdCompressor(
+            level=settings.COMPRESSAO_NIVEL
+        )
+    return compressor
+
+
+def _descompressor() -> zstandard.ZstdDecompressor:
+    descompressor = getattr(_local, "descompressor", None)
+    if descompressor is None:
+        descompressor = _local.descompressor = zstandard.ZstdDecompressor()
+    return descompressor
+
+
+def comprimir(texto: str) -> bytes:
+    """Texto em UTF-8 comprimido com zstd (ou puro, se não ficar menor)"""
+    dados = texto.encode()
+    if len(dados) < MINIMO_PARA_COMPRIMIR:
+        return dados
+    comprimido = _compressor().compress(dados)
+    return comprimido if len(comprimido) < len(dados) else dados
+
+
+def comprimido(dados: bytes) -> bool:
+    return dados[:4] == MAGICA_ZSTD
+
+
+def descomprimir(dados: Union[bytes, memoryview, str]) -> str:
+    """Aceita frames zstd, UTF-8 puro (linhas ainda não recomprimidas) e str"""
+    if isinstance(dados, str):
+        return dados  # coluna ainda em TEXT (antes de scripts.comprimir_textos)
+    dados = bytes(dados)
+    if comprimido(dados):
+        dados = _descompressor().decompress(dados)
+    return dados.decode()
+
+
+class TextoComprimido(TypeDecorator):
+    """
+    Texto longo gravado como bytes zstd (BYTEA). Para o código é uma str:
+    comprime ao gravar e descomprime ao carregar a coluna (nas listagens ela
+    fica adiada e nem é lida).
+
+    Enquanto a coluna ainda está em TEXT no banco (antes de
+    scripts.comprimir_textos), `em_texto` é marcado no startup
+    (migracoes.marcar_colunas_em_texto) e o texto é gravado puro: bytes em uma
+    coluna TEXT seriam gravados como o hex do BYTEA.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.em_texto = False
+
+    @property
+    def python_type(self):
+        return str
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return comprimir(value)
+
+    def process_result_value(self, value, dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return descomprimir(value)
+
+    def bind_processor(self, dialect):
+        processar = super().bind_processor(dialect)
+
+        def processor(value):
+            # Lido a cada gravação: a marcação vale para consultas já compiladas
+            if self.em_texto and value is not None:
+                return value
+            return processar(value)
+
+        return processor
+
+    def result_processor(self, dialect, coltype):
+        processar = super().result_processor(dialect, coltype)
+
+        def processor(value):
+            # Coluna ainda em TEXT: o driver devolve str, que o LargeBinary
+            # tentaria converter para bytes
+            if isinstance(value, str):
+                return value
+            return processar(value)
+
+        return processor
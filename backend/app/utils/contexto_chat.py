@@ -0,0 +1,207 @@
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.historico_chat import HistoricoChat
+from app.utils.cache import TTLCache
+
+# Estimativa sem tokenizador: ~4 caracteres por token em português e inglês
+CARACTERES_POR_TOKEN = 4
+
+
+def estimar_tokens(texto: str) -> int:
+    return -(-len(texto) // CARACTERES_POR_TOKEN)
+
+
+class _Tamanhos:
+    """
+    Tamanhos das mensagens mais recentes de um usuário, em ordem cronológica,
+    com somas acumuladas: a soma das k últimas é total - acumulado[n - k]
+    """
+
+    __slots__ = ("chaves", "caracteres", "tokens", "completo", "lock")
+
+    def __init__(self):
+        self.chaves: list[tuple[datetime, UUID]] = []  # (data_envio, id_mensagem)
+        self.caracteres = [0]  # caracteres[i] = soma das mensagens [0, i)
+        self.tokens = [0]
+        self.completo = False  # True quando inclui a mensagem mais antiga
+        self.lock = threading.Lock()
+
+    def acrescentar(self, chave: tuple[datetime, UUID], texto: str) -> None:
+        self.chaves.append(chave)
+        self.caracteres.append(self.caracteres[-1] + len(texto))
+        self.tokens.append(self.tokens[-1] + estimar_tokens(texto))
+
+    def antepor(self, linhas: list[tuple[tuple[datetime, UUID], str]]) -> None:
+        """Inclui mensagens mais antigas (em ordem cronológica) no início"""
+        chaves = [chave for chave, _ in linhas]
+        caracteres, tokens = [0], [0]
+        for _, texto in linhas:
+            caracteres.append(caracteres[-1] + len(texto))
+            tokens.append(tokens[-1] + estimar_tokens(texto))
+        self.chaves = chaves + self.chaves
+        self.caracteres = caracteres + [c + caracteres[-1] for c in self.caracteres[1:]]
+        self.tokens = tokens + [t + tokens[-1] for t in self.tokens[1:]]
+
+    def aparar(self, maximo: int) -> None:
+        """Esquece as mensagens mais antigas além de `maximo`"""
+        excesso = len(self.chaves) - maximo
+        if excesso <= 0:
+            return
+        self.chaves = self.chaves[excesso:]
+        base_c, base_t = self.caracteres[excesso], self.tokens[excesso]
+        self.caracteres = [c - base_c for c in self.caracteres[excesso:]]
+        self.tokens = [t - base_t for t in self.tokens[excesso:]]
+        self.completo = False
+
+    def inicio(self, max_caracteres: Optional[int], max_tokens: Optional[int]) -> int:
+        """Primeira mensagem do maior sufixo que cabe nos orçamentos"""
+        inicio = 0
+        for acumulado, limite in (
+            (self.caracteres, max_caracteres),
+            (self.tokens, max_tokens),
+        ):
+            if limite is not None:
+                inicio = max(inicio, bisect_left(acumulado, acumulado[-1] - limite))
+        return inicio
+
+
+class ContextoChat:
+    """
+    Monta o contexto do chat: as mensagens mais recentes do usuário que cabem
+    em um orçamento de caracteres e/ou tokens. Os tamanhos ficam em cache
+    por usuário (por worker); com eles, só as mensagens escolhidas são lidas
+    do banco. Sem cache, percorre o índice (id_usuario, data_envio) do mais
+    recente para o mais antigo, em páginas, até encher o orçamento.
+    """
+
+    def __init__(self, usuarios: int, max_mensagens: int, pagina: int = 100):
+        self.max_mensagens = max_mensagens
+        self.pagina = pagina
+        self._usuarios = TTLCache(maxsize=usuarios, ttl=3600)
+        self._lock = threading.Lock()
+
+    def _entrada(self, id_usuario: UUID) -> _Tamanhos:
+        with self._lock:
+            entrada = self._usuarios.get(id_usuario)
+            if entrada is None:
+                entrada = _Tamanhos()
+            self._usuarios.set(id_usuario, entrada)  # renova o TTL
+            return entrada
+
+    def invalidar(self, id_usuario: UUID) -> None:
+        """Mensagens removidas: recomeça o cache do usuário"""
+        self._usuarios.invalidate(id_usuario)
+
+    def adicionar(self, id_usuario: UUID, mensagem: HistoricoChat) -> None:
+        """Estende o cache com uma mensagem nova (criar_mensagem)"""
+        entrada = self._usuarios.get(id_usuario)
+        if entrada is None:
+            return
+        chave = (mensagem.data_envio, mensagem.id_mensagem)
+        with entrada.lock:
+            if entrada.chaves and chave <= entrada.chaves[-1]:
+                return  # já incluída pela sincronização (ou fora de ordem)
+            entrada.acrescentar(chave, mensagem.interacao)
+            entrada.aparar(self.max_mensagens)
+
+    def _chave(self):
+        return tuple_(HistoricoChat.data_envio, HistoricoChat.id_mensagem)
+
+    def _sincronizar(self, db: Session, id_usuario: UUID, entrada: _Tamanhos) -> None:
+        """Inclui as mensagens gravadas por outros workers depois da última"""
+        if not entrada.chaves:
+            entrada.completo = False  # sem referência: percorre desde a mais recente
+            return
+        novas = db.execute(
+            select(
+                HistoricoChat.data_envio,
+                HistoricoChat.id_mensagem,
+                HistoricoChat.interacao,
+            )
+            .where(
+                HistoricoChat.id_usuario == id_usuario,
+                self._chave() > tuple_(*entrada.chaves[-1]),
+            )
+            .order_by(HistoricoChat.data_envio, HistoricoChat.id_mensagem)
+        ).all()
+        for data_envio, id_mensagem, texto in novas:
+            entrada.acrescentar((data_envio, id_mensagem), texto)
+
+    def _estender(
+        self,
+        db: Session,
+        id_usuario: UUID,
+        entrada: _Tamanhos,
+        max_caracteres: Optional[int],
+        max_tokens: Optional[int],
+    ) -> None:
+        """Lê mensagens mais antigas até passar do orçamento (ou acabarem)"""
+        while not entrada.completo and entrada.inicio(max_caracteres, max_tokens) == 0:
+            query = select(
+                HistoricoChat.data_envio,
+                HistoricoChat.id_mensagem,
+                HistoricoChat.interacao,
+            ).where(HistoricoChat.id_usuario == id_usuario)
+            if entrada.chaves:
+                query = query.where(self._chave() < tuple_(*entrada.chaves[0]))
+            pagina = db.execute(
+                query.order_by(
+                    HistoricoChat.data_envio.desc(), HistoricoChat.id_mensagem.desc()
+                ).limit(self.pagina)
+            ).all()
+            if len(pagina) < self.pagina:
+                entrada.completo = True
+            entrada.antepor([((d, i), texto) for d, i, texto in reversed(pagina)])
+
+    def montar(
+        self,
+        db: Session,
+        id_usuario: UUID,
+        max_caracteres: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+    ) -> tuple[list[HistoricoChat], bool]:
+        """
+        Mensagens mais recentes que cabem nos orçamentos, em ordem cronológica,
+        e se ficaram mensagens mais antigas de fora
+        """
+        for _ in range(2):
+            entrada = self._entrada(id_usuario)
+            with entrada.lock:
+                self._sincronizar(db, id_usuario, entrada)
+                self._estender(db, id_usuario, entrada, max_caracteres, max_tokens)
+                inicio = entrada.inicio(max_caracteres, max_tokens)
+                chaves = entrada.chaves[inicio:]
+                truncado = inicio > 0 or not entrada.completo
+                entrada.aparar(self.max_mensagens)
+
+            if not chaves:
+                return [], truncado
+            mensagens = (
+                db.query(HistoricoChat)
+                .filter(
+                    HistoricoChat.id_usuario == id_usuario,
+                    self._chave() >= tuple_(*chaves[0]),
+                    self._chave() <= tuple_(*chaves[-1]),
+                )
+                .order_by(HistoricoChat.data_envio, HistoricoChat.id_mensagem)
+                .all()
+            )
+            if [(m.data_envio, m.id_mensagem) for m in mensagens] == chaves:
+                return mensagens, truncado
+            # Mensagens removidas em outro worker: refaz a partir do banco
+            self.invalidar(id_usuario)
+        return mensagens, truncado
+
+
+contexto_chat = ContextoChat(
+    usuarios=settings.CONTEXTO_CHAT_CACHE_USUARIOS,
+    max_mensagens=settings.CONTEXTO_CHAT_MAX_MENSAGENS,
+)
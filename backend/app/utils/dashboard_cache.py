@@ -0,0 +1,46 @@
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.utils.cache import create_cache_backend
+
+# Cache das estatísticas do dashboard, invalidado pelas rotas que gravam
+# vendas e clientes
+dashboard_cache = create_cache_backend(
+    settings.STATS_CACHE_BACKEND,
+    maxsize=settings.STATS_CACHE_MAXSIZE,
+    ttl=settings.STATS_CACHE_TTL_SECONDS,
+    redis_url=settings.REDIS_URL,
+)
+
+
+def _chave(id_usuario) -> str:
+    return f"dashboard:stats:{id_usuario}"
+
+
+async def obter_estatisticas_em_cache(id_usuario) -> Optional[dict]:
+    if dashboard_cache.remote:
+        return await run_in_threadpool(dashboard_cache.get, _chave(id_usuario))
+    return dashboard_cache.get(_chave(id_usuario))
+
+
+async def guardar_estatisticas(id_usuario, estatisticas: dict) -> None:
+    if dashboard_cache.remote:
+        await run_in_threadpool(dashboard_cache.set, _chave(id_usuario), estatisticas)
+    else:
+        dashboard_cache.set(_chave(id_usuario), estatisticas)
+
+
+def invalidar_estatisticas(id_usuario) -> None:
+    """Descarta as estatísticas em cache do usuário (chamar após gravar)"""
+    if id_usuario is not None:
+        dashboard_cache.delete(_chave(id_usuario))
+
+
+async def invalidar_estatisticas_async(id_usuario) -> None:
+    """Versão para rotas async (não bloqueia o event loop com backends remotos)"""
+    if dashboard_cache.remote:
+        await run_in_threadpool(invalidar_estatisticas, id_usuario)
+    else:
+        invalidar_estatisticas(id_usuario)
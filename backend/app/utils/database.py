@@ -1,15 +1,31 @@
-from typing import Generator
+from typing import AsyncGenerator, Callable, Generator, Optional, TypeVar, Union
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.schema import CreateIndex
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
+from app.utils.pool import engine_options
+
+T = TypeVar("T")
+
+# Sessão entregue por get_async_db (depende de DATABASE_ASYNC)
+DBSession = Union[AsyncSession, Session]
 
 # Criar engine do banco com type hint
-# Remove connect_args para PostgreSQL
-engine: Engine = create_engine(settings.DATABASE_URL)
+# Pool configurável via Settings (DB_POOL_*, DB_STATEMENT_TIMEOUT_MS)
+engine: Engine = create_engine(
+    settings.DATABASE_URL, **engine_options(settings.DATABASE_URL)
+)
 
 # Criar sessão
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -18,6 +34,131 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def _async_database_url() -> str:
+    """URL do modo assíncrono (por padrão a DATABASE_URL com driver asyncpg)"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+# Engine assíncrona (criada apenas quando DATABASE_ASYNC=true)
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        _async_database_url(), **engine_options(_async_database_url(), is_async=True)
+    )
+    # expire_on_commit=False: atributos continuam acessíveis após o commit
+    # sem disparar IO fora do event loop
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+def create_missing_columns(bind: Engine) -> None:
+    """
+    Adiciona colunas anuláveis declaradas nos models que ainda não existem no
+    banco (create_all não altera tabelas existentes)
+    """
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existentes = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existentes or not column.nullable:
+                    continue
+                tipo = column.type.compile(dialect=bind.dialect)
+                conn.execute(
+                    text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {tipo}')
+                )
+
+
+def create_missing_indexes(bind: Engine) -> None:
+    """
+    Cria índices declarados nos models que ainda não existem no banco
+    (create_all só cria índices junto com tabelas novas). No Postgres usa
+    CREATE INDEX CONCURRENTLY, sem bloquear as escritas, e refaz os índices
+    inválidos deixados por uma criação interrompida. Em tabela particionada,
+    cria o índice em cada partição e os anexa ao índice da tabela.
+    """
+    if bind.dialect.name != "postgresql":
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=bind, checkfirst=True)
+        return
+
+    # CONCURRENTLY não roda dentro de transação
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in Base.metadata.sorted_tables:
+            tipo = conn.scalar(
+                text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"),
+                {"t": table.name},
+            )
+            for index in table.indexes:
+                ddl = str(CreateIndex(index).compile(dialect=bind.dialect))
+                if tipo == "p":
+                    _criar_indice_particionado(conn, index.name, table.name, ddl)
+                elif tipo is not None:
+                    _criar_indice_concorrente(conn, index.name, ddl)
+
+
+def _criar_indice_concorrente(conn: Connection, nome: str, ddl: str) -> None:
+    valido = conn.scalar(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:n)"),
+        {"n": nome},
+    )
+    if valido:
+        return
+    if valido is False:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY {nome}"))
+    conn.execute(text(ddl.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)))
+
+
+def _criar_indice_particionado(
+    conn: Connection, nome: str, tabela: str, ddl: str
+) -> None:
+    # Só no pai (instantâneo); fica inválido até anexar o de cada partição
+    conn.execute(
+        text(
+            ddl.replace(" INDEX ", " INDEX IF NOT EXISTS ", 1).replace(
+                f" ON {tabela} ", f" ON ONLY {tabela} ", 1
+            )
+        )
+    )
+    particoes = conn.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"
+        ),
+        {"t": tabela},
+    ).all()
+    anexadas = set(
+        conn.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_index x ON x.indexrelid = i.inhrelid "
+                "JOIN pg_class c ON c.oid = x.indrelid "
+                "WHERE i.inhparent = to_regclass(:n)"
+            ),
+            {"n": nome},
+        )
+    )
+    for particao in particoes:
+        if particao in anexadas:
+            continue
+        nome_particao = f"{particao}_{nome}"[:63]
+        _criar_indice_concorrente(
+            conn,
+            nome_particao,
+            ddl.replace(f" {nome} ON {tabela} ", f" {nome_particao} ON {particao} ", 1),
+        )
+        conn.execute(text(f"ALTER INDEX {nome} ATTACH PARTITION {nome_particao}"))
+
+
 # Dependency para obter sessão do banco
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -25,3 +166,25 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+# Dependency para rotas async: AsyncSession no modo assíncrono,
+# Session comum (usada via threadpool) no modo síncrono
+async def get_async_db() -> AsyncGenerator[DBSession, None]:
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def run_db(db: DBSession, fn: Callable[..., T], *args) -> T:
+    """Executa fn(session, *args) sem bloquear o event loop"""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Optional
+from uuid import UUID
+
+import pydantic_core
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Canal do broker compartilhado entre os workers
+CANAL_EVENTOS = "vendaai:eventos"
+
+# Publicações aguardando o broker remoto (acima disso são descartadas)
+FILA_PUBLICACAO = 10_000
+
+
+class BrokerEventos(ABC):
+    """
+    Interface dos brokers que levam os eventos publicados em um worker até
+    os workers onde o usuário está conectado
+    """
+
+    nome = "base"
+    # True quando cada publicação faz IO de rede (outros workers recebem)
+    remote = False
+
+    def conectar(self, entregar: Callable[[str], None]) -> None:
+        """Define a função que recebe as mensagens deste worker"""
+        self._entregar = entregar
+
+    def iniciar(self) -> None:
+        pass
+
+    @abstractmethod
+    def publicar(self, mensagem: str) -> None:
+        """Envia a mensagem a todos os workers (inclusive este)"""
+
+    def fechar(self) -> None:
+        pass
+
+
+class BrokerMemoria(BrokerEventos):
+    """Entrega direta no próprio worker (um worker ou desenvolvimento)"""
+
+    nome = "memory"
+
+    def publicar(self, mensagem: str) -> None:
+        self._entregar(mensagem)
+
+
+class BrokerRedis(BrokerEventos):
+    """Pub/sub em qualquer servidor com protocolo Redis (vários workers)"""
+
+    nome = "redis"
+    remote = True
+
+    def __init__(self, url: str, canal: str = CANAL_EVENTOS):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "O broker de eventos 'redis' requer o pacote redis (pip install redis)"
+            ) from e
+
+        # Timeouts curtos: um Redis fora do ar não prende a thread de publicação
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=5, socket_connect_timeout=5
+        )
+        self.canal = canal
+        self._pubsub = None
+        self._thread = None
+
+    def _receber(self, mensagem: dict) -> None:
+        self._entregar(mensagem["data"].decode())
+
+    def iniciar(self) -> None:
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self.canal: self._receber})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def publicar(self, mensagem: str) -> None:
+        self._client.publish(self.canal, mensagem)
+
+    def fechar(self) -> None:
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+
+def create_broker(nome: str, redis_url: Optional[str] = None) -> BrokerEventos:
+    """Cria o broker de eventos configurado ("memory" ou "redis")"""
+    if nome == "memory":
+        return BrokerMemoria()
+    if nome == "redis":
+        if not redis_url:
+            raise RuntimeError("REDIS_URL é obrigatório para o broker 'redis'")
+        return BrokerRedis(redis_url)
+    raise ValueError(f"Broker de eventos desconhecido: {nome}")
+
+
+class Assinatura:
+    """Conexão SSE de um usuário: fila limitada consumida no seu event loop"""
+
+    __slots__ = ("fila", "loop", "descartados", "avisados")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, buffer: int):
+        self.fila: asyncio.Queue = asyncio.Queue(maxsize=max(buffer, 1))
+        self.loop = loop
+        self.descartados = 0  # eventos perdidos por fila cheia
+        self.avisados = 0  # descartes já informados ao cliente
+
+    def enfileirar(self, texto: str) -> None:
+        """Roda no loop da conexão; fila cheia descarta o evento mais antigo"""
+        if self.fila.full():
+            self.fila.get_nowait()
+            self.descartados += 1
+        self.fila.put_nowait(texto)
+
+
+class BarramentoEventos:
+    """
+    Distribui os eventos (sugestões, chamadas e mensagens) às conexões SSE
+    do usuário neste worker. Cada publicação passa pelo broker, que a entrega
+    a todos os workers; cada conexão tem uma fila de até `buffer` eventos, e
+    um cliente lento perde os mais antigos (e recebe "sincronizar").
+    """
+
+    def __init__(self, broker: BrokerEventos, buffer: int):
+        self.broker = broker
+        self.buffer = buffer
+        self._assinaturas: dict[str, set[Assinatura]] = {}
+        self._lock = threading.Lock()
+        self.publicados = 0
+        self.entregues = 0
+        self.descartados = 0
+        self.falhas = 0
+        # Broker remoto: publica em uma thread própria, fora do event loop
+        self._saida: queue.Queue = queue.Queue(maxsize=FILA_PUBLICACAO)
+        self._publicador: Optional[threading.Thread] = None
+        broker.conectar(self._entregar)
+
+    def assinar(self, id_usuario: UUID) -> Assinatura:
+        """Registra uma conexão do usuário (chamado no event loop)"""
+        assinatura = Assinatura(asyncio.get_running_loop(), self.buffer)
+        with self._lock:
+            self._assinaturas.setdefault(str(id_usuario), set()).add(assinatura)
+        return assinatura
+
+    def cancelar(self, id_usuario: UUID, assinatura: Assinatura) -> None:
+        with self._lock:
+            self.descartados += assinatura.descartados
+            conexoes = self._assinaturas.get(str(id_usuario))
+            if conexoes is not None:
+                conexoes.discard(assinatura)
+                if not conexoes:
+                    del self._assinaturas[str(id_usuario)]
+
+    def publicar(self, id_usuario: UUID, tipo: str, dados: Any) -> None:
+        """
+        Publica um evento para as conexões do usuário, depois do commit.
+        dados é um schema pydantic (ou lista/dict deles). Falhas do broker
+        não desfazem a gravação: o cliente se atualiza ao reconectar.
+        """
+        usuario = str(id_usuario)
+        if not self.broker.remote and usuario not in self._assinaturas:
+            return  # ninguém conectado neste worker: nem serializa
+
+        # O JSON compacto não tem quebras de linha: separam os três campos
+        mensagem = f"{usuario}\n{tipo}\n{pydantic_core.to_json(dados).decode()}"
+        if not self.broker.remote:
+            self._enviar(mensagem)
+            return
+
+        # IO de rede: quem publica (rota, event loop) não espera o broker
+        self._garantir_publicador()
+        try:
+            self._saida.put_nowait(mensagem)
+        except queue.Full:
+            self.falhas += 1
+            logger.warning("Fila de publicação cheia: evento %s descartado", tipo)
+
+    def _enviar(self, mensagem: str) -> None:
+        try:
+            self.broker.publicar(mensagem)
+        except Exception:
+            self.falhas += 1
+            logger.exception("Falha ao publicar evento %s", mensagem.split("\n", 2)[1])
+            return
+        self.publicados += 1
+
+    def _garantir_publicador(self) -> None:
+        if self._publicador is not None:
+            return
+        with self._lock:
+            if self._publicador is None:
+                self._publicador = threading.Thread(
+                    target=self._publicar_em_segundo_plano,
+                    name="eventos-publicador",
+                    daemon=True,
+                )
+                self._publicador.start()
+
+    def _publicar_em_segundo_plano(self) -> None:
+        while (mensagem := self._saida.get()) is not None:
+            self._enviar(mensagem)
+
+    def _entregar(self, mensagem: str) -> None:
+        """Recebe uma mensagem do broker (de qualquer thread)"""
+        usuario, tipo, dados = mensagem.split("\n", 2)
+        with self._lock:
+            conexoes = list(self._assinaturas.get(usuario, ()))
+        if not conexoes:
+            return
+
+        # Formatado uma vez e compartilhado pelas conexões do usuário
+        texto = f"event: {tipo}\ndata: {dados}\n\n"
+        for assinatura in conexoes:
+            try:
+                assinatura.loop.call_soon_threadsafe(assinatura.enfileirar, texto)
+            except RuntimeError:  # loop encerrado: a conexão já caiu
+                self.cancelar(UUID(usuario), assinatura)
+                continue
+            self.entregues += 1
+
+    async def transmitir(
+        self, id_usuario: UUID, heartbeat: float, retry_ms: int = 3000
+    ) -> AsyncIterator[str]:
+        """
+        Corpo text/event-stream de uma conexão: os eventos do usuário e um
+        comentário a cada `heartbeat` segundos sem eventos (mantém a conexão
+        aberta em proxies). Termina quando o cliente desconecta.
+        """
+        assinatura = self.assinar(id_usuario)
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            while True:
+                try:
+                    texto = await asyncio.wait_for(assinatura.fila.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if assinatura.descartados > assinatura.avisados:
+                    # O cliente perdeu eventos: deve recarregar as listagens
+                    perdidos = assinatura.descartados - assinatura.avisados
+                    assinatura.avisados = assinatura.descartados
+                    yield f'event: sincronizar\ndata: {{"descartados": {perdidos}}}\n\n'
+                yield texto
+        finally:
+            self.cancelar(id_usuario, assinatura)
+
+    def iniciar(self) -> None:
+        self.broker.iniciar()
+
+    def fechar(self) -> None:
+        publicador = self._publicador
+        if publicador is not None:
+            # Envia o que já estava na fila antes de desconectar
+            self._saida.put(None)
+            publicador.join(timeout=5)
+            self._publicador = None
+        self.broker.fechar()
+
+    def stats(self) -> dict:
+        with self._lock:
+            usuarios = len(self._assinaturas)
+            conexoes = sum(len(c) for c in self._assinaturas.values())
+            descartados = self.descartados + sum(
+                a.descartados for c in self._assinaturas.values() for a in c
+            )
+        return {
+            "broker": self.broker.nome,
+            "usuarios": usuarios,
+            "conexoes": conexoes,
+            "buffer": self.buffer,
+            "publicados": self.publicados,
+            "pendentes": self._saida.qsize(),
+            "entregues": self.entregues,
+            "descartados": descartados,
+            "falhas": self.falhas,
+        }
+
+
+eventos = BarramentoEventos(
+    create_broker(settings.EVENTOS_BROKER, redis_url=settings.REDIS_URL),
+    buffer=settings.EVENTOS_BUFFER,
+)
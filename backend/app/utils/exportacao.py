@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Callable, Iterator, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.utils.database import SessionLocal
+
+# Linhas lidas do cursor (e serializadas) por vez
+LOTE_EXPORTACAO = 1000
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _conversor(coluna) -> Optional[Callable]:
+    """
+    Conversão dos valores de uma coluna (escolhida uma vez pelo tipo): datas
+    em ISO 8601; UUID e Decimal como texto, como nas respostas JSON
+    """
+    try:
+        tipo = coluna.type.python_type
+    except NotImplementedError:
+        return str
+    if issubclass(tipo, (datetime, date)):
+        return tipo.isoformat
+    if issubclass(tipo, (str, int, float, bool)):
+        return None
+    return str
+
+
+def _linhas(consulta: Select, formato: str) -> Iterator[bytes]:
+    """
+    Executa a consulta com cursor no servidor (yield_per) e serializa um lote
+    por vez: a memória usada não depende do número de linhas exportadas.
+    A sessão é própria, pois vive enquanto a resposta é enviada.
+    """
+    campos = [coluna.key for coluna in consulta.selected_columns]
+    conversores = [
+        (i, conversor)
+        for i, coluna in enumerate(consulta.selected_columns)
+        if (conversor := _conversor(coluna)) is not None
+    ]
+    db = SessionLocal()
+    try:
+        resultado = db.execute(
+            consulta.execution_options(yield_per=LOTE_EXPORTACAO)
+        ).tuples()
+
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer, lineterminator="\n")
+        if formato == "csv":
+            escritor.writerow(campos)
+
+        for lote in resultado.partitions():
+            for linha in lote:
+                valores = list(linha)
+                for i, conversor in conversores:
+                    if valores[i] is not None:
+                        valores[i] = conversor(valores[i])
+                if formato == "csv":
+                    escritor.writerow(valores)
+                else:
+                    buffer.write(json.dumps(dict(zip(campos, valores))))
+                    buffer.write("\n")
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if formato == "csv" and buffer.tell():
+            yield buffer.getvalue().encode()  # só o cabeçalho (nenhuma linha)
+    finally:
+        db.close()
+
+
+def _gzip(blocos: Iterator[bytes]) -> Iterator[bytes]:
+    """Compacta em gzip conforme os blocos são gerados"""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for bloco in blocos:
+        dados = compressor.compress(bloco)
+        if dados:
+            yield dados
+    yield compressor.flush()
+
+
+def aceita_gzip(request: Request) -> bool:
+    for item in request.headers.get("accept-encoding", "").split(","):
+        codificacao, _, parametros = item.strip().partition(";")
+        if codificacao.strip().lower() == "gzip":
+            return parametros.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00")
+    return False
+
+
+def resposta_exportacao(
+    consulta: Select, formato: str, nome: str, request: Request
+) -> StreamingResponse:
+    """
+    Resposta em streaming com o resultado da consulta em CSV ou NDJSON
+    (compactada em gzip se o cliente aceitar)
+    """
+    corpo = _linhas(consulta, formato)
+    headers = {"Content-Disposition": f'attachment; filename="{nome}.{formato}"'}
+    if aceita_gzip(request):
+        corpo = _gzip(corpo)
+        headers["Content-Encoding"] = "gzip"
+    headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(corpo, media_type=MEDIA_TYPES[formato], headers=headers)
@@ -0,0 +1,250 @@
+import asyncio
+import hashlib
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import httpx
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.utils.cache import CacheBackend, create_cache_backend
+
+# Instrução de sistema das sugestões geradas durante a chamada
+INSTRUCAO_SUGESTOES = (
+    "Você é o Venda.AI, assistente de vendas que acompanha uma ligação em "
+    "andamento. A partir do trecho recente da conversa, sugira ao vendedor a "
+    "próxima fala ou ação, em uma ou duas frases curtas, objetivas e em "
+    "português. Responda apenas com a sugestão."
+)
+
+GEMINI_URL = (
+    "https://generativelanguage.googleapis.com/v1beta/models/{modelo}:generateContent"
+)
+
+
+class ErroProvedorIA(Exception):
+    """O provedor falhou (erro, resposta vazia ou tempo esgotado)"""
+
+
+class GatewaySaturadoError(Exception):
+    """Fila do gateway cheia - o request deve ser rejeitado"""
+
+
+class ProvedorIA(ABC):
+    """Interface dos provedores de geração de texto"""
+
+    nome = "base"
+    modelo = ""
+
+    @abstractmethod
+    async def gerar(self, prompt: str, instrucao: str) -> str:
+        """Texto gerado; ErroProvedorIA em caso de falha"""
+
+    async def fechar(self) -> None:
+        pass
+
+
+class ProvedorFalso(ProvedorIA):
+    """Provedor local e determinístico (testes, benchmarks e desenvolvimento)"""
+
+    nome = "falso"
+    modelo = "falso"
+
+    def __init__(self, atraso: float = 0.0):
+        self.atraso = atraso
+        self.chamadas = 0
+
+    async def gerar(self, prompt: str, instrucao: str) -> str:
+        self.chamadas += 1
+        if self.atraso:
+            await asyncio.sleep(self.atraso)
+        return f"Sugestão: retome o ponto sobre {' '.join(prompt.split()[-8:])}"
+
+
+class ProvedorGemini(ProvedorIA):
+    """API generateContent do Google Gemini"""
+
+    nome = "gemini"
+
+    def __init__(self, api_key: Optional[str], modelo: str, timeout: float):
+        self.api_key = api_key
+        self.modelo = modelo
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def gerar(self, prompt: str, instrucao: str) -> str:
+        if not self.api_key:
+            raise ErroProvedorIA("GEMINI_API_KEY não configurada")
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+
+        try:
+            resposta = await self._client.post(
+                GEMINI_URL.format(modelo=self.modelo),
+                headers={"x-goog-api-key": self.api_key},
+                json={
+                    "system_instruction": {"parts": [{"text": instrucao}]},
+                    "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+                },
+            )
+            resposta.raise_for_status()
+            partes = resposta.json()["candidates"][0]["content"]["parts"]
+        except httpx.HTTPError as e:
+            raise ErroProvedorIA(f"Erro na API do Gemini: {e}") from e
+        except (KeyError, IndexError, ValueError) as e:
+            raise ErroProvedorIA("Resposta inesperada da API do Gemini") from e
+
+        texto = "".join(p.get("text", "") for p in partes).strip()
+        if not texto:
+            raise ErroProvedorIA("A API do Gemini não retornou texto")
+        return texto
+
+    async def fechar(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def create_provedor(nome: str) -> ProvedorIA:
+    """Cria o provedor configurado ("gemini" ou "falso")"""
+    if nome == "gemini":
+        return ProvedorGemini(
+            settings.GEMINI_API_KEY, settings.IA_MODELO, settings.IA_TIMEOUT_SECONDS
+        )
+    if nome == "falso":
+        return ProvedorFalso()
+    raise ValueError(f"Provedor de IA desconhecido: {nome}")
+
+
+def normalizar_prompt(texto: str) -> str:
+    """Forma canônica do prompt para o cache (espaços e maiúsculas não contam)"""
+    return " ".join(unicodedata.normalize("NFC", texto).casefold().split())
+
+
+class GatewayIA:
+    """
+    Gera textos no provedor com cache (LRU + TTL) pelo prompt normalizado.
+    Prompts iguais em andamento compartilham a mesma chamada ao provedor, e
+    no máximo `concorrencia` chamadas distintas rodam ao mesmo tempo (por
+    worker); além de `fila_max` pendentes, os novos pedidos são rejeitados.
+    """
+
+    def __init__(
+        self,
+        provedor: ProvedorIA,
+        cache: CacheBackend,
+        concorrencia: int,
+        fila_max: int,
+        timeout: float,
+    ):
+        self.provedor = provedor
+        self.cache = cache
+        self.concorrencia = max(concorrencia, 1)
+        self.fila_max = fila_max
+        self.timeout = timeout
+        self._em_andamento: dict[str, asyncio.Future] = {}
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self.chamadas = 0
+        self.coalescidas = 0
+        self.rejeitadas = 0
+        self.falhas = 0
+
+    def _chave(self, prompt: str, instrucao: str) -> str:
+        bruto = f"{instrucao}\0{normalizar_prompt(prompt)}".encode()
+        digest = hashlib.sha256(bruto).hexdigest()
+        return f"ia:{self.provedor.nome}:{self.provedor.modelo}:{digest}"
+
+    def _limite(self) -> asyncio.Semaphore:
+        # Um semáforo por event loop (o TestClient cria um loop por sessão)
+        loop = asyncio.get_running_loop()
+        if self._semaforo is None or self._loop is not loop:
+            self._semaforo = asyncio.Semaphore(self.concorrencia)
+            self._loop = loop
+        return self._semaforo
+
+    async def _cache_get(self, chave: str) -> Optional[str]:
+        if self.cache.remote:
+            return await run_in_threadpool(self.cache.get, chave)
+        return self.cache.get(chave)
+
+    async def _cache_set(self, chave: str, texto: str) -> None:
+        if self.cache.remote:
+            await run_in_threadpool(self.cache.set, chave, texto)
+        else:
+            self.cache.set(chave, texto)
+
+    async def _chamar_provedor(self, chave: str, prompt: str, instrucao: str) -> str:
+        try:
+            async with self._limite():
+                texto = await asyncio.wait_for(
+                    self.provedor.gerar(prompt, instrucao), self.timeout
+                )
+        except asyncio.TimeoutError:
+            self.falhas += 1
+            raise ErroProvedorIA("Tempo esgotado aguardando o provedor de IA")
+        except ErroProvedorIA:
+            self.falhas += 1
+            raise
+
+        self.chamadas += 1
+        await self._cache_set(chave, texto)
+        return texto
+
+    def _concluida(self, chave: str, tarefa: asyncio.Future) -> None:
+        self._em_andamento.pop(chave, None)
+        if not tarefa.cancelled():
+            tarefa.exception()  # evita o aviso quando ninguém mais aguarda
+
+    async def gerar(self, prompt: str, instrucao: str = INSTRUCAO_SUGESTOES) -> str:
+        chave = self._chave(prompt, instrucao)
+        texto = await self._cache_get(chave)
+        if texto is not None:
+            return texto
+
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is not None:
+            self.coalescidas += 1
+        else:
+            if len(self._em_andamento) >= self.fila_max:
+                self.rejeitadas += 1
+                raise GatewaySaturadoError("Fila do gateway de IA cheia")
+            tarefa = asyncio.ensure_future(
+                self._chamar_provedor(chave, prompt, instrucao)
+            )
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda t: self._concluida(chave, t))
+
+        # shield: um cliente que desiste não cancela a chamada dos demais
+        return await asyncio.shield(tarefa)
+
+    async def fechar(self) -> None:
+        await self.provedor.fechar()
+
+    def stats(self) -> dict:
+        return {
+            "provedor": self.provedor.nome,
+            "modelo": self.provedor.modelo,
+            "concorrencia": self.concorrencia,
+            "em_andamento": len(self._em_andamento),
+            "chamadas": self.chamadas,
+            "coalescidas": self.coalescidas,
+            "rejeitadas": self.rejeitadas,
+            "falhas": self.falhas,
+            "cache": self.cache.stats(),
+        }
+
+
+gateway_ia = GatewayIA(
+    create_provedor(settings.IA_PROVEDOR),
+    create_cache_backend(
+        settings.IA_CACHE_BACKEND,
+        maxsize=settings.IA_CACHE_MAXSIZE,
+        ttl=settings.IA_CACHE_TTL_SECONDS,
+        redis_url=settings.REDIS_URL,
+    ),
+    concorrencia=settings.IA_CONCORRENCIA,
+    fila_max=settings.IA_FILA_MAX,
+    timeout=settings.IA_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,116 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from app.config import settings
+
+# Configuração para hash de senhas
+# Usando Argon2 (mais moderno e seguro que bcrypt)
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],  # Argon2 primeiro, bcrypt como fallback
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_ROUNDS,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+
+class HashingSaturatedError(Exception):
+    """Fila de hashing cheia (ou tempo esgotado) - o request deve ser rejeitado"""
+
+
+# Funções executadas nos processos do pool (precisam ser de nível de módulo)
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    # Retorna um novo hash quando os parâmetros do hash atual estão desatualizados
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class HashingService:
+    """Executa o Argon2 em um pool de processos dedicado com fila limitada"""
+
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _run(self, fn, *args):
+        # Sem pool configurado: executa no próprio thread do request
+        if self.workers <= 0:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashingSaturatedError("Fila de hashing cheia")
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self.rejected += 1
+            raise HashingSaturatedError("Tempo de hashing esgotado")
+        except BrokenProcessPool:
+            # Um processo morreu: descarta o pool para recriá-lo no próximo request
+            self.shutdown()
+            raise HashingSaturatedError("Pool de hashing reiniciado")
+
+        self.completed += 1
+        return result
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify_and_update(
+        self, password: str, hashed: str
+    ) -> tuple[bool, Optional[str]]:
+        return self._run(_verify_and_update, password, hashed)
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+hashing_service = HashingService(
+    workers=settings.HASH_POOL_WORKERS,
+    max_pending=settings.HASH_QUEUE_MAX,
+    timeout=settings.HASH_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,388 @@
+import asyncio
+import logging
+import re
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, text, tuple_, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.historico_chat import HistoricoChat
+from app.models.limpeza_historico import STATUS_ATIVOS, LimpezaHistorico
+from app.utils.contexto_chat import contexto_chat
+from app.utils.database import SessionLocal, engine
+from app.utils.eventos import eventos
+
+logger = logging.getLogger(__name__)
+
+TABELA = HistoricoChat.__tablename__
+# Recebe as mensagens fora das partições mensais (não deve acumular linhas)
+PARTICAO_PADRAO = f"{TABELA}_padrao"
+# Tabela anterior ao particionamento, anexada como a partição mais antiga
+PARTICAO_LEGADO = f"{TABELA}_legado"
+# Advisory lock da manutenção: um worker por vez cria/remove partições
+_LOCK_MANUTENCAO = 0x68697374
+
+_LIMITE_SUPERIOR = re.compile(r"TO \('([^']+)'\)")
+
+
+def inicio_do_mes(dia: date, meses: int = 0) -> date:
+    """Primeiro dia do mês de `dia`, deslocado `meses` meses"""
+    total = dia.year * 12 + dia.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def nome_particao(mes: date) -> str:
+    return f"{TABELA}_{mes:%Y_%m}"
+
+
+def particionada(conn: Connection) -> bool:
+    """True quando historicochat já é uma tabela particionada"""
+    return bool(
+        conn.scalar(
+            text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:t)"),
+            {"t": TABELA},
+        )
+    )
+
+
+def particoes(conn: Connection) -> list[tuple[str, Optional[datetime]]]:
+    """(nome, limite superior) das partições; None para a partição padrão"""
+    linhas = conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"
+        ),
+        {"t": TABELA},
+    )
+    resultado = []
+    for nome, limites in linhas:
+        limite = _LIMITE_SUPERIOR.search(limites)
+        resultado.append(
+            (nome, datetime.fromisoformat(limite.group(1)) if limite else None)
+        )
+    return resultado
+
+
+def criar_particao(conn: Connection, mes: date) -> bool:
+    """
+    Cria a partição do mês. Mensagens do mês que caíram na partição padrão
+    (partição criada tarde) são movidas para ela. Retorna False se já existe.
+    """
+    nome = nome_particao(mes)
+    if conn.scalar(text("SELECT to_regclass(:n)"), {"n": nome}) is not None:
+        return False
+
+    inicio, fim = mes.isoformat(), inicio_do_mes(mes, 1).isoformat()
+    ddl = (
+        f"CREATE TABLE {nome} PARTITION OF {TABELA} "
+        f"FOR VALUES FROM ('{inicio}') TO ('{fim}')"
+    )
+    no_padrao = f"data_envio >= '{inicio}' AND data_envio < '{fim}'"
+    tem_padrao = conn.scalar(text("SELECT to_regclass(:n)"), {"n": PARTICAO_PADRAO})
+    if not tem_padrao or not conn.scalar(
+        text(f"SELECT EXISTS (SELECT 1 FROM {PARTICAO_PADRAO} WHERE {no_padrao})")
+    ):
+        conn.execute(text(ddl))
+        return True
+
+    conn.execute(text(f"ALTER TABLE {TABELA} DETACH PARTITION {PARTICAO_PADRAO}"))
+    conn.execute(text(ddl))
+    conn.execute(
+        text(
+            f"WITH movidas AS (DELETE FROM {PARTICAO_PADRAO} WHERE {no_padrao} "
+            f"RETURNING *) INSERT INTO {nome} SELECT * FROM movidas"
+        )
+    )
+    conn.execute(
+        text(f"ALTER TABLE {TABELA} ATTACH PARTITION {PARTICAO_PADRAO} DEFAULT")
+    )
+    return True
+
+
+def garantir_particoes(bind: Engine, meses_futuros: int) -> list[str]:
+    """
+    Cria a partição padrão e as do mês atual e dos próximos `meses_futuros`
+    meses (as já cobertas pela partição legado são puladas). Não faz nada
+    fora do Postgres ou enquanto a tabela não for particionada.
+    """
+    if bind.dialect.name != "postgresql":
+        return []
+
+    criadas = []
+    with bind.begin() as conn:
+        if not particionada(conn):
+            return []
+        conn.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _LOCK_MANUTENCAO})
+        conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {PARTICAO_PADRAO} PARTITION OF {TABELA} DEFAULT"
+            )
+        )
+        limites = [limite for _, limite in particoes(conn) if limite is not None]
+        ocupado_ate = max(limites).date() if limites else None
+        for i in range(meses_futuros + 1):
+            mes = inicio_do_mes(datetime.utcnow().date(), i)
+            if ocupado_ate is not None and mes < ocupado_ate:
+                continue
+            if criar_particao(conn, mes):
+                criadas.append(nome_particao(mes))
+    return criadas
+
+
+def remover_particoes_antigas(bind: Engine, meses_retencao: int) -> list[str]:
+    """
+    Retenção: remove (DROP TABLE, sem DELETE) as partições cujo mês terminou
+    antes dos últimos `meses_retencao` meses completos, e as mensagens desse
+    período na partição padrão. Se outro worker está fazendo a manutenção,
+    ou a tabela está ocupada, tenta no próximo ciclo.
+    """
+    if bind.dialect.name != "postgresql":
+        return []
+
+    corte = datetime.combine(
+        inicio_do_mes(datetime.utcnow().date(), -meses_retencao), datetime.min.time()
+    )
+    removidas = []
+    with bind.begin() as conn:
+        if not particionada(conn):
+            return []
+        livre = conn.scalar(
+            text("SELECT pg_try_advisory_xact_lock(:k)"), {"k": _LOCK_MANUTENCAO}
+        )
+        if not livre:
+            return []
+        # Não enfileira atrás de consultas longas (bloquearia o histórico)
+        conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+        for nome, limite in particoes(conn):
+            if limite is not None and limite <= corte:
+                conn.execute(text(f"DROP TABLE {nome}"))
+                removidas.append(nome)
+        # A partição padrão é pequena: as mensagens antigas nela saem por DELETE
+        conn.execute(
+            text(f"DELETE FROM {PARTICAO_PADRAO} WHERE data_envio < :corte"),
+            {"corte": corte},
+        )
+    return removidas
+
+
+def manter_particoes(bind: Engine) -> None:
+    """Cria as partições dos próximos meses e aplica a retenção configurada"""
+    criadas = garantir_particoes(bind, settings.HISTORICO_CHAT_MESES_FUTUROS)
+    if criadas:
+        logger.info("Partições do histórico de chat criadas: %s", ", ".join(criadas))
+    if settings.HISTORICO_CHAT_RETENCAO_MESES:
+        removidas = remover_particoes_antigas(
+            bind, settings.HISTORICO_CHAT_RETENCAO_MESES
+        )
+        if removidas:
+            logger.info(
+                "Partições do histórico de chat removidas: %s", ", ".join(removidas)
+            )
+
+
+async def manter_periodicamente() -> None:
+    """Manutenção das partições do histórico de chat em segundo plano"""
+    while True:
+        await asyncio.sleep(settings.HISTORICO_CHAT_MANUTENCAO_SECONDS)
+        try:
+            await run_in_threadpool(manter_particoes, engine)
+        except Exception:
+            logger.exception("Falha na manutenção das partições do histórico de chat")
+
+
+class LimpezasHistorico:
+    """
+    Limpeza do histórico de chat de um usuário em segundo plano: apaga em
+    lotes de `lote` mensagens, cada um em uma transação curta que também grava
+    o progresso em limpezas_historico, com `pausa` segundos entre eles. O
+    progresso é lido do banco por qualquer worker e publicado como evento
+    "limpeza_historico" nas conexões SSE do usuário. Uma limpeza sem progresso
+    há `abandonada` segundos (worker encerrado no meio) é retomada.
+    """
+
+    def __init__(self, lote: int, pausa: float, abandonada: float = 300):
+        self.lote = lote
+        self.pausa = pausa
+        self.abandonada = abandonada
+
+    @staticmethod
+    def _ativa(db: Session, id_usuario: UUID) -> Optional[LimpezaHistorico]:
+        return db.scalars(
+            select(LimpezaHistorico).where(
+                LimpezaHistorico.id_usuario == id_usuario,
+                LimpezaHistorico.status.in_(STATUS_ATIVOS),
+            )
+        ).first()
+
+    def _assumir(self, db: Session, limpeza: LimpezaHistorico) -> bool:
+        """Assume uma limpeza abandonada (só um worker consegue)"""
+        agora = datetime.utcnow()
+        assumida = db.execute(
+            update(LimpezaHistorico)
+            .where(
+                LimpezaHistorico.id_limpeza == limpeza.id_limpeza,
+                LimpezaHistorico.status.in_(STATUS_ATIVOS),
+                LimpezaHistorico.atualizada_em
+                < agora - timedelta(seconds=self.abandonada),
+            )
+            .values(atualizada_em=agora)
+        ).rowcount
+        db.commit()
+        return bool(assumida)
+
+    def iniciar(self, db: Session, id_usuario: UUID) -> tuple[LimpezaHistorico, bool]:
+        """
+        Registra uma limpeza e retorna (ela, True): quem chama a executa. Se já
+        há uma ativa, retorna (ela, False), ou (ela, True) se foi abandonada.
+        """
+        limpeza = self._ativa(db, id_usuario)
+        if limpeza is not None:
+            executar = self._assumir(db, limpeza)
+        else:
+            limpeza = LimpezaHistorico(id_usuario=id_usuario)
+            db.add(limpeza)
+            try:
+                db.commit()
+                executar = True
+            except IntegrityError:
+                # Outro worker registrou a limpeza do usuário ao mesmo tempo
+                db.rollback()
+                limpeza = self._ativa(db, id_usuario)
+                executar = False
+        db.refresh(limpeza)
+        db.expunge(limpeza)
+        return limpeza, executar
+
+    def obter(self, db: Session, id_usuario: UUID) -> Optional[LimpezaHistorico]:
+        """Última limpeza do usuário (de qualquer worker)"""
+        return db.scalars(
+            select(LimpezaHistorico)
+            .where(LimpezaHistorico.id_usuario == id_usuario)
+            .order_by(LimpezaHistorico.iniciada_em.desc())
+            .limit(1)
+        ).first()
+
+    def _publicar(self, limpeza: LimpezaHistorico) -> None:
+        eventos.publicar(limpeza.id_usuario, "limpeza_historico", limpeza.resumo())
+
+    @staticmethod
+    def _gravar_progresso(db: Session, limpeza: LimpezaHistorico) -> None:
+        db.execute(
+            update(LimpezaHistorico)
+            .where(LimpezaHistorico.id_limpeza == limpeza.id_limpeza)
+            .values(
+                status=limpeza.status,
+                total=limpeza.total,
+                removidas=limpeza.removidas,
+                concluida_em=limpeza.concluida_em,
+                atualizada_em=datetime.utcnow(),
+            )
+        )
+        db.commit()
+
+    def executar(self, limpeza: LimpezaHistorico) -> None:
+        """
+        Apaga as mensagens em lotes (roda fora do request; `limpeza` é a
+        retornada por iniciar, sem sessão)
+        """
+        filtro = (
+            HistoricoChat.id_usuario == limpeza.id_usuario,
+            HistoricoChat.data_envio <= limpeza.ate,
+        )
+        # SKIP LOCKED: lotes de outra limpeza do mesmo usuário não bloqueiam
+        alvo = (
+            select(HistoricoChat.id_mensagem, HistoricoChat.data_envio)
+            .where(*filtro)
+            .order_by(HistoricoChat.data_envio, HistoricoChat.id_mensagem)
+            .limit(self.lote)
+            .with_for_update(skip_locked=True)
+        )
+        apagar = delete(HistoricoChat).where(
+            tuple_(HistoricoChat.id_mensagem, HistoricoChat.data_envio).in_(alvo)
+        )
+
+        db = SessionLocal()
+        try:
+            if limpeza.total is None:  # retomada: mantém o total e o progresso
+                limpeza.total = db.scalar(
+                    select(func.count()).select_from(HistoricoChat).where(*filtro)
+                )
+            limpeza.status = "em_andamento"
+            self._gravar_progresso(db, limpeza)
+            self._publicar(limpeza)
+            while True:
+                apagadas = db.execute(
+                    apagar, execution_options={"synchronize_session": False}
+                ).rowcount
+                limpeza.removidas += apagadas
+                # Mesmo commit do lote: o progresso gravado é o apagado
+                self._gravar_progresso(db, limpeza)
+                if not apagadas:
+                    break
+                self._publicar(limpeza)
+                if self.pausa:
+                    time.sleep(self.pausa)
+            limpeza.status = "concluida"
+        except Exception:
+            db.rollback()
+            limpeza.status = "falha"
+            logger.exception("Falha na limpeza do histórico de %s", limpeza.id_usuario)
+        finally:
+            limpeza.concluida_em = datetime.utcnow()
+            try:
+                self._gravar_progresso(db, limpeza)
+            except Exception:
+                # Fica ativa: é retomada depois como abandonada
+                logger.exception(
+                    "Falha ao gravar o fim da limpeza %s", limpeza.id_limpeza
+                )
+            db.close()
+            contexto_chat.invalidar(limpeza.id_usuario)
+            self._publicar(limpeza)
+
+    def retomar(self) -> int:
+        """Executa as limpezas abandonadas; retorna quantas foram retomadas"""
+        db = SessionLocal()
+        try:
+            candidatas = db.scalars(
+                select(LimpezaHistorico).where(
+                    LimpezaHistorico.status.in_(STATUS_ATIVOS),
+                    LimpezaHistorico.atualizada_em
+                    < datetime.utcnow() - timedelta(seconds=self.abandonada),
+                )
+            ).all()
+            assumidas = []
+            for limpeza in candidatas:
+                if self._assumir(db, limpeza):
+                    db.refresh(limpeza)
+                    db.expunge(limpeza)
+                    assumidas.append(limpeza)
+        finally:
+            db.close()
+        for limpeza in assumidas:
+            logger.info("Retomando a limpeza do histórico %s", limpeza.id_limpeza)
+            self.executar(limpeza)
+        return len(assumidas)
+
+
+async def retomar_limpezas() -> None:
+    """No startup: retoma as limpezas interrompidas por um worker encerrado"""
+    try:
+        await run_in_threadpool(limpezas_historico.retomar)
+    except Exception:
+        logger.exception("Falha ao retomar as limpezas do histórico de chat")
+
+
+limpezas_historico = LimpezasHistorico(
+    lote=settings.HISTORICO_CHAT_LIMPEZA_LOTE,
+    pausa=settings.HISTORICO_CHAT_LIMPEZA_PAUSA_SECONDS,
+    abandonada=settings.HISTORICO_CHAT_LIMPEZA_ABANDONADA_SECONDS,
+)
@@ -0,0 +1,267 @@
+import csv
+import io
+import json
+import uuid
+from typing import BinaryIO, Iterable, Iterator, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models.cliente import ClienteLead, campos_normalizados
+from app.schemas.cliente import ClienteLeadCreate
+
+# Linhas validadas e gravadas por vez (no Postgres, um COPY para a tabela de
+# staging e um INSERT ... SELECT por lote)
+LOTE_IMPORTACAO = 1000
+
+# Colunas gravadas na importação (campos de criação + derivados + dono)
+_COLUNAS = (
+    "id_cliente",
+    *ClienteLeadCreate.model_fields,
+    "nome_busca",
+    "empresa_busca",
+    "telefone_e164",
+    "id_usuario",
+)
+
+# Linhas com erro detalhadas no relatório (as demais só entram na contagem)
+MAX_ERROS_RELATADOS = 1000
+
+FORMATOS = ("csv", "ndjson")
+
+ERRO_EMAIL_DUPLICADO = "e_mail: Você já tem um cliente com este email"
+
+TABELA = ClienteLead.__tablename__
+_STAGING = "importacao_clientesleads"
+
+
+def detectar_formato(
+    formato: Optional[str], nome_arquivo: Optional[str], content_type: Optional[str]
+) -> str:
+    """Formato informado, ou deduzido da extensão / content type (padrão: csv)"""
+    if formato:
+        if formato not in FORMATOS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Formato inválido (use {' ou '.join(FORMATOS)})",
+            )
+        return formato
+
+    nome = (nome_arquivo or "").lower()
+    if nome.endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or ""):
+        return "ndjson"
+    return "csv"
+
+
+def ler_csv(arquivo: BinaryIO) -> Iterator[tuple[int, object]]:
+    """
+    Lê o CSV linha a linha (sem carregar o arquivo inteiro). O cabeçalho traz os
+    nomes dos campos; o separador pode ser "," ou ";" (padrão do Excel em pt-BR).
+    """
+    texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+    cabecalho = texto.readline()
+    separador = ";" if cabecalho.count(";") > cabecalho.count(",") else ","
+    campos = [c.strip() for c in next(csv.reader([cabecalho], delimiter=separador))]
+
+    leitor = csv.DictReader(texto, fieldnames=campos, delimiter=separador)
+    for registro in leitor:
+        # Campos vazios do CSV viram None (como se não tivessem sido enviados)
+        yield leitor.line_num + 1, {
+            campo: (valor.strip() or None) if isinstance(valor, str) else valor
+            for campo, valor in registro.items()
+            if campo
+        }
+
+
+def ler_ndjson(arquivo: BinaryIO) -> Iterator[tuple[int, object]]:
+    """Lê um objeto JSON por linha (linhas em branco são ignoradas)"""
+    texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig")
+    for numero, linha in enumerate(texto, start=1):
+        if not linha.strip():
+            continue
+        try:
+            yield numero, json.loads(linha)
+        except json.JSONDecodeError:
+            yield numero, None
+
+
+def _valor_copy(valor) -> str:
+    """Valor no formato texto do COPY (NULL como \\N, separadores escapados)"""
+    if valor is None:
+        return "\\N"
+    return (
+        str(valor)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _erros_de_validacao(erro: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(p) for p in e['loc']) or 'linha'}: {e['msg']}"
+        for e in erro.errors()
+    ]
+
+
+class _Importacao:
+    def __init__(self, db: Session, id_usuario: UUID):
+        self.db = db
+        self.id_usuario = id_usuario
+        self.total = 0
+        self.importados = 0
+        self.com_erro = 0
+        self.erros: list[dict] = []
+        # E-mails já vistos neste arquivo (duplicados dentro do próprio arquivo)
+        self.emails: set[str] = set()
+
+    def erro(self, linha: int, mensagens: list[str]) -> None:
+        self.com_erro += 1
+        if len(self.erros) < MAX_ERROS_RELATADOS:
+            self.erros.append({"linha": linha, "erros": mensagens})
+
+    def gravar_lote(self, lote: list[tuple[int, ClienteLeadCreate]]) -> None:
+        registros = []
+        for linha, cliente in lote:
+            # Duplicados dentro do próprio arquivo
+            if cliente.e_mail:
+                if cliente.e_mail in self.emails:
+                    self.erro(linha, [ERRO_EMAIL_DUPLICADO])
+                    continue
+                self.emails.add(cliente.e_mail)
+
+            registros.append(
+                {
+                    "id_cliente": uuid.uuid4(),
+                    **cliente.model_dump(),
+                    **campos_normalizados(
+                        cliente.nome, cliente.empresa, cliente.telefone
+                    ),
+                    "id_usuario": self.id_usuario,
+                    "linha": linha,
+                }
+            )
+
+        if registros:
+            if self.db.get_bind().dialect.name == "postgresql":
+                self._gravar_com_copy(registros)
+            else:
+                self._gravar_com_insert(registros)
+            self.db.commit()
+
+    def _gravar_com_insert(self, registros: list[dict]) -> None:
+        emails = {r["e_mail"] for r in registros if r["e_mail"]}
+        existentes = set()
+        if emails:
+            existentes = set(
+                self.db.scalars(
+                    select(ClienteLead.e_mail).where(
+                        ClienteLead.id_usuario == self.id_usuario,
+                        ClienteLead.e_mail.in_(emails),
+                    )
+                )
+            )
+        novos = []
+        for registro in registros:
+            linha = registro.pop("linha")
+            if registro["e_mail"] in existentes:
+                self.erro(linha, [ERRO_EMAIL_DUPLICADO])
+            else:
+                novos.append(registro)
+        if novos:
+            # INSERT com várias linhas por comando (insertmanyvalues do SQLAlchemy)
+            self.db.execute(insert(ClienteLead.__table__), novos)
+            self.importados += len(novos)
+
+    def _gravar_com_copy(self, registros: list[dict]) -> None:
+        """
+        COPY do lote para uma tabela temporária (descartada no commit) e, dela,
+        um INSERT ... SELECT dos clientes com e-mail que o usuário ainda não tem
+        """
+        colunas = ", ".join(_COLUNAS)
+        dados = io.StringIO()
+        for registro in registros:
+            valores = [registro[c] for c in _COLUNAS] + [registro["linha"]]
+            dados.write("\t".join(_valor_copy(v) for v in valores) + "\n")
+        dados.seek(0)
+
+        self.db.execute(
+            text(
+                f"CREATE TEMP TABLE {_STAGING} "
+                f"(LIKE {TABELA} INCLUDING DEFAULTS, linha integer) ON COMMIT DROP"
+            )
+        )
+        # Mesma conexão (e transação) da sessão
+        with self.db.connection().connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {_STAGING} ({colunas}, linha) FROM STDIN", dados)
+
+        # Tira do staging os e-mails que o usuário já tem (pelo índice
+        # usuário + e-mail) e grava o restante
+        duplicadas = self.db.scalars(
+            text(
+                f"DELETE FROM {_STAGING} s USING {TABELA} c "
+                "WHERE c.id_usuario = :id_usuario AND c.e_mail = s.e_mail "
+                "RETURNING s.linha"
+            ),
+            {"id_usuario": self.id_usuario},
+        )
+        for linha in duplicadas:
+            self.erro(linha, [ERRO_EMAIL_DUPLICADO])
+        self.importados += self.db.execute(
+            text(f"INSERT INTO {TABELA} ({colunas}) SELECT {colunas} FROM {_STAGING}")
+        ).rowcount
+
+    def relatorio(self) -> dict:
+        return {
+            "total": self.total,
+            "importados": self.importados,
+            "com_erro": self.com_erro,
+            "erros": sorted(self.erros, key=lambda e: e["linha"]),
+        }
+
+
+def importar_registros(
+    db: Session,
+    registros: Iterable[tuple[int, object]],
+    id_usuario: UUID,
+    tamanho_lote: int = LOTE_IMPORTACAO,
+) -> dict:
+    """
+    Valida os registros com ClienteLeadCreate e grava os válidos em lotes
+    (cada lote é confirmado ao ser gravado). Retorna o relatório por linha.
+    """
+    importacao = _Importacao(db, id_usuario)
+    lote: list[tuple[int, ClienteLeadCreate]] = []
+
+    try:
+        for linha, registro in registros:
+            importacao.total += 1
+            if not isinstance(registro, dict):
+                importacao.erro(linha, ["linha: esperado um objeto JSON"])
+                continue
+            try:
+                lote.append((linha, ClienteLeadCreate.model_validate(registro)))
+            except ValidationError as e:
+                importacao.erro(linha, _erros_de_validacao(e))
+                continue
+
+            if len(lote) >= tamanho_lote:
+                importacao.gravar_lote(lote)
+                lote = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Arquivo ilegível após {importacao.total} registros "
+                f"({importacao.importados} já importados): {e}"
+            ),
+        )
+
+    if lote:
+        importacao.gravar_lote(lote)
+    return importacao.relatorio()
@@ -0,0 +1,372 @@
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Iterable, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.sugestao_ia import SugestaoIA
+from app.utils.busca import palavras_busca
+from app.utils.database import SessionLocal
+
+try:
+    import fcntl
+except ImportError:  # Windows (desenvolvimento, um processo): sem bloqueio
+    fcntl = None
+
+# Dimensões dos vetores (hashing de palavras e pares de palavras)
+DIMENSOES = 256
+
+# Modo aproximado (LSH por hiperplanos aleatórios): cada tabela dá a cada vetor
+# um código de BITS_APROXIMADO bits; só são comparadas com a consulta as
+# linhas com o mesmo código que ela em alguma das tabelas
+TABELAS_APROXIMADO = 16
+BITS_APROXIMADO = 12
+
+# Linhas do arquivo: dono, sugestão aceita e vetor do contexto que ela respondeu.
+# Gravado ordenado por usuário: as linhas de cada um são uma fatia contínua
+REGISTRO = np.dtype(
+    [("usuario", "S16"), ("sugestao", "S16"), ("vetor", "<f4", (DIMENSOES,))]
+)
+
+
+def _chave(valor: UUID) -> bytes:
+    # "S16" descarta zeros finais ao ler: as chaves em memória também
+    return valor.bytes.rstrip(b"\0")
+
+
+def _uuid(chave: bytes) -> UUID:
+    return UUID(bytes=chave.ljust(16, b"\0"))
+
+
+def vetorizar(textos: Sequence[str]) -> np.ndarray:
+    """
+    Vetores normalizados (norma 1) dos textos, um por linha: cada palavra e
+    cada par de palavras vizinhas soma ±1 na dimensão dada pelo seu hash.
+    O produto escalar entre dois vetores é a similaridade de cosseno.
+    """
+    vetores = np.zeros((len(textos), DIMENSOES), dtype=np.float32)
+    for linha, texto in enumerate(textos):
+        palavras = [p for p in palavras_busca(texto) if len(p) > 2]
+        termos = palavras + [f"{a} {b}" for a, b in zip(palavras, palavras[1:])]
+        if not termos:
+            continue
+        hashes = np.fromiter(
+            (zlib.crc32(t.encode()) for t in termos), dtype=np.uint32, count=len(termos)
+        )
+        sinais = np.where(hashes & 0x10000, 1.0, -1.0).astype(np.float32)
+        np.add.at(vetores[linha], hashes % DIMENSOES, sinais)
+
+    normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+    np.divide(vetores, normas, out=vetores, where=normas > 0)
+    return vetores
+
+
+class IndiceSugestoes:
+    """
+    Índice em memória das sugestões aceitas, por usuário. As linhas gravadas
+    em arquivo são lidas por mmap (compartilhadas entre workers pelo cache
+    de páginas do SO); as aceitas depois ficam em memória até salvar().
+    """
+
+    def __init__(self, arquivo: Optional[str], limiar: float, aproximado: bool):
+        self.arquivo = arquivo
+        self.limiar = limiar
+        self.aproximado = aproximado
+        self._lock = threading.Lock()
+        self._base = np.zeros(0, dtype=REGISTRO)
+        self._faixas: dict[bytes, tuple[int, int]] = {}
+        self._novos: dict[bytes, list[np.ndarray]] = {}
+        self._removidos: set[bytes] = set()
+        self._tabelas: dict[bytes, list[tuple[np.ndarray, np.ndarray]]] = {}
+        self._planos = (
+            np.random.default_rng(0)
+            .standard_normal((DIMENSOES, TABELAS_APROXIMADO * BITS_APROXIMADO))
+            .astype(np.float32)
+        )
+        self.consultas = 0
+        self.acertos = 0
+
+    # --- carga e persistência ---
+
+    def _usar_base(self, base: np.ndarray) -> None:
+        usuarios, inicios = np.unique(base["usuario"], return_index=True)
+        fins = np.append(inicios[1:], len(base))
+        with self._lock:
+            self._base = base
+            self._faixas = {
+                u: (int(i), int(f)) for u, i, f in zip(usuarios, inicios, fins)
+            }
+            # Dicionário novo: buscas em andamento gravam as tabelas no antigo
+            self._tabelas = {}
+
+    def carregar(self) -> bool:
+        """Mapeia o arquivo em memória (somente leitura); False se não existir"""
+        if not self.arquivo or not os.path.exists(self.arquivo):
+            return False
+        base = np.load(self.arquivo, mmap_mode="r")
+        if base.dtype != REGISTRO:
+            return False  # formato antigo: será reconstruído
+        self._usar_base(base)
+        return True
+
+    def construir(self, linhas: Iterable[tuple], lote: int = 5000) -> int:
+        """
+        Substitui o índice pelas sugestões (id_usuario, id_sugestao, contexto)
+        informadas e salva o arquivo. Retorna quantas foram indexadas.
+        """
+        partes = []
+        buffer = []
+        for linha in linhas:
+            buffer.append(linha)
+            if len(buffer) >= lote:
+                partes.append(self._registros(buffer))
+                buffer = []
+        if buffer:
+            partes.append(self._registros(buffer))
+
+        base = np.concatenate(partes) if partes else np.zeros(0, dtype=REGISTRO)
+        base = base[np.argsort(base["usuario"], kind="stable")]
+        with self._lock:
+            self._novos.clear()
+            self._removidos.clear()
+        with self._bloqueio_arquivo():
+            self._gravar(base)
+        return len(base)
+
+    @contextmanager
+    def _bloqueio_arquivo(self):
+        """Um processo por vez relê e troca o arquivo (flock em arquivo.lock)"""
+        if not self.arquivo or fcntl is None:
+            yield
+            return
+        with open(f"{self.arquivo}.lock", "a") as trava:
+            fcntl.flock(trava, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(trava, fcntl.LOCK_UN)
+
+    def salvar(self) -> None:
+        """Grava o arquivo com as linhas atuais mais as aceitas em memória"""
+        with self._lock:
+            gravados = {u: len(v) for u, v in self._novos.items()}
+            novos = [p for v in self._novos.values() for p in v]
+            removidos = list(self._removidos)
+            base = self._base
+        if not novos and not removidos:
+            return
+
+        with self._bloqueio_arquivo():
+            # Relê o arquivo: outro worker pode ter salvo as aceitas dele
+            if self.arquivo and os.path.exists(self.arquivo):
+                atual = np.load(self.arquivo, mmap_mode="r")
+                if atual.dtype == REGISTRO:
+                    base = atual
+            base = np.concatenate([np.asarray(base), *novos])
+            if removidos:
+                base = base[~np.isin(base["sugestao"], removidos)]
+            # Sugestão repetida (aceita de novo com outro contexto): vale a última
+            _, ultimas = np.unique(base["sugestao"][::-1], return_index=True)
+            base = base[np.sort(len(base) - 1 - ultimas)]
+            base = base[np.argsort(base["usuario"], kind="stable")]
+            self._gravar(base)
+        # Aceitas durante a gravação continuam em memória
+        with self._lock:
+            for usuario, quantidade in gravados.items():
+                del self._novos[usuario][:quantidade]
+            self._removidos.difference_update(removidos)
+
+    def _gravar(self, base: np.ndarray) -> None:
+        if not self.arquivo:
+            self._usar_base(base)
+            return
+        # Grava em um arquivo temporário e troca (quem já mapeou o antigo
+        # continua lendo a versão anterior)
+        temporario = f"{self.arquivo}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as f:
+            np.save(f, base)
+        os.replace(temporario, self.arquivo)
+        self.carregar()
+
+    # --- atualização incremental ---
+
+    @staticmethod
+    def _registros(linhas: Sequence[tuple]) -> np.ndarray:
+        registros = np.zeros(len(linhas), dtype=REGISTRO)
+        registros["usuario"] = [_chave(u) for u, _, _ in linhas]
+        registros["sugestao"] = [_chave(s) for _, s, _ in linhas]
+        registros["vetor"] = vetorizar([c for _, _, c in linhas])
+        return registros
+
+    def adicionar(self, id_usuario: UUID, id_sugestao: UUID, contexto: str) -> None:
+        """Inclui uma sugestão aceita (chamar após gravar o aceite)"""
+        registro = self._registros([(id_usuario, id_sugestao, contexto)])
+        with self._lock:
+            self._removidos.discard(_chave(id_sugestao))
+            self._novos.setdefault(_chave(id_usuario), []).append(registro)
+
+    def remover(self, id_sugestao: UUID) -> None:
+        """Descarta uma sugestão (não aceita mais ou excluída)"""
+        with self._lock:
+            self._removidos.add(_chave(id_sugestao))
+
+    # --- consulta ---
+
+    def _codigo(self, vetores: np.ndarray) -> np.ndarray:
+        """Código de cada vetor em cada tabela (linhas x tabelas)"""
+        bits = ((vetores @ self._planos) > 0).astype(np.int32)
+        bits = bits.reshape(len(vetores), TABELAS_APROXIMADO, BITS_APROXIMADO)
+        return bits @ (1 << np.arange(BITS_APROXIMADO, dtype=np.int32))
+
+    def _tabelas_do_usuario(self, cache: dict, usuario: bytes, linhas: np.ndarray):
+        """
+        Por tabela, (ordem das linhas, códigos ordenados) - calculado uma vez
+        por versão do arquivo (`cache` é o dicionário da versão lida)
+        """
+        with self._lock:
+            tabelas = cache.get(usuario)
+        if tabelas is None:
+            codigos = self._codigo(linhas["vetor"])
+            tabelas = []
+            for t in range(TABELAS_APROXIMADO):
+                ordem = np.argsort(codigos[:, t], kind="stable")
+                tabelas.append((ordem, codigos[ordem, t]))
+            with self._lock:
+                cache[usuario] = tabelas
+        return tabelas
+
+    def _similaridades(
+        self, cache: dict, usuario: bytes, linhas: np.ndarray, consultas: np.ndarray
+    ) -> np.ndarray:
+        """
+        Cosseno (linhas do arquivo x consultas). No modo aproximado só as
+        linhas candidatas são comparadas (as demais ficam com -1)
+        """
+        if not self.aproximado:
+            return linhas["vetor"] @ consultas.T
+
+        tabelas = self._tabelas_do_usuario(cache, usuario, linhas)
+        similaridades = np.full((len(linhas), len(consultas)), -1.0, np.float32)
+        for i, codigos in enumerate(self._codigo(consultas)):
+            partes = []
+            for (ordem, ordenados), codigo in zip(tabelas, codigos):
+                inicio, fim = np.searchsorted(ordenados, [codigo, codigo + 1])
+                partes.append(ordem[inicio:fim])
+            candidatos = np.unique(np.concatenate(partes))
+            similaridades[candidatos, i] = linhas["vetor"][candidatos] @ consultas[i]
+        return similaridades
+
+    def buscar(
+        self, id_usuario: UUID, contextos: Sequence[str]
+    ) -> list[Optional[tuple[UUID, float]]]:
+        """
+        Para cada contexto, a sugestão aceita do usuário com contexto mais
+        parecido (id, similaridade), ou None abaixo do limiar. Os contextos
+        são comparados com todas as linhas de uma vez (produto de matrizes).
+        """
+        usuario = _chave(id_usuario)
+        with self._lock:
+            self.consultas += len(contextos)
+            inicio, fim = self._faixas.get(usuario, (0, 0))
+            base = self._base[inicio:fim]  # view do mmap, sem cópia
+            tabelas = self._tabelas
+            novos = list(self._novos.get(usuario, []))
+            removidos = list(self._removidos)
+
+        resultado: list[Optional[tuple[UUID, float]]] = [None] * len(contextos)
+        if not len(base) and not novos:
+            return resultado
+
+        consultas = vetorizar(contextos)
+        melhores = np.full(len(contextos), -1.0, np.float32)
+        partes = []
+        if len(base):
+            partes.append(
+                (base, self._similaridades(tabelas, usuario, base, consultas))
+            )
+        if novos:
+            linhas = np.concatenate(novos)  # poucas linhas: sempre exato
+            partes.append((linhas, linhas["vetor"] @ consultas.T))
+
+        for linhas, similaridades in partes:
+            if removidos:
+                similaridades[np.isin(linhas["sugestao"], removidos)] = -1.0
+            indices = np.argmax(similaridades, axis=0)
+            for i, indice in enumerate(indices):
+                valor = similaridades[indice, i]
+                if valor >= self.limiar and valor > melhores[i]:
+                    melhores[i] = valor
+                    resultado[i] = (_uuid(linhas["sugestao"][indice]), float(valor))
+
+        with self._lock:
+            self.acertos += sum(r is not None for r in resultado)
+        return resultado
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._base) + sum(
+                len(p) for v in self._novos.values() for p in v
+            )
+
+    def stats(self) -> dict:
+        sugestoes = len(self)
+        with self._lock:
+            usuarios = len(self._faixas)
+            consultas, acertos = self.consultas, self.acertos
+        return {
+            "sugestoes": sugestoes,
+            "usuarios": usuarios,
+            "modo": "aproximado" if self.aproximado else "exato",
+            "limiar": self.limiar,
+            "consultas": consultas,
+            "acertos": acertos,
+            "taxa_acerto": round(acertos / consultas, 4) if consultas else 0.0,
+        }
+
+
+indice_sugestoes = IndiceSugestoes(
+    settings.INDICE_SUGESTOES_ARQUIVO,
+    limiar=settings.INDICE_SUGESTOES_LIMIAR,
+    aproximado=settings.INDICE_SUGESTOES_APROXIMADO,
+)
+
+
+def linhas_aceitas(db: Session):
+    """(id_usuario, id_sugestao, contexto) das sugestões aceitas com contexto"""
+    query = (
+        select(SugestaoIA.id_usuario, SugestaoIA.id_sugestao, SugestaoIA.contexto)
+        .where(
+            SugestaoIA.aceita.is_(True),
+            SugestaoIA.contexto.is_not(None),
+            SugestaoIA.id_usuario.is_not(None),
+        )
+        .execution_options(yield_per=5000)
+    )
+    yield from db.execute(query)
+
+
+def preparar_indice() -> int:
+    """Mapeia o arquivo do índice ou, se não existir, constrói a partir do banco"""
+    if indice_sugestoes.carregar():
+        return len(indice_sugestoes)
+    db = SessionLocal()
+    try:
+        return indice_sugestoes.construir(linhas_aceitas(db))
+    finally:
+        db.close()
+
+
+def atualizar_aceite(
+    id_usuario: UUID, id_sugestao: UUID, contexto: Optional[str], aceita: bool
+) -> None:
+    """Mantém o índice em dia após gravar o aceite (ou a recusa) de uma sugestão"""
+    if aceita and contexto:
+        indice_sugestoes.adicionar(id_usuario, id_sugestao, contexto)
+    else:
+        indice_sugestoes.remover(id_sugestao)
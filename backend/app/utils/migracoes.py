@@ -0,0 +1,343 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import inspect, select, text, update
+from sqlalchemy.engine import Engine
+
+import app.models  # noqa: F401 (registra as tabelas no Base)
+from app.config import settings
+from app.models.chamada import Chamada
+from app.models.sugestao_ia import SugestaoIA
+from app.utils.compressao import TextoComprimido, comprimir
+from app.utils.database import Base, create_missing_columns, create_missing_indexes
+from app.utils.historico_chat import garantir_particoes
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock das migrações: uma execução por vez
+_LOCK_MIGRACAO = 0x6D696772
+
+
+@contextmanager
+def bloqueio_migracao(bind: Engine):
+    """Espera outras migrações em andamento (sessão própria, fora das transações)"""
+    if bind.dialect.name != "postgresql":
+        yield
+        return
+    with bind.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": _LOCK_MIGRACAO})
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _LOCK_MIGRACAO})
+            conn.commit()
+
+
+def coluna_obrigatoria(bind: Engine, tabela: str, coluna: str) -> bool:
+    with bind.begin() as conn:
+        return bool(
+            conn.scalar(
+                text(
+                    "SELECT is_nullable = 'NO' FROM information_schema.columns "
+                    "WHERE table_name = :t AND column_name = :c"
+                ),
+                {"t": tabela, "c": coluna},
+            )
+        )
+
+
+def tornar_obrigatoria(bind: Engine, tabela: str, coluna: str, valor: str) -> int:
+    """
+    Preenche os NULL da coluna com a expressão SQL `valor` e a torna NOT NULL
+    sem varrer a tabela sob bloqueio (CHECK NOT VALID validado à parte).
+    Retorna as linhas preenchidas.
+    """
+    if bind.dialect.name != "postgresql":
+        return 0
+
+    restricao = f"{tabela}_{coluna}_preenchida"
+    if coluna_obrigatoria(bind, tabela, coluna):
+        return 0
+    with bind.begin() as conn:
+        existe = conn.scalar(
+            text("SELECT 1 FROM pg_constraint WHERE conname = :n"), {"n": restricao}
+        )
+        if not existe:
+            # Novas linhas sem valor já são recusadas; as antigas são preenchidas
+            conn.execute(
+                text(
+                    f"ALTER TABLE {tabela} ADD CONSTRAINT {restricao} "
+                    f'CHECK ("{coluna}" IS NOT NULL) NOT VALID'
+                )
+            )
+    with bind.begin() as conn:
+        preenchidas = conn.execute(
+            text(f'UPDATE {tabela} SET "{coluna}" = {valor} WHERE "{coluna}" IS NULL')
+        ).rowcount
+    with bind.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {tabela} VALIDATE CONSTRAINT {restricao}"))
+    with bind.begin() as conn:
+        conn.execute(text("SET LOCAL lock_timeout = '10s'"))
+        conn.execute(text(f'ALTER TABLE {tabela} ALTER COLUMN "{coluna}" SET NOT NULL'))
+        conn.execute(text(f"ALTER TABLE {tabela} DROP CONSTRAINT {restricao}"))
+    return preenchidas
+
+
+def preencher_dono_sugestoes(bind: Engine, lote: int = 5000) -> int:
+    """
+    Copia o dono da chamada para sugestoesia.id_usuario. Um trigger preenche
+    as sugestões novas gravadas sem ele (a versão anterior da aplicação,
+    durante o deploy); as antigas são preenchidas em lotes. Retorna quantas.
+    """
+    if bind.dialect.name != "postgresql":
+        return 0
+    with bind.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE OR REPLACE FUNCTION sugestoesia_preencher_usuario() "
+                "RETURNS trigger AS $$ BEGIN "
+                "NEW.id_usuario := (SELECT id_usuario FROM chamadas "
+                "WHERE id_chamada = NEW.id_chamada); RETURN NEW; "
+                "END $$ LANGUAGE plpgsql"
+            )
+        )
+        conn.execute(
+            text("DROP TRIGGER IF EXISTS sugestoesia_preencher_usuario ON sugestoesia")
+        )
+        conn.execute(
+            text(
+                "CREATE TRIGGER sugestoesia_preencher_usuario BEFORE INSERT "
+                "ON sugestoesia FOR EACH ROW WHEN (NEW.id_usuario IS NULL) "
+                "EXECUTE FUNCTION sugestoesia_preencher_usuario()"
+            )
+        )
+    if coluna_obrigatoria(bind, "sugestoesia", "id_usuario"):
+        return 0
+
+    dono = (
+        select(Chamada.id_usuario)
+        .where(Chamada.id_chamada == SugestaoIA.id_chamada)
+        .scalar_subquery()
+    )
+    preenchidas = 0
+    ultimo = None
+    while True:
+        with bind.begin() as conn:
+            query = select(SugestaoIA.id_sugestao).where(
+                SugestaoIA.id_usuario.is_(None)
+            )
+            if ultimo is not None:
+                query = query.where(SugestaoIA.id_sugestao > ultimo)
+            ids = conn.scalars(query.order_by(SugestaoIA.id_sugestao).limit(lote)).all()
+            if ids:
+                conn.execute(
+                    update(SugestaoIA.__table__)
+                    .where(SugestaoIA.id_sugestao.in_(ids))
+                    .values(id_usuario=dono)
+                )
+        if not ids:
+            return preenchidas
+        preenchidas += len(ids)
+        ultimo = ids[-1]
+        logger.info("sugestoesia: %d donos preenchidos", preenchidas)
+
+
+def migrar(bind: Engine) -> None:
+    """
+    Cria as tabelas, colunas anuláveis e índices que faltam no banco e as
+    partições dos próximos meses do histórico de chat, e aplica os NOT NULL
+    novos. Roda uma vez por deploy
+    (scripts.migrar), não na subida de cada worker.
+    """
+    with bloqueio_migracao(bind):
+        Base.metadata.create_all(bind=bind)
+        create_missing_columns(bind)
+        create_missing_indexes(bind)
+        garantir_particoes(bind, settings.HISTORICO_CHAT_MESES_FUTUROS)
+        # Chave do cursor de /vendas/ (NULL ficaria fora da paginação)
+        sem_data = tornar_obrigatoria(
+            bind,
+            "vendas",
+            "data_criacao",
+            "COALESCE(data_atualizacao, now() AT TIME ZONE 'utc')",
+        )
+        if sem_data:
+            logger.warning(
+                "%d vendas sem data_criacao preenchidas: reconstrua o resumo "
+                "(python -m scripts.resumo_vendas rebuild)",
+                sem_data,
+            )
+        # Dono das sugestões (filtro de /sugestoes): sem ele, não apareceriam
+        preencher_dono_sugestoes(bind)
+        tornar_obrigatoria(
+            bind,
+            "sugestoesia",
+            "id_usuario",
+            "(SELECT c.id_usuario FROM chamadas c "
+            "WHERE c.id_chamada = sugestoesia.id_chamada)",
+        )
+
+
+def colunas_em_texto(bind: Engine) -> list[tuple]:
+    """Colunas TextoComprimido ainda em TEXT no banco: (tabela, coluna)"""
+    if bind.dialect.name != "postgresql":
+        return []  # SQLite aceita bytes na coluna como está
+
+    inspector = inspect(bind)
+    pendentes = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        tipos = {c["name"]: c["type"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if (
+                isinstance(column.type, TextoComprimido)
+                and column.name in tipos
+                and tipos[column.name].python_type is str
+            ):
+                pendentes.append((table, column))
+    return pendentes
+
+
+def marcar_colunas_em_texto(bind: Engine) -> list[tuple]:
+    """
+    Marca as colunas TextoComprimido ainda em TEXT para gravarem o texto puro
+    (chamado no startup, antes de atender requisições). Retorna as marcadas.
+    """
+    pendentes = colunas_em_texto(bind)
+    for _, column in pendentes:
+        column.type.em_texto = True
+    return pendentes
+
+
+def converter_para_bytea(
+    bind: Engine, tabela: str, coluna: str, chave: list[str], lote: int, pausa: float
+) -> int:
+    """
+    Converte uma coluna TEXT para BYTEA sem reescrever a tabela sob bloqueio:
+    cria a coluna nova (mantida em dia por um trigger enquanto a aplicação
+    antiga grava), preenche em lotes com o texto já comprimido e troca as
+    colunas em uma transação curta. Pode ser interrompida e executada de novo.
+    Retorna as linhas preenchidas.
+    """
+    nova = f"{coluna}_bytea"
+    funcao = f"{tabela}_{coluna}_bytea"
+    restricao = f"{tabela}_{nova}_preenchida"
+
+    with bind.begin() as conn:
+        obrigatoria = conn.scalar(
+            text(
+                "SELECT is_nullable = 'NO' FROM information_schema.columns "
+                "WHERE table_name = :t AND column_name = :c"
+            ),
+            {"t": tabela, "c": coluna},
+        )
+        conn.execute(
+            text(f'ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS "{nova}" BYTEA')
+        )
+        conn.execute(
+            text(
+                f"CREATE OR REPLACE FUNCTION {funcao}() RETURNS trigger AS $$ BEGIN "
+                f'NEW."{nova}" := convert_to(NEW."{coluna}", \'UTF8\'); RETURN NEW; '
+                "END $$ LANGUAGE plpgsql"
+            )
+        )
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {funcao} ON {tabela}"))
+        conn.execute(
+            text(
+                f'CREATE TRIGGER {funcao} BEFORE INSERT OR UPDATE OF "{coluna}" '
+                f"ON {tabela} FOR EACH ROW EXECUTE FUNCTION {funcao}()"
+            )
+        )
+        existe = conn.scalar(
+            text("SELECT 1 FROM pg_constraint WHERE conname = :n"), {"n": restricao}
+        )
+        if obrigatoria and not existe:
+            # NOT VALID: não varre a tabela agora; validada após o preenchimento
+            conn.execute(
+                text(
+                    f"ALTER TABLE {tabela} ADD CONSTRAINT {restricao} "
+                    f'CHECK ("{nova}" IS NOT NULL) NOT VALID'
+                )
+            )
+
+    # Preenchimento em lotes (transações curtas), em ordem da chave primária.
+    # FOR UPDATE: uma alteração simultânea espera o lote e o trigger grava a
+    # versão nova depois.
+    ordem = ", ".join(chave)
+    parametros = [f"k{i}" for i in range(len(chave))]
+    depois_de = f"({ordem}) > ({', '.join(':' + p for p in parametros)})"
+    pendente = f'"{nova}" IS NULL AND "{coluna}" IS NOT NULL'
+    selecionar = (
+        f'SELECT {ordem}, "{coluna}" FROM {tabela} WHERE {pendente} {{}} '
+        f"ORDER BY {ordem} LIMIT :lote FOR UPDATE"
+    )
+    primeiro = text(selecionar.format(""))
+    seguinte = text(selecionar.format(f"AND {depois_de}"))
+    atualizar = text(
+        f'UPDATE {tabela} SET "{nova}" = :dados WHERE '
+        + " AND ".join(f"{c} = :{p}" for c, p in zip(chave, parametros))
+    )
+    preenchidas = 0
+    ultimo: dict = {}
+    while True:
+        with bind.begin() as conn:
+            linhas = conn.execute(
+                seguinte if ultimo else primeiro, {"lote": lote, **ultimo}
+            ).all()
+            if linhas:
+                conn.execute(
+                    atualizar,
+                    [
+                        {
+                            **dict(zip(parametros, linha[:-1])),
+                            "dados": comprimir(linha[-1]),
+                        }
+                        for linha in linhas
+                    ],
+                )
+        if not linhas:
+            break
+        preenchidas += len(linhas)
+        ultimo = dict(zip(parametros, linhas[-1][:-1]))
+        logger.info("%s.%s: %d linhas convertidas", tabela, coluna, preenchidas)
+        if pausa:
+            time.sleep(pausa)
+
+    if obrigatoria:
+        with bind.begin() as conn:
+            # Varre a tabela sem bloquear leituras e escritas
+            conn.execute(text(f"ALTER TABLE {tabela} VALIDATE CONSTRAINT {restricao}"))
+
+    # Troca: só operações de catálogo (o NOT NULL usa a restrição validada)
+    with bind.begin() as conn:
+        conn.execute(text("SET LOCAL lock_timeout = '10s'"))
+        conn.execute(text(f"LOCK TABLE {tabela} IN ACCESS EXCLUSIVE MODE"))
+        conn.execute(
+            text(
+                f'UPDATE {tabela} SET "{nova}" = convert_to("{coluna}", \'UTF8\') '
+                f'WHERE "{nova}" IS NULL AND "{coluna}" IS NOT NULL'
+            )
+        )
+        conn.execute(text(f"DROP TRIGGER {funcao} ON {tabela}"))
+        conn.execute(text(f"DROP FUNCTION {funcao}()"))
+        if obrigatoria:
+            conn.execute(
+                text(f'ALTER TABLE {tabela} ALTER COLUMN "{nova}" SET NOT NULL')
+            )
+            conn.execute(text(f"ALTER TABLE {tabela} DROP CONSTRAINT {restricao}"))
+        conn.execute(text(f'ALTER TABLE {tabela} DROP COLUMN "{coluna}"'))
+        conn.execute(text(f'ALTER TABLE {tabela} RENAME COLUMN "{nova}" TO "{coluna}"'))
+    return preenchidas
+
+
+def converter_colunas_comprimidas(bind: Engine, lote: int, pausa: float) -> list[str]:
+    """Converte para BYTEA as colunas TextoComprimido ainda em TEXT"""
+    convertidas = []
+    for table, column in colunas_em_texto(bind):
+        chave = [c.name for c in table.primary_key.columns]
+        converter_para_bytea(bind, table.name, column.name, chave, lote, pausa)
+        convertidas.append(f"{table.name}.{column.name}")
+    return convertidas
@@ -0,0 +1,96 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+# Header com o cursor da próxima página (a resposta continua sendo uma lista)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _serializar(valor: Any) -> Any:
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (UUID, Decimal)):
+        return str(valor)
+    return valor
+
+
+def _converter(valor: Any, coluna) -> Any:
+    if valor is None:
+        return None
+    tipo = coluna.type.python_type
+    if tipo is datetime:
+        return datetime.fromisoformat(valor)
+    if tipo is date:
+        return date.fromisoformat(valor)
+    if tipo is UUID:
+        return UUID(valor)
+    if tipo is Decimal:
+        return Decimal(valor)
+    return valor
+
+
+def encode_cursor(valores: Sequence[Any]) -> str:
+    """Gera um cursor opaco a partir dos valores das chaves de ordenação"""
+    bruto = json.dumps([_serializar(v) for v in valores], separators=(",", ":"))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, colunas: Sequence) -> tuple:
+    """Decodifica um cursor gerado por encode_cursor"""
+    try:
+        preenchido = cursor + "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(preenchido))
+        if not isinstance(valores, list) or len(valores) != len(colunas):
+            raise ValueError("cursor com formato inesperado")
+        return tuple(_converter(v, c) for v, c in zip(valores, colunas))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido"
+        )
+
+
+def paginar(
+    query: Query,
+    colunas: Sequence,
+    cursor: Optional[str],
+    desc: bool = False,
+    skip: int = 0,
+) -> Query:
+    """
+    Ordena a query pelas colunas (a última deve ser única, ex.: a chave primária)
+    e, se houver cursor, retorna apenas as linhas depois dele (keyset pagination).
+    As colunas não podem ser NULL (a comparação de tuplas ignoraria as linhas);
+    use NOT NULL ou uma expressão com coalesce. `skip` (OFFSET) não combina
+    com o cursor.
+    """
+    if cursor and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use cursor ou skip, não os dois",
+        )
+    if cursor:
+        valores = decode_cursor(cursor, colunas)
+        chave = tuple_(*colunas) if len(colunas) > 1 else colunas[0]
+        limite = tuple_(*valores) if len(colunas) > 1 else valores[0]
+        query = query.filter(chave < limite if desc else chave > limite)
+
+    query = query.order_by(*(c.desc() if desc else c.asc() for c in colunas))
+    return query.offset(skip) if skip else query
+
+
+def definir_proximo_cursor(
+    response: Response, itens: Sequence, limit: int, colunas: Sequence
+) -> None:
+    """Envia o cursor da próxima página no header (apenas se a página veio cheia)"""
+    if limit > 0 and len(itens) >= limit:
+        ultimo = itens[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(ultimo, c.key) for c in colunas]
+        )
@@ -0,0 +1,117 @@
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import settings
+
+
+class PoolWaitStats:
+    """Tempo de espera por conexões do pool (checkout)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timeout: bool = False) -> None:
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            esperas = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (
+                    round(self.total_wait / esperas * 1000, 3) if esperas else 0.0
+                ),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+sync_pool_stats = PoolWaitStats()
+async_pool_stats = PoolWaitStats()
+
+
+class _PoolWaitMixin:
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - inicio, timeout=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - inicio)
+        return conn
+
+
+class InstrumentedQueuePool(_PoolWaitMixin, QueuePool):
+    wait_stats = sync_pool_stats
+
+
+class InstrumentedAsyncQueuePool(_PoolWaitMixin, AsyncAdaptedQueuePool):
+    wait_stats = async_pool_stats
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Argumentos de create_engine a partir das configurações de pool"""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": timeout}
+            }
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+
+    return options
+
+
+def pool_status(engine: Optional[Engine]) -> Optional[dict]:
+    """Estado atual do pool de conexões de uma engine"""
+    if engine is None:
+        return None
+
+    pool = engine.pool
+    status = {"pool": pool.__class__.__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "timeout": pool.timeout(),
+            }
+        )
+    if isinstance(pool, _PoolWaitMixin):
+        status.update(pool.wait_stats.snapshot())
+    return status
@@ -0,0 +1,122 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import cast, delete, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.venda import Venda
+from app.models.venda_resumo import VendaResumoMensal
+
+
+def _inicio_do_mes(momento: datetime) -> date:
+    return date(momento.year, momento.month, 1)
+
+
+def aplicar_venda(db: Session, venda: Venda, sinal: int = 1) -> None:
+    """
+    Soma (sinal=1) ou subtrai (sinal=-1) a venda do resumo mensal.
+    Deve ser chamada na mesma transação que grava a venda.
+    """
+    if venda.id_usuario is None or venda.data_criacao is None:
+        return
+
+    stmt = insert(VendaResumoMensal).values(
+        id_usuario=venda.id_usuario,
+        mes=_inicio_do_mes(venda.data_criacao),
+        status=venda.status,
+        quantidade=sinal,
+        valor_total=Decimal(venda.valor) * sinal,
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[
+                VendaResumoMensal.id_usuario,
+                VendaResumoMensal.mes,
+                VendaResumoMensal.status,
+            ],
+            set_={
+                "quantidade": VendaResumoMensal.quantidade + stmt.excluded.quantidade,
+                "valor_total": VendaResumoMensal.valor_total
+                + stmt.excluded.valor_total,
+            },
+        )
+    )
+
+
+def _agregado_das_vendas(id_usuario: Optional[UUID] = None):
+    """SELECT que recalcula o resumo a partir da tabela de vendas"""
+    mes = cast(func.date_trunc("month", Venda.data_criacao), VendaResumoMensal.mes.type)
+    query = select(
+        Venda.id_usuario,
+        mes.label("mes"),
+        Venda.status,
+        func.count(Venda.id_venda).label("quantidade"),
+        func.coalesce(func.sum(Venda.valor), literal(0)).label("valor_total"),
+    ).where(Venda.id_usuario.is_not(None), Venda.data_criacao.is_not(None))
+
+    if id_usuario is not None:
+        query = query.where(Venda.id_usuario == id_usuario)
+
+    return query.group_by(Venda.id_usuario, mes, Venda.status)
+
+
+def reconstruir_resumo(db: Session, id_usuario: Optional[UUID] = None) -> int:
+    """Recria o resumo mensal (de um usuário ou de todos) a partir das vendas"""
+    # Bloqueia gravações concorrentes no resumo até o fim da transação
+    db.execute(text(f"LOCK TABLE {VendaResumoMensal.__tablename__} IN EXCLUSIVE MODE"))
+
+    apagar = delete(VendaResumoMensal)
+    if id_usuario is not None:
+        apagar = apagar.where(VendaResumoMensal.id_usuario == id_usuario)
+    db.execute(apagar)
+
+    resultado = db.execute(
+        insert(VendaResumoMensal).from_select(
+            ["id_usuario", "mes", "status", "quantidade", "valor_total"],
+            _agregado_das_vendas(id_usuario),
+        )
+    )
+    db.commit()
+    return resultado.rowcount
+
+
+def verificar_resumo(db: Session, id_usuario: Optional[UUID] = None) -> list[dict]:
+    """Lista as divergências entre o resumo mensal e as vendas"""
+    esperado = {
+        (linha.id_usuario, linha.mes, linha.status): (
+            linha.quantidade,
+            Decimal(linha.valor_total),
+        )
+        for linha in db.execute(_agregado_das_vendas(id_usuario))
+    }
+
+    query = select(VendaResumoMensal)
+    if id_usuario is not None:
+        query = query.where(VendaResumoMensal.id_usuario == id_usuario)
+    atual = {
+        (linha.id_usuario, linha.mes, linha.status): (
+            linha.quantidade,
+            Decimal(linha.valor_total),
+        )
+        for linha in db.scalars(query)
+    }
+
+    divergencias = []
+    for chave in esperado.keys() | atual.keys():
+        valor_esperado = esperado.get(chave, (0, Decimal(0)))
+        valor_atual = atual.get(chave, (0, Decimal(0)))
+        if valor_esperado != valor_atual:
+            id_usuario_div, mes, status = chave
+            divergencias.append(
+                {
+                    "id_usuario": id_usuario_div,
+                    "mes": mes,
+                    "status": status,
+                    "esperado": valor_esperado,
+                    "atual": valor_atual,
+                }
+            )
+    return divergencias
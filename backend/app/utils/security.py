@@ -1,36 +1,63 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from sqlalchemy import event, update
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.models.user import User
-from app.utils.database import get_db
-
-# Configuração para hash de senhas
-# Usando Argon2 (mais moderno e seguro que bcrypt)
-pwd_context = CryptContext(
-    schemes=["argon2", "bcrypt"],  # Argon2 primeiro, bcrypt como fallback
-    deprecated="auto",
-    argon2__rounds=4,
+from app.utils.cache import TTLCache
+from app.utils.database import DBSession, get_async_db, get_db, run_db
+from app.utils.hashing import (  # noqa: F401 - pwd_context reexportado
+    HashingSaturatedError,
+    hashing_service,
+    pwd_context,
 )
 
 # Esquema de segurança Bearer Token
 security = HTTPBearer()
 
+# Cache de usuários autenticados, indexado pelo "sub" do token
+# (cache por processo: cada worker mantém o seu)
+user_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+def _servico_sobrecarregado() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servidor ocupado, tente novamente em instantes",
+        headers={"Retry-After": "1"},
+    )
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se a senha está correta"""
-    return pwd_context.verify(plain_password, hashed_password)
+    valido, _ = verify_and_update_password(plain_password, hashed_password)
+    return valido
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """Verifica a senha e retorna um novo hash se os parâmetros estiverem desatualizados"""
+    try:
+        return hashing_service.verify_and_update(plain_password, hashed_password)
+    except HashingSaturatedError:
+        raise _servico_sobrecarregado()
 
 
 def get_password_hash(password: str) -> str:
     """Gera hash da senha"""
-    return pwd_context.hash(password)
+    try:
+        return hashing_service.hash(password)
+    except HashingSaturatedError:
+        raise _servico_sobrecarregado()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -44,7 +71,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
@@ -66,12 +93,46 @@ def decode_token(token: str) -> dict:
         )
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """Obtém o usuário atual a partir do token"""
-    token = credentials.credentials
+def invalidate_user_cache(user_id) -> None:
+    """Remove o usuário do cache de autenticação"""
+    user_cache.invalidate(str(user_id))
+
+
+def revoke_user_tokens(db: Session, user_id) -> None:
+    """
+    Revoga todos os tokens já emitidos para o usuário (gravado no banco, vale
+    para todos os workers). Truncado ao segundo, como o "iat" dos tokens: um
+    novo login no mesmo segundo continua válido.
+    """
+    db.execute(
+        update(User)
+        .where(User.id_usuario == user_id)
+        .values(tokens_revogados_em=datetime.utcnow().replace(microsecond=0))
+    )
+    db.commit()
+    invalidate_user_cache(user_id)
+
+
+def _token_revogado(user: User, payload: dict) -> bool:
+    revogado_em = user.tokens_revogados_em
+    if revogado_em is None:
+        return False
+
+    emitido_em = payload.get("iat")
+    if emitido_em is None:
+        return True
+    return datetime.utcfromtimestamp(emitido_em) < revogado_em
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidar_usuario_alterado(mapper, connection, target) -> None:
+    """Qualquer alteração na linha do usuário invalida o cache"""
+    invalidate_user_cache(target.id_usuario)
+
+
+def _ler_token(token: str) -> tuple[dict, str]:
+    """Payload do token e o "sub" (id do usuário)"""
     payload = decode_token(token)
 
     user_id_str: str = payload.get("sub")
@@ -81,11 +142,13 @@ async def get_current_user(
             detail="Token inválido",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload, user_id_str
 
+
+def _carregar_usuario(db: Session, user_id_str: str) -> User:
+    """Lê o usuário do banco (desvinculado da sessão, para o cache)"""
     # Converter string UUID para objeto UUID
     try:
-        from uuid import UUID
-
         user_id = UUID(user_id_str)
     except (ValueError, AttributeError):
         raise HTTPException(
@@ -101,5 +164,53 @@ async def get_current_user(
             detail="Usuário não encontrado",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Desvincula da sessão para que o objeto possa ser reutilizado por outros
+    # requests
+    db.expunge(user)
+    return user
 
+
+def _verificar_revogacao(user: User, payload: dict) -> User:
+    # Outros workers veem a revogação quando o usuário sai do cache
+    # (até AUTH_CACHE_TTL_SECONDS depois do logout)
+    if _token_revogado(user, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revogado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    Obtém o usuário atual a partir do token (rotas síncronas: em um cache
+    miss, usa a mesma sessão get_db da rota)
+    """
+    payload, user_id_str = _ler_token(credentials.credentials)
+    user = user_cache.get(user_id_str)
+    if user is None:
+        user = _carregar_usuario(db, user_id_str)
+        user_cache.set(user_id_str, user)
+    return _verificar_revogacao(user, payload)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: DBSession = Depends(get_async_db),
+) -> User:
+    """Obtém o usuário atual a partir do token (rotas async: sessão get_async_db)"""
+    return await usuario_do_token(credentials.credentials, db)
+
+
+async def usuario_do_token(token: str, db: DBSession) -> User:
+    """Valida o token e retorna o usuário (também usado em WebSockets)"""
+    payload, user_id_str = _ler_token(token)
+    user = user_cache.get(user_id_str)
+    if user is None:
+        user = await run_db(db, _carregar_usuario, user_id_str)
+        user_cache.set(user_id_str, user)
+    return _verificar_revogacao(user, payload)
@@ -0,0 +1,44 @@
+import re
+from typing import Optional
+
+from app.config import settings
+
+_NAO_DIGITO = re.compile(r"\D")
+
+
+def normalizar_telefone(
+    numero: Optional[str], ddi_padrao: Optional[str] = None
+) -> Optional[str]:
+    """
+    Converte um telefone digitado livremente para E.164 ("+5511987654321").
+
+    Aceita "+<DDI>...", "00<DDI>..." e os formatos nacionais brasileiros
+    (DDD + número, com ou sem 0 e código de operadora na frente). Números sem
+    DDD ou com tamanho impossível retornam None.
+    """
+    if not numero:
+        return None
+    ddi_padrao = ddi_padrao or settings.TELEFONE_DDI_PADRAO
+
+    digitos = _NAO_DIGITO.sub("", numero)
+    internacional = numero.strip().startswith("+")
+    if not internacional and digitos.startswith("00"):
+        digitos = digitos[2:]
+        internacional = True
+
+    if not internacional:
+        if digitos.startswith("0"):
+            # Prefixo de longa distância: 0 + operadora (2 dígitos) + DDD + número
+            # ou apenas 0 + DDD + número
+            digitos = digitos[1:]
+            if len(digitos) in (12, 13):
+                digitos = digitos[2:]
+        if len(digitos) in (10, 11):
+            digitos = ddi_padrao + digitos
+        elif not (len(digitos) in (12, 13) and digitos.startswith(ddi_padrao)):
+            return None
+
+    # E.164: até 15 dígitos, sem zero no início do código do país
+    if not 8 <= len(digitos) <= 15 or digitos.startswith("0"):
+        return None
+    return "+" + digitos
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.chamada import Chamada
+from app.models.transcricao_segmento import TranscricaoSegmento
+from app.schemas.chamada import TranscricaoSegmentoCreate
+from app.utils.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class _Pendentes:
+    __slots__ = ("segmentos", "desde", "conexoes")
+
+    def __init__(self):
+        self.segmentos: list[dict] = []
+        self.desde = 0.0  # instante do trecho pendente mais antigo
+        self.conexoes = 0  # WebSockets abertos da chamada neste worker
+
+
+class BufferTranscricoes:
+    """
+    Trechos de transcrição recebidos pelos WebSockets de chamadas em
+    andamento, guardados em memória (por worker) e gravados em lote na tabela
+    transcricao_segmentos: ao juntar `lote` trechos ou quando o mais antigo
+    passa de `intervalo` segundos. Uma chamada pode ter mais de um WebSocket
+    (reconexão, outra aba); ela é esquecida ao fechar o último.
+    """
+
+    def __init__(self, lote: int, intervalo: float):
+        self.lote = lote
+        self.intervalo = intervalo
+        self._chamadas: dict[UUID, _Pendentes] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, id_chamada: UUID) -> None:
+        """Conta uma conexão aberta da chamada"""
+        with self._lock:
+            self._chamadas.setdefault(id_chamada, _Pendentes()).conexoes += 1
+
+    def liberar(self, id_chamada: UUID) -> list[dict]:
+        """
+        Conexão encerrada: retorna os trechos pendentes da chamada e a esquece
+        se era a última conexão
+        """
+        with self._lock:
+            pendentes = self._chamadas.get(id_chamada)
+            if pendentes is None:
+                return []
+            pendentes.conexoes -= 1
+            if pendentes.conexoes <= 0:
+                del self._chamadas[id_chamada]
+            segmentos, pendentes.segmentos = pendentes.segmentos, []
+            return segmentos
+
+    def adicionar(self, id_chamada: UUID, segmentos: list[dict]) -> bool:
+        """
+        Guarda os trechos da chamada já registrada. Retorna True quando é hora
+        de gravar os pendentes no banco.
+        """
+        with self._lock:
+            pendentes = self._chamadas[id_chamada]
+            if not pendentes.segmentos:
+                pendentes.desde = time.monotonic()
+            pendentes.segmentos.extend(segmentos)
+            return (
+                len(pendentes.segmentos) >= self.lote
+                or time.monotonic() - pendentes.desde >= self.intervalo
+            )
+
+    def retirar(self, id_chamada: UUID) -> list[dict]:
+        """Trechos pendentes da chamada"""
+        with self._lock:
+            pendentes = self._chamadas.get(id_chamada)
+            if pendentes is None:
+                return []
+            segmentos, pendentes.segmentos = pendentes.segmentos, []
+            return segmentos
+
+    def vencidas(self, todos: bool = False) -> list[UUID]:
+        """Chamadas cujo trecho pendente mais antigo passou do intervalo"""
+        limite = time.monotonic() - self.intervalo
+        with self._lock:
+            return [
+                id_chamada
+                for id_chamada, pendentes in self._chamadas.items()
+                if pendentes.segmentos and (todos or pendentes.desde <= limite)
+            ]
+
+
+def novos_segmentos(
+    id_chamada: UUID, trechos: list[TranscricaoSegmentoCreate]
+) -> list[dict]:
+    """Linhas de transcricao_segmentos (sem momento: instante do recebimento)"""
+    agora = datetime.utcnow()
+    return [
+        {"id_chamada": id_chamada, "momento": t.momento or agora, "texto": t.texto}
+        for t in trechos
+    ]
+
+
+def gravar_segmentos(db: Session, segmentos: list[dict]) -> None:
+    """Grava os trechos com um único INSERT de várias linhas"""
+    if not segmentos:
+        return
+    db.execute(insert(TranscricaoSegmento), segmentos)
+    db.commit()
+
+
+def gravar_pendentes(
+    db: Session,
+    ids_chamadas: list[UUID],
+    retirar: Optional[Callable[[UUID], list[dict]]] = None,
+) -> None:
+    """
+    Grava os trechos em memória das chamadas. Bloqueia as chamadas (FOR KEY
+    SHARE) antes de tirar os trechos da memória: um finalizar simultâneo (FOR
+    UPDATE na chamada) espera esta gravação e encontra os trechos no banco, ou
+    esta espera o finalizar e não acha mais os trechos que ele juntou.
+    `retirar` (padrão: buffer_transcricoes.retirar) é chamado mesmo se o
+    bloqueio falhar.
+    """
+    retirar = retirar or buffer_transcricoes.retirar
+    ids_chamadas = sorted(set(ids_chamadas))
+    segmentos = []
+    try:
+        if ids_chamadas:
+            # Em ordem: duas gravações não se bloqueiam em ordens diferentes
+            db.execute(
+                select(Chamada.id_chamada)
+                .where(Chamada.id_chamada.in_(ids_chamadas))
+                .order_by(Chamada.id_chamada)
+                .with_for_update(read=True, key_share=True)
+            )
+    finally:
+        for id_chamada in ids_chamadas:
+            segmentos.extend(retirar(id_chamada))
+    if segmentos:
+        db.execute(insert(TranscricaoSegmento), segmentos)
+    db.commit()
+
+
+def descarregar(db: Session, id_chamada: UUID) -> None:
+    """Grava os trechos pendentes da chamada"""
+    gravar_pendentes(db, [id_chamada])
+
+
+def montar_transcricao(db: Session, chamada: Chamada) -> None:
+    """
+    Junta os trechos gravados (e os pendentes neste worker) da chamada, em
+    ordem, ao fim de Chamada.transcricao e apaga os trechos. Quem chama
+    bloqueia a chamada (FOR UPDATE) antes, para não concorrer com as gravações
+    de gravar_pendentes, e faz o commit. Trechos ainda em memória em outro
+    worker (WebSocket aberto nele) não entram.
+    """
+    segmentos = buffer_transcricoes.retirar(chamada.id_chamada)
+    if segmentos:
+        db.execute(insert(TranscricaoSegmento), segmentos)
+
+    filtro = TranscricaoSegmento.id_chamada == chamada.id_chamada
+    textos = db.scalars(
+        select(TranscricaoSegmento.texto)
+        .where(filtro)
+        .order_by(TranscricaoSegmento.momento, TranscricaoSegmento.id_segmento)
+    ).all()
+    if not textos:
+        return
+
+    if chamada.transcricao:
+        textos.insert(0, chamada.transcricao)
+    chamada.transcricao = "\n".join(textos)
+    db.execute(delete(TranscricaoSegmento).where(filtro))
+
+
+def _gravar_em_sessao_propria(ids_chamadas: list[UUID]) -> None:
+    db = SessionLocal()
+    try:
+        gravar_pendentes(db, ids_chamadas)
+    finally:
+        db.close()
+
+
+async def descarregar_periodicamente() -> None:
+    """Grava os trechos de chamadas que pararam de enviar antes de fechar o lote"""
+    while True:
+        await asyncio.sleep(buffer_transcricoes.intervalo)
+        vencidas = buffer_transcricoes.vencidas()
+        if not vencidas:
+            continue
+        try:
+            await run_in_threadpool(_gravar_em_sessao_propria, vencidas)
+        except Exception:
+            logger.exception("Falha ao gravar os trechos de %d chamadas", len(vencidas))
+
+
+def descarregar_tudo() -> None:
+    """Grava todos os trechos pendentes (no desligamento do worker)"""
+    _gravar_em_sessao_propria(buffer_transcricoes.vencidas(todos=True))
+
+
+buffer_transcricoes = BufferTranscricoes(
+    lote=settings.TRANSCRICAO_LOTE_SEGMENTOS,
+    intervalo=settings.TRANSCRICAO_FLUSH_SECONDS,
+)
@@ -0,0 +1,144 @@
+"""
+Benchmark de concorrência: consultas lentas e rápidas misturadas em cada modo de banco.
+
+Modos comparados:
+    bloqueante - rota async com Session síncrona no event loop (comportamento antigo)
+    sync       - Session síncrona executada via threadpool (DATABASE_ASYNC=false)
+    async      - AsyncSession + asyncpg (DATABASE_ASYNC=true)
+
+Uso (a partir de backend/, requer httpx e asyncpg):
+    python -m benchmarks.bench_async_db --requests 400 --concorrencia 50 --lentas 0.1
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.utils.database import _async_database_url, run_db
+
+
+def criar_app(modo: str, pool: int):
+    app = FastAPI()
+
+    if modo == "async":
+        engine = create_async_engine(
+            _async_database_url(), pool_size=pool, max_overflow=0
+        )
+        fabrica = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+        async def get_session():
+            async with fabrica() as db:
+                yield db
+
+        async def fechar():
+            await engine.dispose()
+
+    else:
+        engine = create_engine(settings.DATABASE_URL, pool_size=pool, max_overflow=0)
+        fabrica = sessionmaker(bind=engine)
+
+        def get_session():
+            db = fabrica()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        async def fechar():
+            engine.dispose()
+
+    def consulta(db: Session, atraso: float):
+        return db.execute(text("SELECT pg_sleep(:s)"), {"s": atraso}).scalar()
+
+    if modo == "bloqueante":
+
+        @app.get("/consulta/{atraso}")
+        async def rota_bloqueante(atraso: float, db=Depends(get_session)):
+            consulta(db, atraso)
+            return {"ok": True}
+
+    else:
+
+        @app.get("/consulta/{atraso}")
+        async def rota(atraso: float, db=Depends(get_session)):
+            await run_db(db, consulta, atraso)
+            return {"ok": True}
+
+    return app, fechar
+
+
+async def rodar(
+    modo: str, total: int, concorrencia: int, fracao_lentas: float, atraso_lento: float
+) -> dict:
+    app, fechar = criar_app(modo, concorrencia)
+    transport = httpx.ASGITransport(app=app)
+    latencias_rapidas: list[float] = []
+    semaforo = asyncio.Semaphore(concorrencia)
+    rng = random.Random(42)
+    atrasos = [
+        atraso_lento if rng.random() < fracao_lentas else 0 for _ in range(total)
+    ]
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def requisicao(atraso: float):
+            async with semaforo:
+                inicio = time.perf_counter()
+                r = await client.get(f"/consulta/{atraso}")
+                r.raise_for_status()
+                if atraso == 0:
+                    latencias_rapidas.append(time.perf_counter() - inicio)
+
+        await requisicao(0)  # aquece o pool de conexões
+        latencias_rapidas.clear()
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(requisicao(a) for a in atrasos))
+        duracao = time.perf_counter() - inicio
+
+    await fechar()
+    return {
+        "modo": modo,
+        "req_por_segundo": total / duracao,
+        "p50_rapidas_ms": statistics.median(latencias_rapidas) * 1000,
+        "max_rapidas_ms": max(latencias_rapidas) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concorrencia", type=int, default=50)
+    parser.add_argument(
+        "--lentas", type=float, default=0.1, help="fração de consultas lentas"
+    )
+    parser.add_argument(
+        "--atraso", type=float, default=0.5, help="segundos da consulta lenta"
+    )
+    parser.add_argument("--modos", nargs="+", default=["bloqueante", "sync", "async"])
+    args = parser.parse_args()
+
+    print(f"{'modo':>10} {'req/s':>8} {'p50 rápidas ms':>15} {'máx rápidas ms':>15}")
+    for modo in args.modos:
+        r = asyncio.run(
+            rodar(modo, args.requests, args.concorrencia, args.lentas, args.atraso)
+        )
+        print(
+            f"{r['modo']:>10} {r['req_por_segundo']:>8.1f} "
+            f"{r['p50_rapidas_ms']:>15.1f} {r['max_rapidas_ms']:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark do autocomplete de clientes (/clientes/autocomplete).
+
+Cria um usuário temporário com N clientes (mesmos dados de bench_busca_clientes),
+mede o carregamento do índice em memória, a latência das buscas enquanto se
+digita e o custo de atualizar o índice após gravar um cliente.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_autocomplete --clientes 500000
+    python -m benchmarks.bench_autocomplete --limite-ms 10  # falha se p99 > 10ms
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+
+from sqlalchemy import delete
+
+from app.models.cliente import ClienteLead
+from app.models.user import User
+from app.utils.autocomplete import carregar_indice, resumo_do_cliente
+from app.utils.busca import normalizar_busca
+from app.utils.database import (
+    Base,
+    SessionLocal,
+    create_missing_columns,
+    create_missing_indexes,
+    engine,
+)
+from benchmarks.bench_busca_clientes import popular
+
+# Prefixos digitados letra a letra, como no HUD
+DIGITADOS = ["joao silva", "magalhaes", "fabio araujo", "padaria", "zzz"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clientes", type=int, default=500000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--limite-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    create_missing_columns(engine)
+    create_missing_indexes(engine)
+    id_usuario = uuid.uuid4()
+    db = SessionLocal()
+
+    try:
+        print(f"Populando {args.clientes} clientes...")
+        popular(db, id_usuario, args.clientes)
+
+        inicio = time.perf_counter()
+        indice = carregar_indice(db, id_usuario)
+        print(
+            f"✅ índice carregado em {time.perf_counter() - inicio:.1f} s "
+            f"({len(indice)} palavras)"
+        )
+    finally:
+        db.rollback()
+        db.execute(delete(User).where(User.id_usuario == id_usuario))
+        db.commit()
+        db.close()
+
+    latencias = []
+    for _ in range(args.repeticoes):
+        for texto in DIGITADOS:
+            for fim in range(1, len(texto) + 1):
+                inicio = time.perf_counter()
+                indice.buscar(texto[:fim], 10)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+    latencias.sort()
+    p99 = latencias[int(len(latencias) * 0.99)]
+    print(
+        f"✅ busca: p50 {statistics.median(latencias):.3f} ms | "
+        f"p99 {p99:.3f} ms | máx {latencias[-1]:.3f} ms"
+    )
+
+    gravacoes = []
+    for i in range(200):
+        cliente = ClienteLead(
+            id_cliente=uuid.uuid4(),
+            nome=f"Novo Cliente {i}",
+            empresa="Benchmark",
+            id_usuario=id_usuario,
+        )
+        cliente.nome_busca = normalizar_busca(cliente.nome)
+        cliente.empresa_busca = normalizar_busca(cliente.empresa)
+        inicio = time.perf_counter()
+        indice.salvar(*resumo_do_cliente(cliente))
+        gravacoes.append((time.perf_counter() - inicio) * 1000)
+    print(
+        f"✅ atualização do índice por cliente: p50 {statistics.median(gravacoes):.3f} ms"
+    )
+
+    if args.limite_ms is not None and p99 > args.limite_ms:
+        print(f"❌ p99 acima do limite de {args.limite_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
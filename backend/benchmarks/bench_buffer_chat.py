@@ -0,0 +1,126 @@
+"""
+Benchmark da gravação de mensagens do chat: vazão sustentada de
+POST /historico-chat com um INSERT + commit por mensagem (caminho direto) e
+com o write-behind (HISTORICO_CHAT_WRITE_BEHIND, lotes de --lote mensagens).
+
+Envia --mensagens POSTs com --concorrencia requests simultâneos pela
+aplicação inteira (httpx + ASGITransport) e, no write-behind, só para o
+relógio depois de gravar as pendentes (fechar()), conferindo que todas as
+mensagens chegaram ao banco. Remove os dados ao final.
+
+Uso (a partir de backend/, requer httpx):
+    python -m benchmarks.bench_buffer_chat --mensagens 5000 --concorrencia 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete, func, insert, select
+
+from app.main import app
+from app.models.historico_chat import HistoricoChat
+from app.models.user import User
+from app.utils.buffer_chat import buffer_mensagens
+from app.utils.database import SessionLocal
+from app.utils.security import create_access_token
+
+
+async def rodar(
+    modo: str, id_usuario, total: int, concorrencia: int, lote: int
+) -> dict:
+    headers = {
+        "Authorization": f"Bearer {create_access_token({'sub': str(id_usuario)})}"
+    }
+    if modo == "write-behind":
+        buffer_mensagens.ativo = True
+        buffer_mensagens.lote = lote
+        buffer_mensagens.iniciar()
+
+    latencias: list[float] = []
+    semaforo = asyncio.Semaphore(concorrencia)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def enviar(i: int):
+            async with semaforo:
+                inicio = time.perf_counter()
+                r = await client.post(
+                    "/historico-chat/",
+                    json={"interacao": f"Mensagem {i} do vendedor para o assistente."},
+                    headers=headers,
+                )
+                r.raise_for_status()
+                latencias.append(time.perf_counter() - inicio)
+
+        await enviar(-1)  # aquece o pool e o cache de autenticação
+        latencias.clear()
+        inicio = time.perf_counter()
+        await asyncio.gather(*(enviar(i) for i in range(total)))
+        await buffer_mensagens.fechar()
+        duracao = time.perf_counter() - inicio
+
+    buffer_mensagens.ativo = False
+    latencias.sort()
+    return {
+        "modo": modo,
+        "msg_por_segundo": total / duracao,
+        "p50_ms": statistics.median(latencias) * 1000,
+        "p99_ms": latencias[int(len(latencias) * 0.99)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mensagens", type=int, default=5000)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--lote", type=int, default=200)
+    parser.add_argument("--modos", nargs="+", default=["direto", "write-behind"])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    id_usuario = uuid.uuid4()
+    db.execute(
+        insert(User).values(
+            id_usuario=id_usuario,
+            nome="Benchmark",
+            e_mail=f"bench-{id_usuario}@example.com",
+            senha_hash="-",
+        )
+    )
+    db.commit()
+
+    def contar() -> int:
+        db.rollback()
+        return db.scalar(
+            select(func.count())
+            .select_from(HistoricoChat)
+            .where(HistoricoChat.id_usuario == id_usuario)
+        )
+
+    try:
+        print(f"{'modo':>12} {'msg/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for modo in args.modos:
+            antes = contar()
+            r = asyncio.run(
+                rodar(modo, id_usuario, args.mensagens, args.concorrencia, args.lote)
+            )
+            gravadas = contar() - antes - 1  # sem a do aquecimento
+            assert gravadas == args.mensagens, f"{modo}: {gravadas} gravadas"
+            print(
+                f"{r['modo']:>12} {r['msg_por_segundo']:>8.0f} "
+                f"{r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+            )
+    finally:
+        db.execute(delete(User).where(User.id_usuario == id_usuario))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
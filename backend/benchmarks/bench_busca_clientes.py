@@ -0,0 +1,144 @@
+"""
+Benchmark da busca de clientes (/clientes/buscar/nome) para um vendedor com
+muitos leads.
+
+Cria um usuário temporário com N clientes de nomes brasileiros aleatórios, compara
+a busca antiga (ILIKE '%termo%' sem limite) com a busca indexada (tsvector + GIN,
+20 resultados por página) e remove os dados ao final.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_busca_clientes --clientes 500000 --execucoes 20
+"""
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, insert
+
+from app.models.cliente import ClienteLead
+from app.models.user import User
+from app.routers.clientes import _buscar_clientes
+from app.utils.busca import normalizar_busca
+from app.utils.database import (
+    Base,
+    SessionLocal,
+    create_missing_columns,
+    create_missing_indexes,
+    engine,
+)
+
+PRENOMES = [
+    "João", "José", "Maria", "Ana", "Antônio", "Francisco", "Luís", "Márcia",
+    "Conceição", "Sebastião", "Letícia", "Vitória", "Júlia", "Cauã", "Fábio",
+    "Mônica", "Patrícia", "Rogério", "Simone", "Tânia",
+]  # fmt: skip
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Pereira", "Lima", "Gonçalves",
+    "Araújo", "Ribeiro", "Conceição", "Magalhães", "Brandão", "Assunção",
+    "Falcão", "Simões", "Guimarães", "Fontes", "Peixoto", "Queiroz", "Teixeira",
+]  # fmt: skip
+EMPRESAS = ["Padaria", "Mercado", "Oficina", "Clínica", "Construtora", "Farmácia"]
+
+TERMOS = ["joao", "conceicao silv", "magalh", "fabio ara", "zzz"]
+
+
+def popular(db, id_usuario, quantidade: int, lote: int = 10000) -> None:
+    db.execute(
+        insert(User).values(
+            id_usuario=id_usuario,
+            nome="Benchmark",
+            e_mail=f"bench-{id_usuario}@example.com",
+            senha_hash="-",
+        )
+    )
+
+    rng = random.Random(42)
+    for inicio in range(0, quantidade, lote):
+        linhas = []
+        for i in range(inicio, min(inicio + lote, quantidade)):
+            nome = (
+                f"{rng.choice(PRENOMES)} {rng.choice(SOBRENOMES)} "
+                f"{rng.choice(SOBRENOMES)} {i}"
+            )
+            empresa = f"{rng.choice(EMPRESAS)} {rng.choice(SOBRENOMES)}"
+            linhas.append(
+                {
+                    "id_cliente": uuid.uuid4(),
+                    "nome": nome,
+                    "nome_busca": normalizar_busca(nome),
+                    "empresa": empresa,
+                    "empresa_busca": normalizar_busca(empresa),
+                    "id_usuario": id_usuario,
+                }
+            )
+        db.execute(insert(ClienteLead), linhas)
+    db.commit()
+    db.connection().exec_driver_sql("ANALYZE clientesleads")
+    db.commit()
+
+
+def busca_antiga(db, id_usuario, termo: str) -> list:
+    return (
+        db.query(ClienteLead)
+        .filter(
+            ClienteLead.nome.ilike(f"%{termo}%"),
+            ClienteLead.id_usuario == id_usuario,
+        )
+        .all()
+    )
+
+
+def medir(fn, execucoes: int) -> tuple[float, float, int]:
+    resultado = fn()  # aquecimento
+    latencias = []
+    for _ in range(execucoes):
+        inicio = time.perf_counter()
+        fn()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(latencias), max(latencias), len(resultado)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clientes", type=int, default=500000)
+    parser.add_argument("--execucoes", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    create_missing_columns(engine)
+    create_missing_indexes(engine)
+    id_usuario = uuid.uuid4()
+    db = SessionLocal()
+
+    try:
+        print(f"Populando {args.clientes} clientes...")
+        popular(db, id_usuario, args.clientes)
+
+        for termo in TERMOS:
+            buscar, _ = _buscar_clientes(
+                ClienteLead.nome_busca, termo, id_usuario, None, args.limit
+            )
+            p50_antiga, max_antiga, n_antiga = medir(
+                lambda: busca_antiga(db, id_usuario, termo), args.execucoes
+            )
+            p50_nova, max_nova, n_nova = medir(lambda: buscar(db), args.execucoes)
+            db.expunge_all()
+            print(
+                f"✅ '{termo}': ILIKE p50 {p50_antiga:.1f} ms "
+                f"(máx {max_antiga:.1f}, {n_antiga} linhas) | "
+                f"indexada p50 {p50_nova:.1f} ms "
+                f"(máx {max_nova:.1f}, {n_nova} linhas)"
+            )
+    finally:
+        db.rollback()
+        db.execute(delete(User).where(User.id_usuario == id_usuario))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
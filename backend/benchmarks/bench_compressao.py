@@ -0,0 +1,160 @@
+"""
+Benchmark da compressão zstd das colunas de texto longo (transcrições e chat).
+
+Grava as mesmas N transcrições sintéticas em duas tabelas temporárias, uma com
+TEXT (como antes) e outra com TextoComprimido, e compara o tamanho total das
+tabelas (incluindo TOAST), os blocos lidos por consulta e a taxa de acerto do
+cache (pg_statio_user_tables) e a latência de leitura por id. Remove as
+tabelas ao final.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_compressao --linhas 5000 --leituras 2000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import Column, Integer, MetaData, Table, Text, func, select, text
+
+from app.utils.compressao import TextoComprimido
+from app.utils.database import engine
+
+FRASES = [
+    "Vendedor: Bom dia, {nome}! Tudo bem com você?",
+    "Cliente: Tudo ótimo. Recebi a proposta de {valor} reais e fiquei com dúvidas.",
+    "Vendedor: Claro, posso explicar as condições de pagamento em {parcelas} vezes.",
+    "Cliente: O prazo de entrega para {cidade} continua sendo de {dias} dias?",
+    "Vendedor: Sim, e para pedidos acima de {valor} reais o frete é grátis.",
+    "Cliente: Precisamos de {quantidade} unidades para a filial de {cidade}.",
+    "Vendedor: Consigo aplicar {desconto}% de desconto se fecharmos até sexta.",
+    "Cliente: Vou falar com o financeiro e retorno até {dias} de outubro.",
+    "Vendedor: Perfeito. Envio o contrato atualizado por e-mail ainda hoje.",
+    "Cliente: A garantia cobre troca de peças durante {parcelas} meses?",
+    "Vendedor: Cobre, e o suporte técnico atende de segunda a sábado.",
+    "Cliente: Entendi. E se precisarmos aumentar o pedido no próximo trimestre?",
+]
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Fernanda", "Gustavo", "Helena", "Igor"]
+CIDADES = ["São Paulo", "Campinas", "Curitiba", "Recife", "Belo Horizonte", "Natal"]
+
+
+# Os contadores de I/O de cada sessão são publicados com até 1s de atraso
+ESPERA_ESTATISTICAS = 1.5
+
+
+def transcricao(rng: random.Random, falas: int) -> str:
+    return "\n".join(
+        rng.choice(FRASES).format(
+            nome=rng.choice(NOMES),
+            cidade=rng.choice(CIDADES),
+            valor=rng.randint(1000, 90000),
+            parcelas=rng.randint(2, 24),
+            dias=rng.randint(2, 30),
+            quantidade=rng.randint(10, 500),
+            desconto=rng.randint(3, 15),
+        )
+        for _ in range(falas)
+    )
+
+
+def estatisticas_io(conn, tabela: str) -> tuple[int, int]:
+    """Blocos (lidos do cache, lidos do disco) da tabela e do seu TOAST"""
+    conn.execute(text("SELECT pg_stat_clear_snapshot()"))
+    hit, lido = conn.execute(
+        text(
+            "SELECT coalesce(heap_blks_hit, 0) + coalesce(toast_blks_hit, 0), "
+            "coalesce(heap_blks_read, 0) + coalesce(toast_blks_read, 0) "
+            "FROM pg_statio_user_tables WHERE relname = :tabela"
+        ),
+        {"tabela": tabela},
+    ).one()
+    return hit, lido
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas", type=int, default=5000)
+    parser.add_argument("--falas", type=int, default=150, help="falas por transcrição")
+    parser.add_argument("--leituras", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    textos = [transcricao(rng, args.falas) for _ in range(args.linhas)]
+    ids = [rng.randrange(args.linhas) for _ in range(args.leituras)]
+
+    metadata = MetaData()
+    tabelas = {
+        "TEXT": Table(
+            "bench_texto_puro",
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column("texto", Text),
+        ),
+        "zstd": Table(
+            "bench_texto_zstd",
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column("texto", TextoComprimido),
+        ),
+    }
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    try:
+        resultados = {}
+        for nome, tabela in tabelas.items():
+            with engine.begin() as conn:
+                for inicio in range(0, args.linhas, 1000):
+                    conn.execute(
+                        tabela.insert(),
+                        [
+                            {"id": i, "texto": textos[i]}
+                            for i in range(inicio, min(inicio + 1000, args.linhas))
+                        ],
+                    )
+            with engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            ) as conn:
+                conn.execute(text(f"VACUUM ANALYZE {tabela.name}"))
+                tamanho = conn.execute(
+                    select(func.pg_total_relation_size(tabela.name))
+                ).scalar()
+
+                consulta = select(tabela.c.texto).where(tabela.c.id == 0)
+                conn.execute(consulta).scalar()  # aquecimento
+                time.sleep(ESPERA_ESTATISTICAS)
+                hit_antes, lido_antes = estatisticas_io(conn, tabela.name)
+                latencias = []
+                for i in ids:
+                    inicio = time.perf_counter()
+                    valor = conn.execute(
+                        select(tabela.c.texto).where(tabela.c.id == i)
+                    ).scalar()
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+                    assert valor == textos[i]
+                time.sleep(ESPERA_ESTATISTICAS)
+                hit, lido = estatisticas_io(conn, tabela.name)
+                hit, lido = hit - hit_antes, lido - lido_antes
+
+            latencias.sort()
+            resultados[nome] = tamanho
+            print(
+                f"✅ {nome}: {tamanho / 1024 / 1024:.1f} MB | "
+                f"{(hit + lido) / args.leituras:.1f} blocos por leitura, "
+                f"cache hit {hit / max(hit + lido, 1):.1%} | "
+                f"leitura p50 {statistics.median(latencias):.3f} ms, "
+                f"p99 {latencias[int(len(latencias) * 0.99) - 1]:.3f} ms"
+            )
+
+        print(
+            f"✅ tamanho original (UTF-8): "
+            f"{sum(len(t.encode()) for t in textos) / 1024 / 1024:.1f} MB | "
+            f"zstd ocupa {resultados['zstd'] / resultados['TEXT']:.0%} do TEXT"
+        )
+    finally:
+        metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
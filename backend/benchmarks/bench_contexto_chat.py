@@ -0,0 +1,154 @@
+"""
+Benchmark da montagem do contexto do chat.
+
+Cria um usuário temporário com N mensagens e compara, para um orçamento de
+tokens:
+- o cliente paginando GET /historico-chat/?fields=... (páginas de 100, com
+  X-Next-Cursor) até ler o histórico inteiro e escolhendo as mensagens;
+- o mesmo cliente parando assim que o orçamento enche;
+- GET /historico-chat/contexto sem cache (primeiro pedido) e com os
+  tamanhos em cache (pedidos seguintes, com uma mensagem nova entre eles).
+Usa a aplicação inteira (TestClient) e remove os dados ao final.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_contexto_chat --mensagens 20000 --tokens 4000
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert, text
+
+from app.main import app
+from app.models.user import User
+from app.utils.contexto_chat import contexto_chat, estimar_tokens
+from app.utils.database import SessionLocal
+from app.utils.security import create_access_token
+
+CAMPOS = "id_mensagem,interacao,data_envio"
+
+
+def paginar(client, headers, max_tokens: int, ate_o_fim: bool) -> tuple[int, int]:
+    """(mensagens escolhidas, requests feitos) lendo da mais recente para trás"""
+    cursor, tokens, escolhidas, requests = None, 0, 0, 0
+    cheio = False
+    while True:
+        params = {"fields": CAMPOS, "limit": 100}
+        if cursor:
+            params["cursor"] = cursor
+        resposta = client.get("/historico-chat/", params=params, headers=headers)
+        requests += 1
+        for mensagem in resposta.json():
+            custo = estimar_tokens(mensagem["interacao"])
+            if not cheio and tokens + custo <= max_tokens:
+                tokens += custo
+                escolhidas += 1
+            else:
+                cheio = True
+        cursor = resposta.headers.get("X-Next-Cursor")
+        if not cursor or (cheio and not ate_o_fim):
+            return escolhidas, requests
+
+
+def medir(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mensagens", type=int, default=20_000)
+    parser.add_argument("--tokens", type=int, default=4000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    id_usuario = uuid.uuid4()
+    db = SessionLocal()
+    db.execute(
+        insert(User).values(
+            id_usuario=id_usuario,
+            nome="Benchmark",
+            e_mail=f"bench-{id_usuario}@example.com",
+            senha_hash="-",
+        )
+    )
+    # Gerado no próprio banco: mensagens de 40 a 400 caracteres, uma por segundo
+    db.execute(
+        text(
+            "INSERT INTO historicochat (id_mensagem, interacao, data_envio, id_usuario) "
+            "SELECT gen_random_uuid(), convert_to(repeat('Mensagem ' || m || ' do "
+            "chat. ', 1 + m % 15), 'UTF8'), "
+            "now() AT TIME ZONE 'utc' - (:n - m) * interval '1 second', :usuario "
+            "FROM generate_series(1, :n) m"
+        ),
+        {"n": args.mensagens, "usuario": id_usuario},
+    )
+    db.commit()
+    db.connection().exec_driver_sql("ANALYZE historicochat")
+    db.commit()
+
+    headers = {
+        "Authorization": f"Bearer {create_access_token({'sub': str(id_usuario)})}"
+    }
+    try:
+        with TestClient(app) as client:
+            escolhidas, requests = paginar(client, headers, args.tokens, True)
+            tudo = medir(
+                lambda: paginar(client, headers, args.tokens, True),
+                max(1, args.repeticoes // 10),
+            )
+            _, requests_parando = paginar(client, headers, args.tokens, False)
+            parando = medir(
+                lambda: paginar(client, headers, args.tokens, False), args.repeticoes
+            )
+
+            params = {"max_tokens": args.tokens}
+
+            def sem_cache():
+                contexto_chat.invalidar(id_usuario)
+                client.get("/historico-chat/contexto", params=params, headers=headers)
+
+            def com_cache():
+                # Uma mensagem nova (fora da medição) estende o cache
+                client.post(
+                    "/historico-chat/",
+                    json={"interacao": "Mensagem nova.", "id_usuario": str(id_usuario)},
+                    headers=headers,
+                )
+                inicio = time.perf_counter()
+                resposta = client.get(
+                    "/historico-chat/contexto", params=params, headers=headers
+                )
+                duracao = time.perf_counter() - inicio
+                assert resposta.json()["mensagens"][-1]["interacao"] == "Mensagem nova."
+                return duracao
+
+            frio = medir(sem_cache, args.repeticoes)
+            sem_cache()
+            quente = statistics.median(com_cache() for _ in range(args.repeticoes))
+
+        print(
+            f"Contexto de {args.tokens} tokens ({escolhidas} mensagens) "
+            f"em {args.mensagens} mensagens (mediana):"
+        )
+        print(f"  paginar tudo ({requests:4d} GETs):    {tudo * 1000:9.1f} ms")
+        print(
+            f"  paginar até encher ({requests_parando:3d} GETs): {parando * 1000:6.1f} ms"
+        )
+        print(f"  /contexto sem cache:        {frio * 1000:9.1f} ms")
+        print(f"  /contexto com cache:        {quente * 1000:9.1f} ms")
+    finally:
+        db.execute(delete(User).where(User.id_usuario == id_usuario))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark de regressão do /user/dashboard/stats para um vendedor com muitas vendas.
+
+Cria um usuário temporário com N vendas espalhadas pelos últimos 12 meses, mede a
+latência de _calcular_estatisticas e o número de consultas enviadas ao banco, e
+remove os dados ao final.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_dashboard_stats --vendas 100000 --execucoes 20
+    python -m benchmarks.bench_dashboard_stats --limite-ms 250  # falha se p50 > 250ms
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import delete, event, insert
+
+from app.models.cliente import ClienteLead
+from app.models.user import User
+from app.models.venda import Venda
+from app.routers.user import _calcular_estatisticas
+from app.utils.database import Base, SessionLocal, engine
+from app.utils.resumo_vendas import reconstruir_resumo
+
+STATUS = ["em_negociacao", "fechada", "perdida", "cancelada"]
+
+
+def popular(db, id_usuario, quantidade: int, lote: int = 10000) -> None:
+    id_cliente = uuid.uuid4()
+    db.execute(
+        insert(User).values(
+            id_usuario=id_usuario,
+            nome="Benchmark",
+            e_mail=f"bench-{id_usuario}@example.com",
+            senha_hash="-",
+        )
+    )
+    db.execute(
+        insert(ClienteLead).values(
+            id_cliente=id_cliente, nome="Cliente Benchmark", id_usuario=id_usuario
+        )
+    )
+
+    rng = random.Random(42)
+    agora = datetime.utcnow()
+    for inicio in range(0, quantidade, lote):
+        linhas = [
+            {
+                "id_venda": uuid.uuid4(),
+                "titulo": f"Venda {i}",
+                "valor": Decimal(rng.randint(100, 1000000)) / 100,
+                "status": rng.choice(STATUS),
+                "id_cliente": id_cliente,
+                "id_usuario": id_usuario,
+                "data_criacao": agora
+                - timedelta(minutes=rng.randint(0, 365 * 24 * 60)),
+            }
+            for i in range(inicio, min(inicio + lote, quantidade))
+        ]
+        db.execute(insert(Venda), linhas)
+    db.commit()
+
+    # Inserção em massa não passa pelas rotas: recalcula o resumo mensal
+    reconstruir_resumo(db, id_usuario)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vendas", type=int, default=100000)
+    parser.add_argument("--execucoes", type=int, default=20)
+    parser.add_argument("--limite-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    id_usuario = uuid.uuid4()
+    db = SessionLocal()
+
+    consultas = 0
+
+    def contar(*_):
+        nonlocal consultas
+        consultas += 1
+
+    try:
+        print(f"Populando {args.vendas} vendas...")
+        popular(db, id_usuario, args.vendas)
+
+        _calcular_estatisticas(db, id_usuario)  # aquecimento
+        event.listen(engine, "before_cursor_execute", contar)
+        latencias = []
+        for _ in range(args.execucoes):
+            inicio = time.perf_counter()
+            _calcular_estatisticas(db, id_usuario)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        event.remove(engine, "before_cursor_execute", contar)
+    finally:
+        db.rollback()
+        db.execute(delete(User).where(User.id_usuario == id_usuario))
+        db.commit()
+        db.close()
+
+    p50 = statistics.median(latencias)
+    print(f"✅ consultas por chamada: {consultas / args.execucoes:.0f}")
+    print(f"✅ p50: {p50:.1f} ms | máx: {max(latencias):.1f} ms")
+
+    if args.limite_ms is not None and p50 > args.limite_ms:
+        print(f"❌ p50 acima do limite de {args.limite_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark do barramento de eventos SSE (broker em memória, sem banco).
+
+Abre C conexões (uma ou mais por vendedor) e publica E eventos a partir de
+threads, como fazem as rotas síncronas depois do commit. Mede a vazão de
+publicação e a latência até o evento chegar à fila da conexão, e compara com
+o polling que o canal substitui (um request autenticado + listagem a cada
+intervalo, por vendedor, haja ou não novidade).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_eventos --usuarios 1000 --eventos 20000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import threading
+import time
+import uuid
+
+from app.utils.eventos import BarramentoEventos, BrokerMemoria
+
+
+async def medir(args) -> tuple[list[float], float]:
+    barramento = BarramentoEventos(BrokerMemoria(), buffer=args.buffer)
+    usuarios = [uuid.uuid4() for _ in range(args.usuarios)]
+    fluxos = [
+        barramento.transmitir(u, heartbeat=60)
+        for u in usuarios
+        for _ in range(args.conexoes)
+    ]
+    for fluxo in fluxos:
+        await anext(fluxo)  # registra a conexão
+
+    latencias: list[float] = []
+    recebidos = 0
+    esperados = args.eventos * args.conexoes
+    terminou = asyncio.Event()
+
+    async def consumir(fluxo):
+        nonlocal recebidos
+        async for texto in fluxo:
+            enviado = float(texto.rsplit('"t":', 1)[1].rstrip("}\n"))
+            latencias.append(time.perf_counter() - enviado)
+            recebidos += 1
+            if recebidos == esperados:
+                terminou.set()
+
+    tarefas = [asyncio.create_task(consumir(f)) for f in fluxos]
+    rng = random.Random(42)
+    destinos = [rng.choice(usuarios) for _ in range(args.eventos)]
+
+    def publicar(fatia):
+        # Ritmo constante de `taxa` eventos/s somando as threads (0: rajada)
+        intervalo = args.threads / args.taxa if args.taxa else 0
+        proximo = time.perf_counter()
+        for id_usuario in fatia:
+            if intervalo:
+                proximo += intervalo
+                time.sleep(max(proximo - time.perf_counter(), 0))
+            barramento.publicar(id_usuario, "sugestao", {"t": time.perf_counter()})
+
+    threads = [
+        threading.Thread(target=publicar, args=(destinos[i :: args.threads],))
+        for i in range(args.threads)
+    ]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    await asyncio.to_thread(lambda: [t.join() for t in threads])
+    publicacao = time.perf_counter() - inicio
+    await asyncio.wait_for(terminou.wait(), 30)
+
+    for tarefa in tarefas:
+        tarefa.cancel()
+    await asyncio.gather(*tarefas, return_exceptions=True)
+    return latencias, publicacao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--conexoes", type=int, default=1, help="por usuário")
+    parser.add_argument("--eventos", type=int, default=20000)
+    parser.add_argument("--buffer", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument(
+        "--taxa", type=float, default=2000, help="eventos/s; 0 = rajada"
+    )
+    parser.add_argument("--polling", type=float, default=5.0, help="segundos")
+    args = parser.parse_args()
+
+    latencias, publicacao = asyncio.run(medir(args))
+    latencias.sort()
+    ms = [x * 1000 for x in latencias]
+    print(
+        f"{args.usuarios} usuários x {args.conexoes} conexão(ões), "
+        f"{args.eventos} eventos"
+    )
+    print(
+        f"publicação: {args.eventos / publicacao:,.0f} eventos/s  "
+        f"entrega: p50 {statistics.median(ms):.2f} ms  "
+        f"p99 {ms[int(len(ms) * 0.99) - 1]:.2f} ms"
+    )
+    print(
+        f"polling a cada {args.polling:.0f}s: "
+        f"{args.usuarios * 60 / args.polling:,.0f} requests/min com consulta ao "
+        "banco; SSE: 0 requests ociosos (só heartbeats)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark da exportação de vendas em streaming (GET /vendas/exportar).
+
+Cria um usuário temporário com N vendas e consome a exportação em CSV, NDJSON
+e CSV+gzip, medindo o tempo e o pico de memória alocada (tracemalloc). Para
+comparar, mede também a listagem com todos os objetos em memória (ORM +
+Pydantic). Remove os dados ao final.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_exportacao --vendas 200000
+    python -m benchmarks.bench_exportacao --limite-mb 20  # falha se o pico passar
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import delete, select
+
+from app.models.user import User
+from app.models.venda import Venda
+from app.schemas.venda import VendaResponse
+from app.utils.database import Base, SessionLocal, engine
+from app.utils.exportacao import _gzip, _linhas
+from benchmarks.bench_dashboard_stats import popular
+
+
+def medir(funcao) -> tuple[float, float, int]:
+    """Segundos, pico de memória (MB) e bytes gerados"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    tamanho = funcao()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 1024 / 1024, tamanho
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vendas", type=int, default=200000)
+    parser.add_argument("--limite-mb", type=float, default=None)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    id_usuario = uuid.uuid4()
+    db = SessionLocal()
+
+    consulta = (
+        select(
+            Venda.id_venda,
+            Venda.titulo,
+            Venda.valor,
+            Venda.status,
+            Venda.data_fechamento,
+            Venda.observacoes,
+            Venda.id_cliente,
+            Venda.data_criacao,
+            Venda.data_atualizacao,
+        )
+        .where(Venda.id_usuario == id_usuario)
+        .order_by(Venda.data_criacao.desc(), Venda.id_venda.desc())
+    )
+
+    def listar_tudo():
+        vendas = (
+            db.query(Venda)
+            .filter(Venda.id_usuario == id_usuario)
+            .order_by(Venda.data_criacao.desc(), Venda.id_venda.desc())
+            .all()
+        )
+        respostas = [VendaResponse.model_validate(v) for v in vendas]
+        tamanho = sum(len(r.model_dump_json()) + 1 for r in respostas)
+        db.expunge_all()
+        return tamanho
+
+    try:
+        print(f"Populando {args.vendas} vendas...")
+        popular(db, id_usuario, args.vendas)
+
+        resultados = {
+            "lista completa (ORM + Pydantic)": medir(listar_tudo),
+            "csv": medir(lambda: sum(map(len, _linhas(consulta, "csv")))),
+            "ndjson": medir(lambda: sum(map(len, _linhas(consulta, "ndjson")))),
+            "csv + gzip": medir(lambda: sum(map(len, _gzip(_linhas(consulta, "csv"))))),
+        }
+    finally:
+        db.rollback()
+        db.execute(delete(User).where(User.id_usuario == id_usuario))
+        db.commit()
+        db.close()
+
+    pico_streaming = 0.0
+    for nome, (segundos, pico, tamanho) in resultados.items():
+        print(
+            f"✅ {nome}: {segundos:.2f} s ({args.vendas / segundos:.0f} linhas/s) | "
+            f"pico {pico:.1f} MB | {tamanho / 1024 / 1024:.1f} MB gerados"
+        )
+        if nome != "lista completa (ORM + Pydantic)":
+            pico_streaming = max(pico_streaming, pico)
+
+    if args.limite_mb is not None and pico_streaming > args.limite_mb:
+        print(f"❌ pico de memória acima do limite de {args.limite_mb} MB")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark do gateway de IA com o provedor falso (latência simulada).
+
+Dispara N pedidos concorrentes cujos prompts se repetem (alguns trechos de
+conversa muito comuns, como acontece com vários vendedores na mesma campanha)
+e compara chamar o provedor diretamente, uma vez por pedido, com o gateway
+(deduplicação dos prompts em andamento + cache). Os dois respeitam o mesmo
+limite de chamadas simultâneas ao provedor.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_gateway_ia --pedidos 500 --prompts 50
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from app.utils.cache import MemoryCacheBackend
+from app.utils.gateway_ia import INSTRUCAO_SUGESTOES, GatewayIA, ProvedorFalso
+
+TRECHOS = [
+    "Cliente: achei o valor do plano {n} acima do orçamento",
+    "Cliente: vocês entregam em {n} dias úteis?",
+    "Cliente: preciso falar com o financeiro sobre a proposta {n}",
+    "Cliente: o concorrente ofereceu {n}% de desconto",
+]
+
+
+def prompts(rng: random.Random, pedidos: int, distintos: int) -> list[str]:
+    # Distribuição concentrada: poucos trechos respondem pela maioria dos pedidos
+    base = [TRECHOS[i % len(TRECHOS)].format(n=i) for i in range(distintos)]
+    pesos = [1 / (i + 1) for i in range(distintos)]
+    return rng.choices(base, weights=pesos, k=pedidos)
+
+
+async def direto(provedor: ProvedorFalso, lista: list[str], concorrencia: int):
+    limite = asyncio.Semaphore(concorrencia)
+
+    async def um(prompt: str) -> str:
+        async with limite:
+            return await provedor.gerar(prompt, INSTRUCAO_SUGESTOES)
+
+    return await asyncio.gather(*(um(p) for p in lista))
+
+
+async def pelo_gateway(gateway: GatewayIA, lista: list[str]):
+    return await asyncio.gather(*(gateway.gerar(p) for p in lista))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pedidos", type=int, default=500)
+    parser.add_argument("--prompts", type=int, default=50, help="prompts distintos")
+    parser.add_argument("--latencia", type=float, default=0.2, help="segundos")
+    parser.add_argument("--concorrencia", type=int, default=4)
+    args = parser.parse_args()
+
+    lista = prompts(random.Random(42), args.pedidos, args.prompts)
+
+    provedor = ProvedorFalso(atraso=args.latencia)
+    inicio = time.perf_counter()
+    asyncio.run(direto(provedor, lista, args.concorrencia))
+    tempo_direto = time.perf_counter() - inicio
+    print(f"✅ direto: {tempo_direto:.2f} s | {provedor.chamadas} chamadas ao provedor")
+
+    provedor = ProvedorFalso(atraso=args.latencia)
+    gateway = GatewayIA(
+        provedor,
+        MemoryCacheBackend(maxsize=4096, ttl=3600),
+        concorrencia=args.concorrencia,
+        fila_max=args.pedidos,
+        timeout=60.0,
+    )
+    inicio = time.perf_counter()
+    asyncio.run(pelo_gateway(gateway, lista))
+    tempo_gateway = time.perf_counter() - inicio
+    print(
+        f"✅ gateway: {tempo_gateway:.2f} s | {provedor.chamadas} chamadas ao "
+        f"provedor, {gateway.coalescidas} deduplicadas, "
+        f"{gateway.cache.stats()['hits']} do cache "
+        f"({tempo_direto / tempo_gateway:.0f}x mais rápido)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark da limpeza e da retenção do histórico de chat particionado.
+
+Cria um usuário temporário com N mensagens e compara:
+- limpar o histórico com um único DELETE (como antes; desfeito ao final) com
+  a limpeza em lotes, medindo a transação mais longa de cada um (durante ela
+  as linhas apagadas ficam bloqueadas);
+- remover um mês antigo com DELETE (retenção linha a linha) com DROP da
+  partição do mês (usa um mês de teste em 2099).
+Remove os dados ao final. Requer historicochat particionada.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_historico_chat --mensagens 500000 --lote 1000
+"""
+
+import argparse
+import time
+import uuid
+from datetime import date
+
+from sqlalchemy import delete, insert, text
+
+from app.models.user import User
+from app.utils import historico_chat
+from app.utils.database import Base, SessionLocal, engine
+from app.utils.historico_chat import (
+    LimpezasHistorico,
+    criar_particao,
+    garantir_particoes,
+    nome_particao,
+    particionada,
+)
+
+MES_TESTE = date(2099, 1, 1)
+
+
+def popular(db, id_usuario, mensagens: int, inicio: str) -> None:
+    # Gerado no próprio banco, uma mensagem por segundo a partir de `inicio`
+    db.execute(
+        text(
+            "INSERT INTO historicochat (id_mensagem, interacao, data_envio, id_usuario) "
+            "SELECT gen_random_uuid(), convert_to('Mensagem ' || m || ' do "
+            "histórico de chat com o assistente.', 'UTF8'), "
+            "CAST(:inicio AS timestamp) + m * interval '1 second', :usuario "
+            "FROM generate_series(1, :n) m"
+        ),
+        {"n": mensagens, "inicio": inicio, "usuario": id_usuario},
+    )
+    db.commit()
+    db.connection().exec_driver_sql("ANALYZE historicochat")
+    db.commit()
+
+
+def delete_unico(db, id_usuario) -> float:
+    inicio = time.perf_counter()
+    db.execute(
+        text("DELETE FROM historicochat WHERE id_usuario = :u"), {"u": id_usuario}
+    )
+    duracao = time.perf_counter() - inicio
+    db.rollback()
+    return duracao
+
+
+def em_lotes(id_usuario, lote: int) -> tuple[float, float]:
+    """(tempo total, maior intervalo entre lotes ≈ transação mais longa)"""
+    marcas = []
+    original = historico_chat.eventos.publicar
+    historico_chat.eventos.publicar = lambda *a: marcas.append(time.perf_counter())
+    try:
+        limpezas = LimpezasHistorico(lote=lote, pausa=0)
+        with SessionLocal() as db:
+            limpeza, _ = limpezas.iniciar(db, id_usuario)
+        limpezas.executar(limpeza)
+    finally:
+        historico_chat.eventos.publicar = original
+    intervalos = [b - a for a, b in zip(marcas[1:], marcas[2:])]
+    return marcas[-1] - marcas[0], max(intervalos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mensagens", type=int, default=500_000)
+    parser.add_argument("--lote", type=int, default=1000)
+    parser.add_argument(
+        "--mes", type=int, default=200_000, help="mensagens no mês antigo"
+    )
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    garantir_particoes(engine, 0)
+    with engine.begin() as conn:
+        if not particionada(conn):
+            raise SystemExit("Execute antes: python -m scripts.particionar_historico")
+
+    db = SessionLocal()
+    id_usuario = uuid.uuid4()
+    db.execute(
+        insert(User).values(
+            id_usuario=id_usuario,
+            nome="Benchmark",
+            e_mail=f"bench-{id_usuario}@example.com",
+            senha_hash="-",
+        )
+    )
+    db.commit()
+    try:
+        popular(db, id_usuario, args.mensagens, "2000-01-01")
+        unico = delete_unico(db, id_usuario)
+        total, maior = em_lotes(id_usuario, args.lote)
+        print(f"Limpeza de {args.mensagens} mensagens de um usuário:")
+        print(f"  DELETE único:      transação de {unico * 1000:9.1f} ms")
+        print(
+            f"  lotes de {args.lote:<6}    maior transação {maior * 1000:6.1f} ms "
+            f"(total {total * 1000:.1f} ms)"
+        )
+
+        with engine.begin() as conn:
+            criar_particao(conn, MES_TESTE)
+        popular(db, id_usuario, args.mes, MES_TESTE.isoformat())
+        inicio = time.perf_counter()
+        db.execute(
+            text(
+                "DELETE FROM historicochat WHERE data_envio >= :i AND data_envio < :f"
+            ),
+            {"i": MES_TESTE, "f": date(2099, 2, 1)},
+        )
+        delete_mes = time.perf_counter() - inicio
+        db.rollback()
+        inicio = time.perf_counter()
+        db.execute(text(f"DROP TABLE {nome_particao(MES_TESTE)}"))
+        db.commit()
+        drop = time.perf_counter() - inicio
+        print(f"Retenção de um mês com {args.mes} mensagens:")
+        print(f"  DELETE do mês:     {delete_mes * 1000:9.1f} ms")
+        print(f"  DROP da partição:  {drop * 1000:9.1f} ms")
+    finally:
+        db.rollback()
+        db.execute(text(f"DROP TABLE IF EXISTS {nome_particao(MES_TESTE)}"))
+        db.execute(delete(User).where(User.id_usuario == id_usuario))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
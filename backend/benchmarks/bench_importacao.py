@@ -0,0 +1,102 @@
+"""
+Benchmark da importação em massa de clientes (POST /clientes/importar).
+
+Gera um CSV temporário com N leads (com alguns e-mails repetidos e linhas
+inválidas), importa com importar_registros para um usuário temporário, mede o
+tempo total e remove os dados ao final.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_importacao --linhas 100000
+    python -m benchmarks.bench_importacao --limite-s 30  # falha se passar de 30s
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import delete, func, insert, select
+
+from app.models.cliente import ClienteLead
+from app.models.user import User
+from app.utils.database import (
+    Base,
+    SessionLocal,
+    create_missing_columns,
+    create_missing_indexes,
+    engine,
+)
+from app.utils.importacao import importar_registros, ler_csv
+from benchmarks.bench_busca_clientes import EMPRESAS, PRENOMES, SOBRENOMES
+
+
+def gerar_csv(arquivo, linhas: int) -> None:
+    rng = random.Random(42)
+    arquivo.write("nome;telefone;e_mail;empresa;observacao\n".encode())
+    for i in range(linhas):
+        nome = f"{rng.choice(PRENOMES)} {rng.choice(SOBRENOMES)}"
+        if i % 1000 == 999:
+            nome = "x"  # inválida (nome curto)
+        # ~1% de e-mails repetidos
+        email = f"lead{rng.randint(0, linhas) if i % 100 == 0 else i}@example.com"
+        telefone = f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+        empresa = f"{rng.choice(EMPRESAS)} {rng.choice(SOBRENOMES)}"
+        arquivo.write(f"{nome};{telefone};{email};{empresa};\n".encode())
+    arquivo.seek(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas", type=int, default=100000)
+    parser.add_argument("--limite-s", type=float, default=None)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    create_missing_columns(engine)
+    create_missing_indexes(engine)
+    id_usuario = uuid.uuid4()
+    db = SessionLocal()
+
+    try:
+        db.execute(
+            insert(User).values(
+                id_usuario=id_usuario,
+                nome="Benchmark",
+                e_mail=f"bench-{id_usuario}@example.com",
+                senha_hash="-",
+            )
+        )
+        db.commit()
+
+        with tempfile.TemporaryFile() as arquivo:
+            gerar_csv(arquivo, args.linhas)
+            inicio = time.perf_counter()
+            relatorio = importar_registros(db, ler_csv(arquivo), id_usuario)
+            duracao = time.perf_counter() - inicio
+
+        gravados = db.scalar(
+            select(func.count()).where(ClienteLead.id_usuario == id_usuario)
+        )
+    finally:
+        db.rollback()
+        db.execute(delete(User).where(User.id_usuario == id_usuario))
+        db.commit()
+        db.close()
+
+    print(
+        f"✅ {relatorio['total']} linhas em {duracao:.1f} s "
+        f"({relatorio['total'] / duracao:.0f} linhas/s): "
+        f"{relatorio['importados']} importadas, {relatorio['com_erro']} com erro"
+    )
+    if gravados != relatorio["importados"]:
+        print(f"❌ {gravados} clientes gravados, esperado {relatorio['importados']}")
+        sys.exit(1)
+    if args.limite_s is not None and duracao > args.limite_s:
+        print(f"❌ acima do limite de {args.limite_s} s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
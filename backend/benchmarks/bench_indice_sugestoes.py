@@ -0,0 +1,113 @@
+"""
+Benchmark do índice de sugestões aceitas (sem banco).
+
+Indexa N contextos sintéticos de um usuário em um arquivo temporário e mede a
+construção, o tamanho do arquivo, a carga por mmap e a latência de busca no
+modo exato e no aproximado (uma consulta por vez e em lotes). As consultas
+são contextos indexados com palavras trocadas; o recall do modo aproximado é
+a fração das consultas em que ele acha a mesma sugestão que o exato.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_indice_sugestoes --sugestoes 100000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from app.utils.indice_sugestoes import IndiceSugestoes
+
+OBJECOES = [
+    "achei o preço do plano {plano} caro comparado com a {concorrente}",
+    "a {concorrente} ofereceu {desconto}% de desconto no plano {plano}",
+    "preciso de entrega em {dias} dias na filial de {cidade}",
+    "vou falar com o financeiro sobre o plano {plano} e retorno em {dias} dias",
+    "o suporte da {concorrente} atende em {cidade} aos sábados",
+    "queremos testar o plano {plano} por {dias} dias antes de fechar",
+]
+PLANOS = ["básico", "anual", "empresarial", "premium", "mensal", "corporativo"]
+CONCORRENTES = ["Alfa", "Beta Sistemas", "Gama", "Delta Tech", "Ômega"]
+CIDADES = ["Recife", "Curitiba", "Campinas", "Natal", "Belo Horizonte"]
+TROCAS = ["realmente", "também", "agora", "hoje", "ainda"]
+
+
+def contexto(rng: random.Random) -> str:
+    return "Cliente: " + rng.choice(OBJECOES).format(
+        plano=rng.choice(PLANOS),
+        concorrente=rng.choice(CONCORRENTES),
+        desconto=rng.randint(3, 30),
+        dias=rng.randint(2, 60),
+        cidade=rng.choice(CIDADES),
+    )
+
+
+def variar(rng: random.Random, texto: str) -> str:
+    palavras = texto.split()
+    palavras.insert(rng.randrange(1, len(palavras)), rng.choice(TROCAS))
+    return " ".join(palavras)
+
+
+def medir(fn, execucoes: int) -> float:
+    fn()  # aquecimento
+    latencias = []
+    for _ in range(execucoes):
+        inicio = time.perf_counter()
+        fn()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(latencias)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sugestoes", type=int, default=100000)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--lote", type=int, default=32)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    usuario = uuid.uuid4()
+    textos = [contexto(rng) for _ in range(args.sugestoes)]
+    linhas = [(usuario, uuid.uuid4(), t) for t in textos]
+    consultas = [variar(rng, rng.choice(textos)) for _ in range(args.consultas)]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = os.path.join(pasta, "indice.npy")
+        inicio = time.perf_counter()
+        IndiceSugestoes(arquivo, limiar=0.8, aproximado=False).construir(linhas)
+        print(
+            f"✅ construção: {time.perf_counter() - inicio:.1f} s | arquivo "
+            f"{os.path.getsize(arquivo) / 1024 / 1024:.1f} MB"
+        )
+
+        resultados = {}
+        for modo, aproximado in (("exato", False), ("aproximado", True)):
+            indice = IndiceSugestoes(arquivo, limiar=0.8, aproximado=aproximado)
+            inicio = time.perf_counter()
+            indice.carregar()
+            carga = (time.perf_counter() - inicio) * 1000
+
+            consulta = iter(consultas * 1000)
+            um = medir(lambda: indice.buscar(usuario, [next(consulta)]), 50)
+            lote = medir(lambda: indice.buscar(usuario, consultas[: args.lote]), 10)
+            resultados[modo] = indice.buscar(usuario, consultas)
+            acertos = sum(r is not None for r in resultados[modo])
+            print(
+                f"✅ {modo}: carga {carga:.1f} ms | busca p50 {um:.2f} ms | "
+                f"lote de {args.lote} p50 {lote:.2f} ms "
+                f"({lote / args.lote:.2f} ms por consulta) | "
+                f"{acertos / len(consultas):.0%} respondidas pelo índice"
+            )
+
+        iguais = sum(
+            (a and a[0]) == (b and b[0])
+            for a, b in zip(resultados["exato"], resultados["aproximado"])
+        )
+        print(f"✅ recall do aproximado: {iguais / len(consultas):.1%}")
+
+
+if __name__ == "__main__":
+    main()
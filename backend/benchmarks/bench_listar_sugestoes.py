@@ -0,0 +1,198 @@
+"""
+Benchmark da listagem de sugestões de IA (/sugestoes) para um usuário com
+muitas sugestões.
+
+Cria um usuário temporário com N sugestões (em chamadas de --por-chamada
+sugestões) e compara a consulta antiga (join com chamadas + EXISTS pelo dono,
+ordenada por id) com a nova (id_usuario da própria sugestão, ordenada por
+chamada e momento) na primeira página, em uma página distante (via cursor) e
+filtrando por chamada. Remove os dados ao final.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_listar_sugestoes --sugestoes 1000000
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, insert, text
+
+from app.models.chamada import Chamada
+from app.models.cliente import ClienteLead
+from app.models.sugestao_ia import SugestaoIA
+from app.models.user import User
+from app.utils.database import (
+    Base,
+    SessionLocal,
+    create_missing_columns,
+    create_missing_indexes,
+    engine,
+)
+from app.utils.pagination import encode_cursor, paginar
+
+ORDEM = (SugestaoIA.id_chamada, SugestaoIA.momento_ordem, SugestaoIA.id_sugestao)
+
+
+def popular(db, id_usuario, sugestoes: int, por_chamada: int) -> list:
+    id_cliente = uuid.uuid4()
+    db.execute(
+        insert(User).values(
+            id_usuario=id_usuario,
+            nome="Benchmark",
+            e_mail=f"bench-{id_usuario}@example.com",
+            senha_hash="-",
+        )
+    )
+    db.execute(
+        insert(ClienteLead).values(
+            id_cliente=id_cliente, nome="Cliente Benchmark", id_usuario=id_usuario
+        )
+    )
+    chamadas = [uuid.uuid4() for _ in range(-(-sugestoes // por_chamada))]
+    db.execute(
+        insert(Chamada),
+        [
+            {"id_chamada": c, "id_usuario": id_usuario, "id_cliente": id_cliente}
+            for c in chamadas
+        ],
+    )
+    # Gerado no próprio banco: uma sugestão por (chamada, momento)
+    db.execute(
+        text(
+            "INSERT INTO sugestoesia "
+            "(id_sugestao, conteudo, momento, aceita, id_chamada, id_usuario) "
+            "SELECT gen_random_uuid(), 'Sugestão ' || m || ': ofereça o "
+            "parcelamento em 12 vezes.', m * 15, m % 4 = 0, c.id_chamada, "
+            "c.id_usuario FROM chamadas c, generate_series(0, :n - 1) m "
+            "WHERE c.id_usuario = :usuario"
+        ),
+        {"n": por_chamada, "usuario": id_usuario},
+    )
+    db.commit()
+    for tabela in ("chamadas", "sugestoesia"):
+        db.connection().exec_driver_sql(f"ANALYZE {tabela}")
+    db.commit()
+    return chamadas
+
+
+def consulta_antiga(db, id_usuario, id_chamada=None):
+    query = (
+        db.query(SugestaoIA)
+        .join(SugestaoIA.chamada)
+        .filter(SugestaoIA.chamada.has(id_usuario=id_usuario))
+    )
+    if id_chamada:
+        query = query.filter(SugestaoIA.id_chamada == id_chamada)
+    return query
+
+
+def consulta_nova(db, id_usuario, id_chamada=None):
+    query = db.query(SugestaoIA).filter(SugestaoIA.id_usuario == id_usuario)
+    if id_chamada:
+        query = query.filter(SugestaoIA.id_chamada == id_chamada)
+    return query
+
+
+def medir(db, fn, execucoes: int) -> tuple[float, float]:
+    fn()  # aquecimento
+    latencias = []
+    for _ in range(execucoes):
+        inicio = time.perf_counter()
+        fn()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        db.expunge_all()
+    return statistics.median(latencias), max(latencias)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sugestoes", type=int, default=1000000)
+    parser.add_argument("--por-chamada", type=int, default=50)
+    parser.add_argument("--execucoes", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    create_missing_columns(engine)
+    create_missing_indexes(engine)
+    id_usuario = uuid.uuid4()
+    db = SessionLocal()
+
+    try:
+        print(f"Populando {args.sugestoes} sugestões...")
+        chamadas = popular(db, id_usuario, args.sugestoes, args.por_chamada)
+        meio = chamadas[len(chamadas) // 2]
+
+        # Cursores de uma página no meio da listagem
+        cursor_antigo = encode_cursor(
+            [
+                consulta_antiga(db, id_usuario)
+                .order_by(SugestaoIA.id_sugestao)
+                .offset(args.sugestoes // 2)
+                .with_entities(SugestaoIA.id_sugestao)
+                .first()[0]
+            ]
+        )
+        meio_nova = (
+            consulta_nova(db, id_usuario, meio)
+            .order_by(*ORDEM)
+            .with_entities(*ORDEM)
+            .first()
+        )
+        cursor_novo = encode_cursor(list(meio_nova))
+
+        cenarios = {
+            "primeira página": (
+                lambda: paginar(
+                    consulta_antiga(db, id_usuario), (SugestaoIA.id_sugestao,), None
+                )
+                .limit(args.limit)
+                .all(),
+                lambda: paginar(consulta_nova(db, id_usuario), ORDEM, None)
+                .limit(args.limit)
+                .all(),
+            ),
+            "página no meio (cursor)": (
+                lambda: paginar(
+                    consulta_antiga(db, id_usuario),
+                    (SugestaoIA.id_sugestao,),
+                    cursor_antigo,
+                )
+                .limit(args.limit)
+                .all(),
+                lambda: paginar(consulta_nova(db, id_usuario), ORDEM, cursor_novo)
+                .limit(args.limit)
+                .all(),
+            ),
+            "uma chamada": (
+                lambda: paginar(
+                    consulta_antiga(db, id_usuario, meio),
+                    (SugestaoIA.id_sugestao,),
+                    None,
+                )
+                .limit(args.limit)
+                .all(),
+                lambda: paginar(consulta_nova(db, id_usuario, meio), ORDEM, None)
+                .limit(args.limit)
+                .all(),
+            ),
+        }
+        for nome, (antiga, nova) in cenarios.items():
+            p50_antiga, max_antiga = medir(db, antiga, args.execucoes)
+            p50_nova, max_nova = medir(db, nova, args.execucoes)
+            print(
+                f"✅ {nome}: join + EXISTS p50 {p50_antiga:.1f} ms "
+                f"(máx {max_antiga:.1f}) | id_usuario p50 {p50_nova:.1f} ms "
+                f"(máx {max_nova:.1f})"
+            )
+    finally:
+        db.rollback()
+        db.execute(delete(User).where(User.id_usuario == id_usuario))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
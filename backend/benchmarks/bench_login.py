@@ -0,0 +1,90 @@
+"""
+Benchmark de throughput de login (verificação Argon2) por tamanho de pool.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_login --pools 0 1 2 4 8 --clientes 32 --logins 256
+
+Use ARGON2_ROUNDS / ARGON2_MEMORY_COST / ARGON2_PARALLELISM no ambiente para
+comparar custos diferentes do Argon2.
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import settings
+from app.utils.hashing import HashingSaturatedError, HashingService, pwd_context
+
+
+def percentil(valores: list[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def rodar(workers: int, clientes: int, logins: int, fila: int) -> dict:
+    servico = HashingService(workers=workers, max_pending=fila, timeout=60)
+    hashed = pwd_context.hash("senha-de-teste")
+
+    # Aquece o pool (criação dos processos não entra na medição)
+    servico.verify_and_update("senha-de-teste", hashed)
+
+    latencias: list[float] = []
+    rejeitados = 0
+
+    def login(_):
+        nonlocal rejeitados
+        inicio = time.perf_counter()
+        try:
+            servico.verify_and_update("senha-de-teste", hashed)
+        except HashingSaturatedError:
+            rejeitados += 1
+            return
+        latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as executor:
+        list(executor.map(login, range(logins)))
+    duracao = time.perf_counter() - inicio
+    servico.shutdown()
+
+    return {
+        "workers": workers,
+        "logins_por_segundo": len(latencias) / duracao,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "media_ms": statistics.fmean(latencias) * 1000 if latencias else 0.0,
+        "rejeitados": rejeitados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pools", type=int, nargs="+", default=[0, 1, 2, 4, 8])
+    parser.add_argument("--clientes", type=int, default=32)
+    parser.add_argument("--logins", type=int, default=256)
+    parser.add_argument("--fila", type=int, default=settings.HASH_QUEUE_MAX)
+    args = parser.parse_args()
+
+    print(
+        f"Argon2: rounds={settings.ARGON2_ROUNDS} "
+        f"memory_cost={settings.ARGON2_MEMORY_COST} "
+        f"parallelism={settings.ARGON2_PARALLELISM}"
+    )
+    print(
+        f"{'workers':>8} {'logins/s':>10} {'p50 ms':>9} "
+        f"{'p99 ms':>9} {'rejeitados':>11}"
+    )
+    for workers in args.pools:
+        r = rodar(workers, args.clientes, args.logins, args.fila)
+        print(
+            f"{r['workers']:>8} {r['logins_por_segundo']:>10.1f} "
+            f"{r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['rejeitados']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark da gravação de sugestões de IA de uma chamada.
+
+Compara criar N sugestões com um POST /sugestoes/ cada (uma verificação da
+chamada e um commit por sugestão) com um único POST
+/chamadas/{id}/sugestoes/batch, e aceitá-las com um PATCH
+/sugestoes/{id}/aceitar cada ou com um PATCH /chamadas/{id}/sugestoes/batch.
+Usa a aplicação inteira (TestClient) e remove os dados ao final.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_sugestoes_lote --sugestoes 200
+"""
+
+import argparse
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert
+
+from app.main import app
+from app.models.chamada import Chamada
+from app.models.cliente import ClienteLead
+from app.models.user import User
+from app.utils.database import SessionLocal
+from app.utils.security import create_access_token
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sugestoes", type=int, default=200)
+    args = parser.parse_args()
+
+    id_usuario, id_cliente = uuid.uuid4(), uuid.uuid4()
+    chamadas = [uuid.uuid4(), uuid.uuid4()]
+    db = SessionLocal()
+    db.execute(
+        insert(User).values(
+            id_usuario=id_usuario,
+            nome="Benchmark",
+            e_mail=f"bench-{id_usuario}@example.com",
+            senha_hash="-",
+        )
+    )
+    db.execute(
+        insert(ClienteLead).values(
+            id_cliente=id_cliente, nome="Cliente Benchmark", id_usuario=id_usuario
+        )
+    )
+    db.execute(
+        insert(Chamada),
+        [
+            {"id_chamada": c, "id_usuario": id_usuario, "id_cliente": id_cliente}
+            for c in chamadas
+        ],
+    )
+    db.commit()
+
+    headers = {
+        "Authorization": f"Bearer {create_access_token({'sub': str(id_usuario)})}"
+    }
+    sugestoes = [
+        {"conteudo": f"Sugestão {i}: ofereça o parcelamento em 12 vezes.", "momento": i}
+        for i in range(args.sugestoes)
+    ]
+
+    try:
+        with TestClient(app) as client:
+            # Uma sugestão por request
+            inicio = time.perf_counter()
+            ids = [
+                client.post(
+                    "/sugestoes/",
+                    json={**s, "id_chamada": str(chamadas[0])},
+                    headers=headers,
+                ).json()["id_sugestao"]
+                for s in sugestoes
+            ]
+            criar_um = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            for id_sugestao in ids:
+                client.patch(f"/sugestoes/{id_sugestao}/aceitar", headers=headers)
+            aceitar_um = time.perf_counter() - inicio
+
+            # Todas em um request
+            inicio = time.perf_counter()
+            resposta = client.post(
+                f"/chamadas/{chamadas[1]}/sugestoes/batch",
+                json=sugestoes,
+                headers=headers,
+            )
+            criar_lote = time.perf_counter() - inicio
+            assert resposta.status_code == 201, resposta.text
+            inicio = time.perf_counter()
+            resposta = client.patch(
+                f"/chamadas/{chamadas[1]}/sugestoes/batch",
+                json=[{"id_sugestao": i} for i in resposta.json()["ids"]],
+                headers=headers,
+            )
+            aceitar_lote = time.perf_counter() - inicio
+            assert resposta.json()["atualizadas"] == args.sugestoes
+
+        print(
+            f"✅ criar {args.sugestoes}: um por request {criar_um * 1000:.0f} ms | "
+            f"lote {criar_lote * 1000:.0f} ms ({criar_um / criar_lote:.0f}x)"
+        )
+        print(
+            f"✅ aceitar {args.sugestoes}: um por request {aceitar_um * 1000:.0f} ms | "
+            f"lote {aceitar_lote * 1000:.0f} ms ({aceitar_um / aceitar_lote:.0f}x)"
+        )
+    finally:
+        db.execute(delete(User).where(User.id_usuario == id_usuario))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
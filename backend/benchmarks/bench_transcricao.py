@@ -0,0 +1,114 @@
+"""
+Benchmark da transcrição de uma chamada longa.
+
+Compara reescrever Chamada.transcricao inteira a cada trecho (como o PUT
+/chamadas/{id} exige) com gravar os trechos em lotes de transcricao_segmentos
+e montar a transcrição uma vez no fim. Mede tempo e bytes enviados ao banco e
+remove os dados ao final.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_transcricao --trechos 2000
+"""
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy import delete, insert, update
+
+from app.config import settings
+from app.models.chamada import Chamada
+from app.models.cliente import ClienteLead
+from app.models.user import User
+from app.schemas.chamada import TranscricaoSegmentoCreate
+from app.utils.database import Base, SessionLocal, engine
+from app.utils.transcricao import (
+    gravar_segmentos,
+    montar_transcricao,
+    novos_segmentos,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trechos", type=int, default=2000)
+    parser.add_argument("--lote", type=int, default=settings.TRANSCRICAO_LOTE_SEGMENTOS)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    id_usuario, id_cliente = uuid.uuid4(), uuid.uuid4()
+    chamadas = [uuid.uuid4(), uuid.uuid4()]
+    db = SessionLocal()
+    db.execute(
+        insert(User).values(
+            id_usuario=id_usuario,
+            nome="Benchmark",
+            e_mail=f"bench-{id_usuario}@example.com",
+            senha_hash="-",
+        )
+    )
+    db.execute(
+        insert(ClienteLead).values(
+            id_cliente=id_cliente, nome="Cliente Benchmark", id_usuario=id_usuario
+        )
+    )
+    db.execute(
+        insert(Chamada),
+        [
+            {"id_chamada": c, "id_usuario": id_usuario, "id_cliente": id_cliente}
+            for c in chamadas
+        ],
+    )
+    db.commit()
+
+    trechos = [
+        f"Trecho {i}: o cliente comentou sobre prazo de entrega e condições de "
+        f"pagamento do pedido {i}."
+        for i in range(args.trechos)
+    ]
+
+    try:
+        # Texto inteiro reescrito a cada trecho
+        inicio = time.perf_counter()
+        texto, enviados = "", 0
+        for trecho in trechos:
+            texto = f"{texto}\n{trecho}" if texto else trecho
+            enviados += len(texto)
+            db.execute(
+                update(Chamada)
+                .where(Chamada.id_chamada == chamadas[0])
+                .values(transcricao=texto)
+            )
+            db.commit()
+        reescrita = time.perf_counter() - inicio
+        print(
+            f"✅ reescrita: {reescrita:.2f} s | "
+            f"{enviados / 1024 / 1024:.1f} MB enviados"
+        )
+
+        # Trechos gravados em lotes e montados no fim
+        inicio = time.perf_counter()
+        for i in range(0, len(trechos), args.lote):
+            lote = [
+                TranscricaoSegmentoCreate(texto=t) for t in trechos[i : i + args.lote]
+            ]
+            gravar_segmentos(db, novos_segmentos(chamadas[1], lote))
+        chamada = db.get(Chamada, chamadas[1])
+        montar_transcricao(db, chamada)
+        db.commit()
+        segmentos = time.perf_counter() - inicio
+        assert chamada.transcricao == texto
+        print(
+            f"✅ segmentos: {segmentos:.2f} s | "
+            f"{sum(map(len, trechos)) / 1024 / 1024:.1f} MB enviados "
+            f"({reescrita / segmentos:.0f}x mais rápido)"
+        )
+    finally:
+        db.rollback()
+        db.execute(delete(User).where(User.id_usuario == id_usuario))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Preenche as colunas de busca (nome_busca, empresa_busca) dos clientes já
+existentes e cria os índices da busca textual.
+
+Uso (a partir de backend/):
+    python -m scripts.busca_clientes [--lote 5000]
+
+Execute uma vez após atualizar um banco que já tem clientes; os novos
+clientes são normalizados automaticamente ao serem gravados.
+"""
+
+import argparse
+
+from sqlalchemy import bindparam, select, update
+
+from app.models.cliente import ClienteLead
+from app.utils.busca import normalizar_busca
+from app.utils.database import (
+    SessionLocal,
+    create_missing_columns,
+    create_missing_indexes,
+    engine,
+)
+
+
+def preencher(db, lote: int) -> int:
+    """Normaliza os clientes sem nome_busca, em lotes; retorna o total"""
+    atualizar = (
+        update(ClienteLead.__table__)
+        .where(ClienteLead.id_cliente == bindparam("_id"))
+        .values(nome_busca=bindparam("_nome"), empresa_busca=bindparam("_empresa"))
+    )
+    total = 0
+    while True:
+        linhas = db.execute(
+            select(ClienteLead.id_cliente, ClienteLead.nome, ClienteLead.empresa)
+            .where(ClienteLead.nome_busca.is_(None))
+            .limit(lote)
+        ).all()
+        if not linhas:
+            return total
+
+        db.execute(
+            atualizar,
+            [
+                {
+                    "_id": linha.id_cliente,
+                    "_nome": normalizar_busca(linha.nome),
+                    "_empresa": normalizar_busca(linha.empresa),
+                }
+                for linha in linhas
+            ],
+        )
+        db.commit()
+        total += len(linhas)
+        print(f"... {total} clientes normalizados")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lote", type=int, default=5000)
+    args = parser.parse_args()
+
+    create_missing_columns(engine)
+    db = SessionLocal()
+    try:
+        total = preencher(db, args.lote)
+    finally:
+        db.close()
+    create_missing_indexes(engine)
+    print(f"✅ {total} clientes normalizados; índices de busca criados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Recomprime com zstd as transcrições (chamadas.transcricao) e mensagens do chat
+(historicochat.interacao) gravadas antes da compressão, em lotes.
+
+Uso (a partir de backend/):
+    python -m scripts.comprimir_textos [--lote 500] [--pausa 0.1]
+
+Em um banco com as colunas ainda em TEXT, roda antes de subir a nova versão
+(com a versão anterior no ar): cria a coluna BYTEA ao lado da antiga, mantida
+por um trigger, preenche em lotes já comprimindo e troca as colunas em uma
+transação curta (app.utils.migracoes). Depois recomprime as linhas gravadas
+sem compressão. Cada lote é uma transação curta, e --pausa espaça os lotes
+para não competir com o tráfego. Pode ser interrompido e executado de novo;
+só processa as linhas ainda não convertidas ou não comprimidas.
+"""
+
+import argparse
+import time
+
+from sqlalchemy import LargeBinary, bindparam, func, select, type_coerce, update
+
+from app.models.chamada import Chamada
+from app.models.historico_chat import HistoricoChat
+from app.utils.compressao import MAGICA_ZSTD, comprimido, comprimir
+from app.utils.database import SessionLocal, engine
+from app.utils.migracoes import converter_colunas_comprimidas
+
+# (coluna comprimida, chave primária)
+COLUNAS = [
+    (Chamada.transcricao, Chamada.id_chamada),
+    (HistoricoChat.interacao, HistoricoChat.id_mensagem),
+]
+
+
+def recomprimir(db, coluna, chave, lote: int, pausa: float) -> tuple[int, int, int]:
+    """Percorre as linhas não comprimidas por chave; retorna (linhas, antes, depois)"""
+    tabela = coluna.table
+    # Lê e grava os bytes como estão no banco, sem passar pelo TextoComprimido
+    bruto = type_coerce(coluna, LargeBinary)
+    atualizar = (
+        update(tabela)
+        .where(chave == bindparam("_id"))
+        .values({coluna.key: bindparam("_dados", type_=LargeBinary)})
+    )
+
+    linhas = antes = depois = 0
+    ultimo = None
+    while True:
+        query = select(chave, bruto).where(
+            coluna.is_not(None), func.substr(bruto, 1, 4) != MAGICA_ZSTD
+        )
+        if ultimo is not None:
+            query = query.where(chave > ultimo)
+        resultado = db.execute(query.order_by(chave).limit(lote)).all()
+        if not resultado:
+            return linhas, antes, depois
+
+        alterados = []
+        for id_linha, dados in resultado:
+            novo = comprimir(bytes(dados).decode())
+            antes += len(dados)
+            depois += len(novo)
+            if comprimido(novo):
+                alterados.append({"_id": id_linha, "_dados": novo})
+        if alterados:
+            db.execute(atualizar, alterados)
+        db.commit()
+
+        linhas += len(resultado)
+        ultimo = resultado[-1][0]
+        print(
+            f"... {tabela.name}: {linhas} linhas ({len(alterados)} comprimidas no lote)"
+        )
+        if pausa:
+            time.sleep(pausa)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lote", type=int, default=500)
+    parser.add_argument("--pausa", type=float, default=0.0, help="segundos entre lotes")
+    args = parser.parse_args()
+
+    convertidas = converter_colunas_comprimidas(engine, args.lote, args.pausa)
+    for coluna in convertidas:
+        print(f"✅ {coluna}: convertida para BYTEA")
+    if convertidas:
+        # Workers que subiram com a coluna em TEXT ainda gravam o texto puro
+        print("⚠️  Reinicie os workers desta versão que já estiverem no ar")
+    db = SessionLocal()
+    try:
+        for coluna, chave in COLUNAS:
+            linhas, antes, depois = recomprimir(
+                db, coluna, chave, args.lote, args.pausa
+            )
+            reducao = f" ({1 - depois / antes:.0%} menor)" if antes else ""
+            print(
+                f"✅ {coluna.table.name}.{coluna.key}: {linhas} linhas, "
+                f"{antes / 1024 / 1024:.1f} MB → {depois / 1024 / 1024:.1f} MB{reducao}"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Reconstrói o arquivo do índice de sugestões aceitas (INDICE_SUGESTOES_ARQUIVO)
+a partir do banco.
+
+Uso (a partir de backend/):
+    python -m scripts.indice_sugestoes
+
+A aplicação constrói o arquivo na primeira subida e inclui em memória as
+sugestões aceitas depois (gravando-as no arquivo ao encerrar cada worker).
+Execute periodicamente (ex.: diariamente) para consolidar o arquivo com os
+aceites de todos os workers e descartar sugestões excluídas; os workers
+passam a usar o novo arquivo ao reiniciar.
+"""
+
+import time
+
+from app.utils.database import SessionLocal
+from app.utils.indice_sugestoes import indice_sugestoes, linhas_aceitas
+
+
+def main():
+    if not indice_sugestoes.arquivo:
+        raise SystemExit("INDICE_SUGESTOES_ARQUIVO não configurado")
+
+    inicio = time.perf_counter()
+    db = SessionLocal()
+    try:
+        total = indice_sugestoes.construir(linhas_aceitas(db))
+    finally:
+        db.close()
+    print(
+        f"✅ {total} sugestões aceitas indexadas em {indice_sugestoes.arquivo} "
+        f"({time.perf_counter() - inicio:.1f} s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Atualiza o esquema do banco: cria as tabelas, colunas e índices novos da
+versão (índices com CREATE INDEX CONCURRENTLY, sem bloquear as escritas).
+
+Uso (a partir de backend/):
+    python -m scripts.migrar
+
+Execute antes de subir cada nova versão: a aplicação não altera o esquema ao
+iniciar. Pode rodar com a versão anterior no ar e ser executado de novo; um
+advisory lock faz execuções simultâneas esperarem umas pelas outras.
+"""
+
+import argparse
+
+from app.utils.database import engine
+from app.utils.migracoes import colunas_em_texto, migrar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.parse_args()
+
+    migrar(engine)
+    print("✅ Esquema atualizado")
+    pendentes = [f"{t.name}.{c.name}" for t, c in colunas_em_texto(engine)]
+    if pendentes:
+        print(
+            f"⚠️  Colunas ainda em TEXT ({', '.join(pendentes)}): "
+            "python -m scripts.comprimir_textos"
+        )
+
+
+if __name__ == "__main__":
+    main()
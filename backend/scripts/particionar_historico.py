@@ -0,0 +1,115 @@
+"""
+Converte historicochat em uma tabela particionada por mês de data_envio.
+
+Uso (a partir de backend/):
+    python -m scripts.particionar_historico [--meses-futuros 3]
+
+Bancos novos já criam a tabela particionada; execute uma vez em um banco que
+já tem histórico, de preferência com a aplicação parada (a tabela fica
+bloqueada enquanto o Postgres valida as linhas). As mensagens existentes não
+são copiadas: a tabela antiga vira a partição historicochat_legado, que vai
+até o fim do mês atual, e é removida inteira pela retenção quando todo o seu
+intervalo ficar mais antigo que HISTORICO_CHAT_RETENCAO_MESES.
+"""
+
+import argparse
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.models.historico_chat import HistoricoChat
+from app.utils.database import engine
+from app.utils.historico_chat import (
+    PARTICAO_LEGADO,
+    TABELA,
+    garantir_particoes,
+    inicio_do_mes,
+    particionada,
+)
+
+
+def particionar(conn) -> str:
+    """Anexa a tabela atual como partição legado; retorna seu limite superior"""
+    conn.execute(text("SET LOCAL lock_timeout = '10s'"))
+    conn.execute(text(f"LOCK TABLE {TABELA} IN ACCESS EXCLUSIVE MODE"))
+
+    # A chave de particionamento não aceita NULL: usa a mensagem mais antiga
+    conn.execute(
+        text(
+            f"UPDATE {TABELA} SET data_envio = COALESCE("
+            f"(SELECT min(data_envio) FROM {TABELA}), now() AT TIME ZONE 'utc') "
+            "WHERE data_envio IS NULL"
+        )
+    )
+    conn.execute(text(f"ALTER TABLE {TABELA} ALTER COLUMN data_envio SET NOT NULL"))
+
+    maximo = conn.scalar(text(f"SELECT max(data_envio) FROM {TABELA}"))
+    hoje = datetime.utcnow().date()
+    limite = inicio_do_mes(max(maximo.date(), hoje) if maximo else hoje, 1)
+
+    # A chave primária da partição precisa ser a da tabela particionada
+    pkey = conn.scalar(
+        text(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = to_regclass(:t) AND contype = 'p'"
+        ),
+        {"t": TABELA},
+    )
+    conn.execute(text(f"ALTER TABLE {TABELA} DROP CONSTRAINT {pkey}"))
+    conn.execute(
+        text(
+            f"ALTER TABLE {TABELA} ADD CONSTRAINT {PARTICAO_LEGADO}_pkey "
+            "PRIMARY KEY (id_mensagem, data_envio)"
+        )
+    )
+
+    # Libera os nomes da tabela e dos índices para a tabela particionada
+    indices = conn.scalars(
+        text(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE tablename = :t AND indexname <> :pkey"
+        ),
+        {"t": TABELA, "pkey": f"{PARTICAO_LEGADO}_pkey"},
+    ).all()
+    conn.execute(text(f"ALTER TABLE {TABELA} RENAME TO {PARTICAO_LEGADO}"))
+    for indice in indices:
+        conn.execute(text(f"ALTER INDEX {indice} RENAME TO {indice}_legado"))
+
+    HistoricoChat.__table__.create(conn)
+    conn.execute(
+        text(
+            f"ALTER TABLE {TABELA} ATTACH PARTITION {PARTICAO_LEGADO} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{limite.isoformat()}')"
+        )
+    )
+    return limite.isoformat()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--meses-futuros", type=int, default=settings.HISTORICO_CHAT_MESES_FUTUROS
+    )
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("O particionamento requer PostgreSQL")
+
+    with engine.begin() as conn:
+        if particionada(conn):
+            print(f"✅ {TABELA} já é particionada")
+            limite = None
+        else:
+            limite = particionar(conn)
+    if limite:
+        print(
+            f"✅ {TABELA} particionada; mensagens antigas em {PARTICAO_LEGADO} (até {limite})"
+        )
+
+    criadas = garantir_particoes(engine, args.meses_futuros)
+    print(f"✅ Partições criadas: {', '.join(criadas) or 'nenhuma'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Reconstrói ou verifica o resumo mensal de vendas (tabela vendas_resumo_mensal).
+
+Uso (a partir de backend/):
+    python -m scripts.resumo_vendas rebuild [--usuario UUID]
+    python -m scripts.resumo_vendas verify [--usuario UUID] [--reparar]
+
+Execute "rebuild" uma vez após criar a tabela em um banco que já tem vendas.
+"""
+
+import argparse
+import sys
+from uuid import UUID
+
+from app.models.venda_resumo import VendaResumoMensal
+from app.utils.database import SessionLocal, engine
+from app.utils.resumo_vendas import reconstruir_resumo, verificar_resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("comando", choices=["rebuild", "verify"])
+    parser.add_argument("--usuario", type=UUID, default=None)
+    parser.add_argument(
+        "--reparar", action="store_true", help="reconstrói os usuários divergentes"
+    )
+    args = parser.parse_args()
+
+    VendaResumoMensal.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        if args.comando == "rebuild":
+            linhas = reconstruir_resumo(db, args.usuario)
+            print(f"✅ Resumo reconstruído: {linhas} linhas")
+            return
+
+        divergencias = verificar_resumo(db, args.usuario)
+        if not divergencias:
+            print("✅ Resumo consistente com as vendas")
+            return
+
+        for div in divergencias:
+            print(
+                f"❌ {div['id_usuario']} {div['mes']} {div['status']}: "
+                f"esperado {div['esperado']}, atual {div['atual']}"
+            )
+
+        if args.reparar:
+            for id_usuario in {div["id_usuario"] for div in divergencias}:
+                reconstruir_resumo(db, id_usuario)
+            print(f"✅ {len(divergencias)} divergências reparadas")
+        else:
+            sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Normaliza para E.164 os telefones dos clientes já existentes (coluna
+telefone_e164), em lotes, e cria o índice de busca por telefone.
+
+Uso (a partir de backend/):
+    python -m scripts.telefones_clientes [--lote 5000] [--usuario UUID]
+
+Execute uma vez após atualizar um banco que já tem clientes (ou após mudar
+TELEFONE_DDI_PADRAO); os novos clientes são normalizados ao serem gravados.
+Telefones que não podem ser convertidos ficam com telefone_e164 vazio.
+"""
+
+import argparse
+from uuid import UUID
+
+from sqlalchemy import bindparam, select, update
+
+from app.models.cliente import ClienteLead
+from app.utils.database import (
+    SessionLocal,
+    create_missing_columns,
+    create_missing_indexes,
+    engine,
+)
+from app.utils.telefone import normalizar_telefone
+
+
+def normalizar(db, lote: int, id_usuario=None) -> tuple[int, int]:
+    """Percorre os clientes com telefone por id; retorna (lidos, sem E.164)"""
+    atualizar = (
+        update(ClienteLead.__table__)
+        .where(ClienteLead.id_cliente == bindparam("_id"))
+        .values(telefone_e164=bindparam("_e164"))
+    )
+    lidos = invalidos = 0
+    ultimo = None
+    while True:
+        query = select(
+            ClienteLead.id_cliente, ClienteLead.telefone, ClienteLead.telefone_e164
+        ).where(ClienteLead.telefone.is_not(None))
+        if id_usuario is not None:
+            query = query.where(ClienteLead.id_usuario == id_usuario)
+        if ultimo is not None:
+            query = query.where(ClienteLead.id_cliente > ultimo)
+        linhas = db.execute(query.order_by(ClienteLead.id_cliente).limit(lote)).all()
+        if not linhas:
+            return lidos, invalidos
+
+        alterados = []
+        for linha in linhas:
+            e164 = normalizar_telefone(linha.telefone)
+            if e164 is None:
+                invalidos += 1
+            if e164 != linha.telefone_e164:
+                alterados.append({"_id": linha.id_cliente, "_e164": e164})
+        if alterados:
+            db.execute(atualizar, alterados)
+        db.commit()
+
+        lidos += len(linhas)
+        ultimo = linhas[-1].id_cliente
+        print(f"... {lidos} clientes verificados ({len(alterados)} alterados no lote)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lote", type=int, default=5000)
+    parser.add_argument("--usuario", type=UUID, default=None)
+    args = parser.parse_args()
+
+    create_missing_columns(engine)
+    db = SessionLocal()
+    try:
+        lidos, invalidos = normalizar(db, args.lote, args.usuario)
+    finally:
+        db.close()
+    create_missing_indexes(engine)
+    print(f"✅ {lidos} telefones verificados; {invalidos} sem formato válido")
+
+
+if __name__ == "__main__":
+    main()
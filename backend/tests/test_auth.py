@@ -0,0 +1,79 @@
+"""
+Testes da autenticação: revogação de tokens no logout e novo login (contra o
+Postgres de DATABASE_URL).
+
+    cd backend && python -m pytest tests/test_auth.py
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy import delete
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.models.user import User
+from app.utils.database import Base, SessionLocal, create_missing_columns, engine
+from app.utils.security import (
+    create_access_token,
+    revoke_user_tokens,
+    user_cache,
+    usuario_do_token,
+)
+
+
+@pytest.fixture
+def db():
+    try:
+        Base.metadata.create_all(bind=engine)
+        create_missing_columns(engine)
+    except OperationalError as e:
+        pytest.skip(f"Banco indisponível: {e}")
+    sessao = SessionLocal()
+    yield sessao
+    sessao.close()
+
+
+def _token_emitido_ha(id_usuario, segundos: int) -> str:
+    emitido = datetime.utcnow() - timedelta(seconds=segundos)
+    return jwt.encode(
+        {"sub": str(id_usuario), "iat": emitido, "exp": emitido + timedelta(hours=1)},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+
+
+def _autenticar(token: str, db):
+    return asyncio.run(usuario_do_token(token, db))
+
+
+def test_logout_revoga_tokens_antigos_e_aceita_novo_login(db):
+    usuario = User(nome="Auth", e_mail=f"auth-{uuid.uuid4()}@x.com", senha_hash="-")
+    db.add(usuario)
+    db.commit()
+    id_usuario = usuario.id_usuario
+
+    antigo = _token_emitido_ha(id_usuario, 5)
+    assert _autenticar(antigo, db).id_usuario == id_usuario  # fica no cache
+
+    revoke_user_tokens(db, id_usuario)
+    # Novo login logo depois (no mesmo segundo): o "iat" é truncado ao segundo
+    novo = create_access_token({"sub": str(id_usuario)})
+
+    with pytest.raises(HTTPException) as erro:
+        _autenticar(antigo, db)
+    assert erro.value.status_code == 401
+    assert _autenticar(novo, db).id_usuario == id_usuario
+
+    # Outro worker (cache vazio) lê a revogação do banco
+    user_cache.clear()
+    with pytest.raises(HTTPException):
+        _autenticar(antigo, db)
+    assert _autenticar(novo, db).id_usuario == id_usuario
+
+    db.execute(delete(User).where(User.id_usuario == id_usuario))
+    db.commit()
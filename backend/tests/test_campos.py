@@ -0,0 +1,99 @@
+"""
+Testes das respostas com ?fields=: só os campos pedidos, validados pelo
+response_model da rota, e o contrato do OpenAPI (contra o Postgres de
+DATABASE_URL).
+
+    cd backend && python -m pytest tests/test_campos.py
+"""
+
+import uuid
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlalchemy.exc import OperationalError
+
+from app.main import app
+from app.models.cliente import ClienteLead
+from app.models.historico_chat import HistoricoChat
+from app.models.user import User
+from app.models.venda import Venda
+from app.utils.database import SessionLocal, engine
+from app.utils.migracoes import migrar
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.security import get_current_user
+
+
+@pytest.fixture
+def cliente_http():
+    try:
+        migrar(engine)
+    except OperationalError as e:
+        pytest.skip(f"Banco indisponível: {e}")
+    db = SessionLocal()
+    usuario = User(nome="Campos", e_mail=f"campos-{uuid.uuid4()}@x.com", senha_hash="-")
+    db.add(usuario)
+    db.flush()
+    cliente = ClienteLead(nome="Cliente Campos", id_usuario=usuario.id_usuario)
+    db.add(cliente)
+    db.flush()
+    for i in range(2):
+        db.add(HistoricoChat(interacao=f"mensagem {i}", id_usuario=usuario.id_usuario))
+        db.add(
+            Venda(
+                titulo=f"Venda {i}",
+                valor=Decimal("10.00"),
+                observacoes="observação longa",
+                id_cliente=cliente.id_cliente,
+                id_usuario=usuario.id_usuario,
+            )
+        )
+    db.commit()
+    db.refresh(usuario)
+    db.expunge(usuario)
+
+    # Sem o with: não dispara o startup da aplicação
+    app.dependency_overrides[get_current_user] = lambda: usuario
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    db.execute(delete(User).where(User.id_usuario == usuario.id_usuario))
+    db.commit()
+    db.close()
+
+
+def test_historico_traz_o_texto_das_mensagens(cliente_http):
+    resposta = cliente_http.get("/historico-chat/", params={"limit": 1})
+    assert resposta.status_code == 200
+    assert resposta.json()[0]["interacao"] == "mensagem 1"
+    assert resposta.headers[NEXT_CURSOR_HEADER]
+
+    resposta = cliente_http.get(
+        "/historico-chat/", params={"fields": "id_mensagem,data_envio"}
+    )
+    assert [set(m) for m in resposta.json()] == [{"id_mensagem", "data_envio"}] * 2
+
+
+def test_listagem_omite_os_campos_pesados(cliente_http):
+    vendas = cliente_http.get("/vendas/").json()
+    assert len(vendas) == 2
+    assert all("observacoes" not in v and v["titulo"] for v in vendas)
+
+    vendas = cliente_http.get("/vendas/", params={"fields": "id_venda,observacoes"})
+    assert [set(v) for v in vendas.json()] == [{"id_venda", "observacoes"}] * 2
+
+    id_venda = vendas.json()[0]["id_venda"]
+    venda = cliente_http.get(f"/vendas/{id_venda}").json()
+    assert venda["observacoes"] == "observação longa"
+    assert cliente_http.get("/vendas/", params={"fields": "senha"}).status_code == 400
+
+
+def test_openapi_declara_os_campos_opcionais(cliente_http):
+    openapi = cliente_http.get("/openapi.json").json()
+    schemas = openapi["components"]["schemas"]
+    for nome in ("VendaResponseCampos", "HistoricoChatResponseCampos"):
+        assert not schemas[nome].get("required")
+
+    lista = openapi["paths"]["/vendas/"]["get"]["responses"]["200"]
+    esquema = lista["content"]["application/json"]["schema"]
+    assert esquema["items"]["$ref"].endswith("/VendaResponseCampos")
@@ -0,0 +1,144 @@
+"""
+Testes da compressão de textos longos: ida e volta do TextoComprimido e
+leitura de linhas antigas (UTF-8 puro em BYTEA e coluna ainda em TEXT), as de
+banco contra o Postgres de DATABASE_URL.
+
+    cd backend && python -m pytest tests/test_compressao.py
+"""
+
+import base64
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, Text, insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from app.utils.compressao import (
+    MAGICA_ZSTD,
+    MINIMO_PARA_COMPRIMIR,
+    TextoComprimido,
+    comprimido,
+    comprimir,
+    descomprimir,
+)
+from app.utils.database import engine
+
+LONGO = "Cliente pediu desconto à vista; vendedor ofereceu 5% 🙂. " * 20
+
+
+@pytest.mark.parametrize(
+    "texto",
+    ["", "curto", "x" * (MINIMO_PARA_COMPRIMIR - 1), LONGO, "ação " * 100],
+)
+def test_ida_e_volta(texto):
+    dados = comprimir(texto)
+    assert descomprimir(dados) == texto
+    assert descomprimir(memoryview(dados)) == texto
+
+
+def test_comprime_so_o_que_compensa():
+    # Curto: UTF-8 puro, sem o cabeçalho do zstd
+    assert comprimir("curto") == "curto".encode()
+    assert comprimido(comprimir(LONGO))
+    assert len(comprimir(LONGO)) < len(LONGO.encode())
+    # Aleatório não diminui: fica puro
+    aleatorio = base64.b64encode(os.urandom(60)).decode()
+    assert comprimir(aleatorio) == aleatorio.encode()
+
+
+def test_linhas_antigas():
+    assert descomprimir("ainda em TEXT") == "ainda em TEXT"
+    assert descomprimir("UTF-8 puro, não recomprimido".encode()) == (
+        "UTF-8 puro, não recomprimido"
+    )
+    assert not comprimido("texto".encode())
+    assert comprimido(MAGICA_ZSTD + b"\x00")
+
+
+def test_threads_usam_compressores_proprios():
+    textos = [f"{LONGO} {i}" for i in range(200)]
+    with ThreadPoolExecutor(8) as executor:
+        voltas = list(executor.map(lambda t: descomprimir(comprimir(t)), textos))
+    assert voltas == textos
+
+
+@pytest.fixture
+def tabelas():
+    """Mesma coluna como BYTEA (convertida) e como TEXT (antes da conversão)"""
+    metadata = MetaData()
+    convertida = Table(
+        "compressao_teste_bytea",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("texto", TextoComprimido),
+    )
+    Table(
+        "compressao_teste_text",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("texto", Text),
+    )
+    try:
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+    except OperationalError as e:
+        pytest.skip(f"Banco indisponível: {e}")
+    # Como o modelo enxerga a tabela antiga: TextoComprimido sobre TEXT
+    legada = Table(
+        "compressao_teste_text",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("texto", TextoComprimido),
+    )
+    yield convertida, legada
+    metadata.drop_all(engine)
+
+
+def test_texto_comprimido_no_banco(tabelas):
+    convertida, _ = tabelas
+    textos = {1: "curto", 2: LONGO, 3: None}
+    with engine.begin() as conn:
+        conn.execute(
+            insert(convertida), [{"id": i, "texto": t} for i, t in textos.items()]
+        )
+        # Gravada antes da compressão: UTF-8 puro na coluna BYTEA
+        conn.execute(
+            text("INSERT INTO compressao_teste_bytea VALUES (4, :dados)"),
+            {"dados": "linha antiga".encode()},
+        )
+        brutos = dict(
+            conn.execute(text("SELECT id, texto FROM compressao_teste_bytea")).all()
+        )
+        lidos = dict(conn.execute(select(convertida.c.id, convertida.c.texto)).all())
+
+    assert lidos == {**textos, 4: "linha antiga"}
+    assert comprimido(bytes(brutos[2]))
+    assert bytes(brutos[1]) == b"curto"
+
+
+def test_coluna_ainda_em_text(tabelas):
+    _, legada = tabelas
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO compressao_teste_text VALUES (1, :t), (2, NULL)"),
+            {"t": LONGO},
+        )
+        lidos = dict(conn.execute(select(legada.c.id, legada.c.texto)).all())
+    assert lidos == {1: LONGO, 2: None}
+
+
+def test_grava_e_le_na_coluna_ainda_em_text(tabelas):
+    _, legada = tabelas
+    # Como no startup com a coluna em TEXT (migracoes.marcar_colunas_em_texto)
+    legada.c.texto.type.em_texto = True
+    textos = {1: "ola mundo", 2: LONGO, 3: "barra \\ e \\x00", 4: None}
+    with engine.begin() as conn:
+        conn.execute(insert(legada), [{"id": i, "texto": t} for i, t in textos.items()])
+        brutos = dict(
+            conn.execute(text("SELECT id, texto FROM compressao_teste_text")).all()
+        )
+        lidos = dict(conn.execute(select(legada.c.id, legada.c.texto)).all())
+    # No banco fica o texto puro, não o hex do BYTEA
+    assert brutos == textos
+    assert lidos == textos
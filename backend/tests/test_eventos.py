@@ -0,0 +1,112 @@
+"""
+Testes do barramento de eventos SSE com o broker em memória (sem banco).
+
+    cd backend && python -m pytest tests/test_eventos.py
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+
+from app.utils.eventos import BarramentoEventos, BrokerEventos, BrokerMemoria
+
+
+async def _proximos(fluxo, n):
+    return [await anext(fluxo) for _ in range(n)]
+
+
+def test_eventos_chegam_so_ao_usuario():
+    barramento = BarramentoEventos(BrokerMemoria(), buffer=10)
+    usuario, outro = uuid.uuid4(), uuid.uuid4()
+
+    async def cenario():
+        meu = barramento.transmitir(usuario, heartbeat=5)
+        alheio = barramento.transmitir(outro, heartbeat=0.05)
+        await _proximos(meu, 1)  # retry (registra a conexão)
+        await _proximos(alheio, 1)
+
+        # Publicado de outra thread, como nas rotas síncronas
+        publicar = threading.Thread(
+            target=barramento.publicar,
+            args=(usuario, "mensagem", {"interacao": "olá"}),
+        )
+        publicar.start()
+        publicar.join()
+
+        recebidos = await _proximos(meu, 1) + await _proximos(alheio, 1)
+        await meu.aclose()
+        await alheio.aclose()
+        return recebidos
+
+    evento, ping = asyncio.run(cenario())
+    assert evento == 'event: mensagem\ndata: {"interacao":"olá"}\n\n'
+    assert ping == ": ping\n\n"
+    assert barramento.stats()["conexoes"] == 0
+
+
+def test_fila_cheia_descarta_os_mais_antigos():
+    barramento = BarramentoEventos(BrokerMemoria(), buffer=3)
+    usuario = uuid.uuid4()
+
+    async def cenario():
+        fluxo = barramento.transmitir(usuario, heartbeat=5)
+        await _proximos(fluxo, 1)
+        for i in range(5):
+            barramento.publicar(usuario, "sugestao", {"n": i})
+        await asyncio.sleep(0)  # entregas agendadas no loop
+        recebidos = await _proximos(fluxo, 4)
+        await fluxo.aclose()
+        return recebidos
+
+    recebidos = asyncio.run(cenario())
+    assert recebidos[0] == 'event: sincronizar\ndata: {"descartados": 2}\n\n'
+    assert [r.split("data: ")[1] for r in recebidos[1:]] == [
+        '{"n":2}\n\n',
+        '{"n":3}\n\n',
+        '{"n":4}\n\n',
+    ]
+    assert barramento.stats()["descartados"] == 2
+
+
+def test_sem_conexoes_nao_publica():
+    broker = BrokerMemoria()
+    barramento = BarramentoEventos(broker, buffer=10)
+    barramento.publicar(uuid.uuid4(), "chamada", {"id_chamada": "x"})
+    assert barramento.stats()["publicados"] == 0
+
+
+class _BrokerRemotoLento(BrokerEventos):
+    """Broker remoto de teste: cada publicação espera `liberar`; a 1ª falha"""
+
+    nome = "lento"
+    remote = True
+
+    def __init__(self):
+        self.liberar = threading.Event()
+        self.enviadas = []
+
+    def publicar(self, mensagem: str) -> None:
+        self.liberar.wait()
+        if not self.enviadas:
+            self.enviadas.append(None)
+            raise ConnectionError("redis fora do ar")
+        self.enviadas.append(mensagem.split("\n")[1])
+
+
+def test_broker_remoto_nao_bloqueia_quem_publica():
+    broker = _BrokerRemotoLento()
+    barramento = BarramentoEventos(broker, buffer=10)
+    usuario = uuid.uuid4()
+
+    inicio = time.perf_counter()
+    for tipo in ("a", "b", "c"):
+        barramento.publicar(usuario, tipo, {})  # não espera o broker nem falha
+    assert time.perf_counter() - inicio < 0.5
+    assert barramento.stats()["pendentes"] >= 2
+
+    broker.liberar.set()
+    barramento.fechar()  # envia o que estava na fila
+    assert broker.enviadas == [None, "b", "c"]
+    stats = barramento.stats()
+    assert (stats["publicados"], stats["falhas"], stats["pendentes"]) == (2, 1, 0)
@@ -0,0 +1,136 @@
+"""
+Testes do gateway de IA com o provedor falso (sem rede e sem banco).
+
+    cd backend && python -m pytest tests/test_gateway_ia.py
+"""
+
+import asyncio
+
+import pytest
+
+from app.utils.cache import MemoryCacheBackend
+from app.utils.gateway_ia import (
+    ErroProvedorIA,
+    GatewayIA,
+    GatewaySaturadoError,
+    ProvedorFalso,
+)
+
+
+def _gateway(provedor, concorrencia=4, fila_max=64, timeout=5.0, ttl=60.0):
+    return GatewayIA(
+        provedor,
+        MemoryCacheBackend(maxsize=100, ttl=ttl),
+        concorrencia=concorrencia,
+        fila_max=fila_max,
+        timeout=timeout,
+    )
+
+
+def test_prompts_iguais_em_andamento_chamam_o_provedor_uma_vez():
+    provedor = ProvedorFalso(atraso=0.05)
+    gateway = _gateway(provedor)
+
+    async def cenario():
+        return await asyncio.gather(
+            *(gateway.gerar("Cliente pediu desconto") for _ in range(20))
+        )
+
+    respostas = asyncio.run(cenario())
+    assert len(set(respostas)) == 1
+    assert provedor.chamadas == 1
+    assert gateway.coalescidas == 19
+
+
+def test_cache_usa_o_prompt_normalizado():
+    provedor = ProvedorFalso()
+    gateway = _gateway(provedor)
+
+    async def cenario():
+        primeira = await gateway.gerar("Cliente  pediu\nDESCONTO ")
+        segunda = await gateway.gerar("cliente pediu desconto")
+        outra = await gateway.gerar("cliente pediu prazo")
+        return primeira, segunda, outra
+
+    primeira, segunda, outra = asyncio.run(cenario())
+    assert primeira == segunda != outra
+    assert provedor.chamadas == 2
+
+
+def test_cache_expira_pelo_ttl():
+    provedor = ProvedorFalso()
+    gateway = _gateway(provedor, ttl=0.05)
+
+    async def cenario():
+        await gateway.gerar("prazo de entrega")
+        await asyncio.sleep(0.1)
+        await gateway.gerar("prazo de entrega")
+
+    asyncio.run(cenario())
+    assert provedor.chamadas == 2
+
+
+def test_concorrencia_limitada_por_provedor():
+    ativos = maximo = 0
+
+    class ProvedorContado(ProvedorFalso):
+        async def gerar(self, prompt, instrucao):
+            nonlocal ativos, maximo
+            ativos += 1
+            maximo = max(maximo, ativos)
+            try:
+                return await super().gerar(prompt, instrucao)
+            finally:
+                ativos -= 1
+
+    gateway = _gateway(ProvedorContado(atraso=0.02), concorrencia=3)
+
+    async def cenario():
+        await asyncio.gather(*(gateway.gerar(f"prompt {i}") for i in range(12)))
+
+    asyncio.run(cenario())
+    assert maximo == 3
+
+
+def test_fila_cheia_rejeita_prompts_novos():
+    gateway = _gateway(ProvedorFalso(atraso=0.05), concorrencia=1, fila_max=2)
+
+    async def cenario():
+        return await asyncio.gather(
+            *(gateway.gerar(f"prompt {i}") for i in range(3)), return_exceptions=True
+        )
+
+    resultados = asyncio.run(cenario())
+    assert isinstance(resultados[2], GatewaySaturadoError)
+    assert all(isinstance(r, str) for r in resultados[:2])
+
+
+def test_tempo_esgotado_nao_fica_em_cache():
+    provedor = ProvedorFalso(atraso=0.2)
+    gateway = _gateway(provedor, timeout=0.01)
+
+    async def cenario():
+        with pytest.raises(ErroProvedorIA):
+            await gateway.gerar("proposta")
+        provedor.atraso = 0
+        return await gateway.gerar("proposta")
+
+    assert asyncio.run(cenario())
+    assert provedor.chamadas == 2
+
+
+def test_redis_fora_do_ar_calcula_sem_cache():
+    pytest.importorskip("redis")
+    from app.utils.cache import RedisCacheBackend
+
+    cache = RedisCacheBackend("redis://127.0.0.1:1/0", ttl=60)  # porta fechada
+    provedor = ProvedorFalso()
+    gateway = GatewayIA(provedor, cache, concorrencia=4, fila_max=64, timeout=5.0)
+
+    for _ in range(2):
+        assert asyncio.run(gateway.gerar("Cliente pediu desconto")).startswith(
+            "Sugestão"
+        )
+    assert provedor.chamadas == 2  # sem cache, mas sem erro
+    cache.delete("qualquer")
+    assert cache.stats()["falhas"] == 5  # 2 get, 2 set e 1 delete
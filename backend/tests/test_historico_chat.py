@@ -0,0 +1,293 @@
+"""
+Testes do histórico de chat: meses das partições, limpeza em lotes,
+montagem do contexto e write-behind das mensagens (os de banco contra o
+Postgres de DATABASE_URL).
+
+    cd backend && python -m pytest tests/test_historico_chat.py
+"""
+
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import OperationalError
+
+from app.models.historico_chat import HistoricoChat
+from app.models.limpeza_historico import LimpezaHistorico
+from app.models.user import User
+from app.utils import buffer_chat, historico_chat
+from app.utils.buffer_chat import BufferCheioError, BufferMensagens
+from app.utils.contexto_chat import ContextoChat, _Tamanhos
+from app.utils.database import Base, SessionLocal, engine
+from app.utils.historico_chat import (
+    LimpezasHistorico,
+    garantir_particoes,
+    inicio_do_mes,
+    nome_particao,
+)
+
+
+def test_meses_das_particoes():
+    assert inicio_do_mes(date(2026, 10, 18)) == date(2026, 10, 1)
+    assert inicio_do_mes(date(2026, 11, 30), 2) == date(2027, 1, 1)
+    assert inicio_do_mes(date(2026, 1, 31), -13) == date(2024, 12, 1)
+    assert nome_particao(date(2027, 1, 1)) == "historicochat_2027_01"
+
+
+@pytest.mark.skipif(engine.dialect.name != "postgresql", reason="Requer PostgreSQL")
+def test_limpeza_em_lotes_mantem_mensagens_novas(monkeypatch):
+    try:
+        Base.metadata.create_all(bind=engine)
+        garantir_particoes(engine, 0)
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL indisponível: {e}")
+
+    progresso = []
+    monkeypatch.setattr(
+        historico_chat.eventos,
+        "publicar",
+        lambda id_usuario, tipo, dados: progresso.append(dados["removidas"]),
+    )
+
+    db = SessionLocal()
+    usuario = User(
+        nome="Limpeza", e_mail=f"limpeza-{uuid.uuid4()}@x.com", senha_hash="-"
+    )
+    db.add(usuario)
+    db.flush()
+    for i in range(7):
+        db.add(HistoricoChat(interacao=f"m{i}", id_usuario=usuario.id_usuario))
+    db.commit()
+
+    limpezas = LimpezasHistorico(lote=3, pausa=0)
+    limpeza, executar = limpezas.iniciar(db, usuario.id_usuario)
+    assert executar
+    outra, executar = limpezas.iniciar(db, usuario.id_usuario)
+    assert (outra.id_limpeza, executar) == (limpeza.id_limpeza, False)
+
+    # Enviada depois do pedido: não entra na limpeza
+    depois = limpeza.ate + timedelta(seconds=1)
+    db.add(
+        HistoricoChat(
+            interacao="nova", id_usuario=usuario.id_usuario, data_envio=depois
+        )
+    )
+    db.commit()
+
+    limpezas.executar(limpeza)
+    assert (limpeza.status, limpeza.total, limpeza.removidas) == ("concluida", 7, 7)
+    assert progresso == [0, 3, 6, 7, 7]
+    # Gravado no banco: outro worker vê o mesmo progresso
+    gravada = limpezas.obter(db, usuario.id_usuario)
+    assert gravada.resumo() == limpeza.resumo()
+    restantes = db.scalars(
+        select(HistoricoChat.interacao).where(
+            HistoricoChat.id_usuario == usuario.id_usuario
+        )
+    ).all()
+    assert restantes == ["nova"]
+
+    db.execute(delete(User).where(User.id_usuario == usuario.id_usuario))
+    db.commit()
+    db.close()
+
+
+@pytest.mark.skipif(engine.dialect.name != "postgresql", reason="Requer PostgreSQL")
+def test_limpeza_abandonada_e_retomada(monkeypatch):
+    try:
+        Base.metadata.create_all(bind=engine)
+        garantir_particoes(engine, 0)
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL indisponível: {e}")
+    monkeypatch.setattr(historico_chat.eventos, "publicar", lambda *a: None)
+
+    db = SessionLocal()
+    usuario = User(
+        nome="Retomada", e_mail=f"retomada-{uuid.uuid4()}@x.com", senha_hash="-"
+    )
+    db.add(usuario)
+    db.flush()
+    for i in range(5):
+        db.add(HistoricoChat(interacao=f"m{i}", id_usuario=usuario.id_usuario))
+    db.commit()
+
+    limpezas = LimpezasHistorico(lote=2, pausa=0, abandonada=60)
+    limpeza, _ = limpezas.iniciar(db, usuario.id_usuario)
+    # O worker que a executava parou depois do primeiro lote
+    db.execute(
+        delete(HistoricoChat).where(
+            HistoricoChat.interacao.in_(["m0", "m1"]),
+            HistoricoChat.id_usuario == usuario.id_usuario,
+        )
+    )
+    parada = {"status": "em_andamento", "total": 5, "removidas": 2}
+    db.execute(
+        update(LimpezaHistorico)
+        .where(LimpezaHistorico.id_limpeza == limpeza.id_limpeza)
+        .values(**parada, atualizada_em=datetime.utcnow())
+    )
+    db.commit()
+
+    # Recente: ainda é de outro worker
+    assert limpezas.iniciar(db, usuario.id_usuario)[1] is False
+    assert limpezas.retomar() == 0
+
+    db.execute(
+        update(LimpezaHistorico)
+        .where(LimpezaHistorico.id_limpeza == limpeza.id_limpeza)
+        .values(atualizada_em=datetime.utcnow() - timedelta(minutes=5))
+    )
+    db.commit()
+    assert limpezas.retomar() == 1
+    assert limpezas.retomar() == 0
+
+    gravada = limpezas.obter(db, usuario.id_usuario)
+    assert (gravada.status, gravada.total, gravada.removidas) == ("concluida", 5, 5)
+    assert not db.scalars(
+        select(HistoricoChat).where(HistoricoChat.id_usuario == usuario.id_usuario)
+    ).all()
+
+    db.execute(delete(User).where(User.id_usuario == usuario.id_usuario))
+    db.commit()
+    db.close()
+
+
+def test_tamanhos_do_contexto():
+    tamanhos = _Tamanhos()
+    tamanhos.acrescentar((1, "c"), "x" * 30)
+    tamanhos.acrescentar((2, "d"), "x" * 10)
+    tamanhos.antepor([((0, "a"), "x" * 50), ((0, "b"), "x" * 20)])
+    assert [c for _, c in tamanhos.chaves] == ["a", "b", "c", "d"]
+    assert tamanhos.caracteres == [0, 50, 70, 100, 110]
+
+    # Maior sufixo que cabe; para na primeira mensagem que não cabe
+    assert tamanhos.inicio(40, None) == 2
+    assert tamanhos.inicio(59, None) == 2
+    assert tamanhos.inicio(60, None) == 1
+    assert tamanhos.inicio(5, None) == 4
+    assert tamanhos.inicio(1000, None) == 0
+    assert tamanhos.inicio(1000, 11) == 2  # tokens estimados: 8 + 3
+    assert tamanhos.inicio(1000, 10) == 3
+
+    tamanhos.aparar(2)
+    assert [c for _, c in tamanhos.chaves] == ["c", "d"]
+    assert tamanhos.caracteres == [0, 30, 40] and not tamanhos.completo
+
+
+@pytest.mark.skipif(engine.dialect.name != "postgresql", reason="Requer PostgreSQL")
+def test_contexto_usa_e_estende_o_cache():
+    try:
+        Base.metadata.create_all(bind=engine)
+        garantir_particoes(engine, 0)
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL indisponível: {e}")
+
+    db = SessionLocal()
+    usuario = User(
+        nome="Contexto", e_mail=f"contexto-{uuid.uuid4()}@x.com", senha_hash="-"
+    )
+    db.add(usuario)
+    db.flush()
+    inicio = datetime.utcnow() - timedelta(hours=1)
+    for i in range(25):
+        db.add(
+            HistoricoChat(
+                interacao=f"mensagem {i:02d}",  # 13 caracteres
+                id_usuario=usuario.id_usuario,
+                data_envio=inicio + timedelta(seconds=i),
+            )
+        )
+    db.commit()
+
+    contexto = ContextoChat(usuarios=8, max_mensagens=100, pagina=4)
+    mensagens, truncado = contexto.montar(db, usuario.id_usuario, max_caracteres=40)
+    assert [m.interacao for m in mensagens] == [
+        "mensagem 22",
+        "mensagem 23",
+        "mensagem 24",
+    ]
+    assert truncado
+
+    # Mensagem nova estende o cache; a remoção é detectada pelas chaves
+    nova = HistoricoChat(interacao="mensagem 25", id_usuario=usuario.id_usuario)
+    db.add(nova)
+    db.commit()
+    contexto.adicionar(usuario.id_usuario, nova)
+    db.delete(mensagens[1])
+    db.commit()
+    mensagens, _ = contexto.montar(db, usuario.id_usuario, max_caracteres=40)
+    assert [m.interacao for m in mensagens] == [
+        "mensagem 22",
+        "mensagem 24",
+        "mensagem 25",
+    ]
+
+    mensagens, truncado = contexto.montar(db, usuario.id_usuario, max_tokens=1000)
+    assert len(mensagens) == 25 and not truncado
+
+    db.execute(delete(User).where(User.id_usuario == usuario.id_usuario))
+    db.commit()
+    db.close()
+
+
+@pytest.mark.skipif(engine.dialect.name != "postgresql", reason="Requer PostgreSQL")
+def test_write_behind_grava_em_lote_e_no_fechamento(monkeypatch):
+    try:
+        Base.metadata.create_all(bind=engine)
+        garantir_particoes(engine, 0)
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL indisponível: {e}")
+
+    publicadas = []
+    monkeypatch.setattr(
+        buffer_chat.eventos,
+        "publicar",
+        lambda id_usuario, tipo, dados: publicadas.append(dados.interacao),
+    )
+
+    db = SessionLocal()
+    usuario = User(nome="Buffer", e_mail=f"buffer-{uuid.uuid4()}@x.com", senha_hash="-")
+    db.add(usuario)
+    db.commit()
+
+    def gravadas():
+        db.rollback()
+        return db.scalars(
+            select(HistoricoChat.interacao)
+            .where(HistoricoChat.id_usuario == usuario.id_usuario)
+            .order_by(HistoricoChat.data_envio)
+        ).all()
+
+    async def cenario():
+        buffer = BufferMensagens(ativo=True, lote=3, intervalo=60, maximo=5)
+        linhas = [buffer.adicionar(usuario.id_usuario, f"m{i}") for i in range(4)]
+        assert linhas[0]["data_envio"] <= linhas[3]["data_envio"]
+
+        # Gravação por tamanho: só lotes cheios; a 4ª espera o intervalo
+        assert await buffer.descarregar(todos=False)
+        assert gravadas() == ["m0", "m1", "m2"]
+        assert buffer.stats()["pendentes"] == 1
+
+        # Com `maximo` pendentes, novas mensagens são rejeitadas
+        for i in range(4, 8):
+            buffer.adicionar(usuario.id_usuario, f"m{i}")
+        with pytest.raises(BufferCheioError):
+            buffer.adicionar(usuario.id_usuario, "rejeitada")
+
+        # Fechamento grava todas as pendentes (o lote parcial inclusive)
+        buffer.iniciar()
+        assert buffer.aceitando
+        await buffer.fechar()
+        assert not buffer.aceitando
+        return buffer.stats()
+
+    stats = asyncio.run(cenario())
+    esperadas = [f"m{i}" for i in range(8)]
+    assert gravadas() == esperadas and publicadas == esperadas
+    assert (stats["gravadas"], stats["rejeitadas"], stats["pendentes"]) == (8, 1, 0)
+
+    db.execute(delete(User).where(User.id_usuario == usuario.id_usuario))
+    db.commit()
+    db.close()
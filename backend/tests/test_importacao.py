@@ -0,0 +1,85 @@
+"""
+Testes da importação em massa de clientes: relatório por linha, e-mails
+repetidos e valores com separadores do COPY (contra o Postgres de DATABASE_URL).
+
+    cd backend && python -m pytest tests/test_importacao.py
+"""
+
+import io
+import json
+import uuid
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.exc import OperationalError
+
+from app.models.cliente import ClienteLead
+from app.models.user import User
+from app.utils.database import SessionLocal, engine
+from app.utils.importacao import importar_registros, ler_ndjson
+from app.utils.migracoes import migrar
+
+
+@pytest.fixture
+def db():
+    try:
+        migrar(engine)
+    except OperationalError as e:
+        pytest.skip(f"Banco indisponível: {e}")
+    sessao = SessionLocal()
+    usuario = User(
+        nome="Importação", e_mail=f"importacao-{uuid.uuid4()}@x.com", senha_hash="-"
+    )
+    sessao.add(usuario)
+    sessao.flush()
+    sessao.add(
+        ClienteLead(
+            nome="Já cadastrado", e_mail="ja@x.com", id_usuario=usuario.id_usuario
+        )
+    )
+    sessao.commit()
+    yield sessao, usuario
+    sessao.rollback()
+    sessao.execute(delete(User).where(User.id_usuario == usuario.id_usuario))
+    sessao.commit()
+    sessao.close()
+
+
+def _ndjson(*registros) -> io.BytesIO:
+    linhas = [r if isinstance(r, str) else json.dumps(r) for r in registros]
+    return io.BytesIO("\n".join(linhas).encode())
+
+
+def test_importa_em_lotes_com_relatorio_por_linha(db):
+    sessao, usuario = db
+    arquivo = _ndjson(
+        {"nome": "Tab\tBarra\\N", "observacao": "linha 1\nlinha 2\r\\"},
+        {"nome": "Ana Souza", "e_mail": "ana@x.com", "telefone": "(11) 98765-4321"},
+        {"nome": "x"},
+        {"nome": "Ana de novo", "e_mail": "ana@x.com"},
+        {"nome": "Cadastrado", "e_mail": "ja@x.com"},
+        "não é json",
+        {"nome": "Sem email", "empresa": "Ação Ltda"},
+    )
+
+    relatorio = importar_registros(
+        sessao, ler_ndjson(arquivo), usuario.id_usuario, tamanho_lote=2
+    )
+
+    assert (relatorio["total"], relatorio["importados"]) == (7, 3)
+    assert [e["linha"] for e in relatorio["erros"]] == [3, 4, 5, 6]
+    assert relatorio["erros"][1]["erros"] == [
+        "e_mail: Você já tem um cliente com este email"
+    ]
+
+    clientes = {
+        c.nome: c
+        for c in sessao.scalars(
+            select(ClienteLead).where(ClienteLead.id_usuario == usuario.id_usuario)
+        )
+    }
+    assert set(clientes) == {"Já cadastrado", "Tab\tBarra\\N", "Ana Souza", "Sem email"}
+    assert clientes["Tab\tBarra\\N"].observacao == "linha 1\nlinha 2\r\\"
+    assert clientes["Tab\tBarra\\N"].e_mail is None
+    assert clientes["Ana Souza"].telefone_e164 == "+5511987654321"
+    assert clientes["Sem email"].empresa_busca == "acao ltda"
@@ -0,0 +1,90 @@
+"""
+Testes do índice de sugestões aceitas (NumPy, sem banco).
+
+    cd backend && python -m pytest tests/test_indice_sugestoes.py
+"""
+
+import uuid
+
+import numpy as np
+import pytest
+
+from app.utils.indice_sugestoes import IndiceSugestoes, vetorizar
+
+PRECO = "Cliente: achei o preço do plano anual muito caro comparado com o concorrente"
+PRECO_PARECIDO = (
+    "Cliente: achei o preço do plano anual caro comparado com o concorrente"
+)
+PRAZO = "Cliente: qual é o prazo de entrega para a filial de Recife?"
+
+
+def test_vetores_normalizados_e_similaridade():
+    vetores = vetorizar([PRECO, PRECO_PARECIDO, PRAZO, ""])
+    assert np.allclose(np.linalg.norm(vetores[:3], axis=1), 1.0)
+    assert not vetores[3].any()
+    assert vetores[0] @ vetores[1] > 0.8 > vetores[0] @ vetores[2]
+
+
+@pytest.mark.parametrize("aproximado", [False, True])
+def test_busca_por_usuario(aproximado):
+    indice = IndiceSugestoes(None, limiar=0.8, aproximado=aproximado)
+    usuario, outro = uuid.uuid4(), uuid.uuid4()
+    preco, prazo = uuid.uuid4(), uuid.uuid4()
+    indice.construir([(usuario, preco, PRECO), (outro, prazo, PRAZO)])
+
+    resultado = indice.buscar(usuario, [PRECO_PARECIDO, PRAZO])
+    assert resultado[0][0] == preco
+    assert resultado[1] is None  # PRAZO é de outro usuário
+
+    indice.adicionar(usuario, prazo, PRAZO)
+    assert indice.buscar(usuario, [PRAZO])[0][0] == prazo
+
+    indice.remover(preco)
+    assert indice.buscar(usuario, [PRECO])[0] is None
+
+
+def test_persistencia_em_arquivo_mapeado(tmp_path):
+    arquivo = str(tmp_path / "indice.npy")
+    usuario = uuid.uuid4()
+    ids = [uuid.uuid4() for _ in range(3)]
+
+    indice = IndiceSugestoes(arquivo, limiar=0.8, aproximado=False)
+    indice.construir([(usuario, ids[0], PRECO)])
+    indice.adicionar(usuario, ids[1], PRAZO)
+    indice.adicionar(usuario, ids[2], "Cliente: vou falar com o financeiro")
+    indice.remover(ids[2])
+    indice.salvar()
+
+    recarregado = IndiceSugestoes(arquivo, limiar=0.8, aproximado=False)
+    assert recarregado.carregar()
+    assert isinstance(recarregado._base, np.memmap)
+    assert len(recarregado) == 2
+    assert recarregado.buscar(usuario, [PRECO, PRAZO]) == [
+        (ids[0], pytest.approx(1.0)),
+        (ids[1], pytest.approx(1.0)),
+    ]
+
+
+def test_salvar_mantem_o_ultimo_contexto_e_o_de_outros_workers(tmp_path):
+    arquivo = str(tmp_path / "indice.npy")
+    usuario = uuid.uuid4()
+    sugestao, outra = uuid.uuid4(), uuid.uuid4()
+
+    worker = IndiceSugestoes(arquivo, limiar=0.8, aproximado=False)
+    worker.construir([(usuario, sugestao, PRECO)])
+    outro_worker = IndiceSugestoes(arquivo, limiar=0.8, aproximado=False)
+    assert outro_worker.carregar()
+
+    # Aceita de novo com outro contexto: a versão nova substitui a do arquivo
+    worker.adicionar(usuario, sugestao, PRAZO)
+    worker.salvar()
+    outro_worker.adicionar(usuario, outra, "Cliente: vou falar com o financeiro")
+    outro_worker.salvar()  # relê o arquivo: não perde o que o primeiro salvou
+
+    recarregado = IndiceSugestoes(arquivo, limiar=0.8, aproximado=False)
+    assert recarregado.carregar()
+    assert len(recarregado) == 2
+    assert recarregado.buscar(usuario, [PRAZO, PRECO]) == [
+        (sugestao, pytest.approx(1.0)),
+        None,
+    ]
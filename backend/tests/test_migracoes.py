@@ -0,0 +1,252 @@
+"""
+Testes das migrações: criação dos índices que faltam, conversão em lotes
+de colunas TEXT para BYTEA comprimido e preenchimento do dono das sugestões
+(contra o Postgres de DATABASE_URL).
+
+    cd backend && python -m pytest tests/test_migracoes.py
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from app.models.chamada import Chamada
+from app.models.cliente import ClienteLead
+from app.models.sugestao_ia import SugestaoIA
+from app.models.user import User
+from app.utils.compressao import comprimido, descomprimir
+from app.utils.database import Base, SessionLocal, engine
+from app.utils.migracoes import (
+    coluna_obrigatoria,
+    converter_para_bytea,
+    migrar,
+    preencher_dono_sugestoes,
+    tornar_obrigatoria,
+)
+
+if engine.dialect.name != "postgresql":
+    pytest.skip("A conversão requer PostgreSQL", allow_module_level=True)
+
+
+@pytest.fixture(params=["simples", "particionada"])
+def tabela(request):
+    nome = f"migracao_teste_{request.param}"
+    ddl = (
+        f"CREATE TABLE {nome} (id int, parte int, texto text NOT NULL, "
+        "PRIMARY KEY (id, parte))"
+    )
+    if request.param == "particionada":
+        ddl += " PARTITION BY RANGE (parte)"
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {nome}"))
+            conn.execute(text(ddl))
+            if request.param == "particionada":
+                for i in range(2):
+                    conn.execute(
+                        text(
+                            f"CREATE TABLE {nome}_{i} PARTITION OF {nome} "
+                            f"FOR VALUES FROM ({i}) TO ({i + 1})"
+                        )
+                    )
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL indisponível: {e}")
+    yield nome
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE {nome}"))
+
+
+def _textos() -> dict:
+    return {
+        (i, i % 2): ("curto" if i % 3 else f"Transcrição {i} da chamada. " * 10)
+        for i in range(250)
+    }
+
+
+def test_converte_em_lotes_e_troca_as_colunas(tabela):
+    textos = _textos()
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"INSERT INTO {tabela} VALUES (:id, :parte, :texto)"),
+            [{"id": i, "parte": p, "texto": t} for (i, p), t in textos.items()],
+        )
+
+    convertidas = converter_para_bytea(
+        engine, tabela, "texto", ["id", "parte"], lote=100, pausa=0
+    )
+    assert convertidas == len(textos)
+
+    with engine.begin() as conn:
+        tipo, anulavel = conn.execute(
+            text(
+                "SELECT data_type, is_nullable FROM information_schema.columns "
+                "WHERE table_name = :t AND column_name = 'texto'"
+            ),
+            {"t": tabela},
+        ).one()
+        assert (tipo, anulavel) == ("bytea", "NO")
+        colunas = conn.scalars(
+            text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_name = :t"
+            ),
+            {"t": tabela},
+        ).all()
+        assert "texto_bytea" not in colunas
+
+        linhas = conn.execute(text(f"SELECT id, parte, texto FROM {tabela}")).all()
+        assert {(i, p): descomprimir(bytes(d)) for i, p, d in linhas} == textos
+        assert any(comprimido(bytes(d)) for _, _, d in linhas)
+
+        # Sem trigger: gravar bytes direto na coluna nova funciona
+        conn.execute(
+            text(f"INSERT INTO {tabela} VALUES (1000, 0, :dados)"),
+            {"dados": b"novo"},
+        )
+
+
+def test_escritas_durante_o_preenchimento_sao_mantidas_pelo_trigger(
+    tabela, monkeypatch
+):
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"INSERT INTO {tabela} VALUES (:id, :id % 2, 'antes')"),
+            [{"id": i} for i in range(20)],
+        )
+
+    def escrever_no_meio(_segundos):
+        # A versão anterior da aplicação continua gravando na coluna TEXT
+        with engine.begin() as conn:
+            conn.execute(text(f"UPDATE {tabela} SET texto = 'alterada' WHERE id = 0"))
+            conn.execute(
+                text(
+                    f"INSERT INTO {tabela} VALUES (500, 0, 'nova') ON CONFLICT DO NOTHING"
+                )
+            )
+
+    monkeypatch.setattr("app.utils.migracoes.time.sleep", escrever_no_meio)
+    converter_para_bytea(engine, tabela, "texto", ["id", "parte"], lote=5, pausa=1)
+
+    with engine.begin() as conn:
+        linhas = dict(conn.execute(text(f"SELECT id, texto FROM {tabela}")).all())
+    textos = {i: descomprimir(bytes(d)) for i, d in linhas.items()}
+    assert textos[0] == "alterada"
+    assert textos[500] == "nova"
+    assert all(textos[i] == "antes" for i in range(1, 20))
+
+
+def test_migrar_recria_indices_que_faltam():
+    try:
+        migrar(engine)
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL indisponível: {e}")
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_historicochat_usuario_data_envio"))
+        conn.execute(text("DROP INDEX ix_vendas_status"))
+
+    migrar(engine)
+    migrar(engine)  # de novo: nada a fazer
+
+    nomes = [i.name for t in Base.metadata.sorted_tables for i in t.indexes]
+    with engine.begin() as conn:
+        validos = dict(
+            conn.execute(
+                text(
+                    "SELECT c.relname, x.indisvalid FROM pg_index x "
+                    "JOIN pg_class c ON c.oid = x.indexrelid "
+                    "WHERE c.relname = ANY(:nomes)"
+                ),
+                {"nomes": nomes},
+            ).all()
+        )
+    assert validos == {nome: True for nome in nomes}
+
+
+def test_tornar_obrigatoria_preenche_os_nulos():
+    nome = "migracao_teste_obrigatoria"
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {nome}"))
+            conn.execute(text(f"CREATE TABLE {nome} (id int PRIMARY KEY, criada int)"))
+            conn.execute(
+                text(f"INSERT INTO {nome} VALUES (1, 10), (2, NULL), (3, NULL)")
+            )
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL indisponível: {e}")
+
+    assert tornar_obrigatoria(engine, nome, "criada", "id * 100") == 2
+    assert tornar_obrigatoria(engine, nome, "criada", "id * 100") == 0  # já aplicada
+
+    with engine.begin() as conn:
+        valores = dict(conn.execute(text(f"SELECT id, criada FROM {nome}")).all())
+        anulavel = conn.scalar(
+            text(
+                "SELECT is_nullable FROM information_schema.columns "
+                "WHERE table_name = :t AND column_name = 'criada'"
+            ),
+            {"t": nome},
+        )
+        conn.execute(text(f"DROP TABLE {nome}"))
+    assert valores == {1: 10, 2: 200, 3: 300}
+    assert anulavel == "NO"
+
+
+def test_migrar_preenche_o_dono_das_sugestoes():
+    try:
+        migrar(engine)
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL indisponível: {e}")
+    db = SessionLocal()
+    usuario = User(nome="Dono", e_mail=f"dono-{uuid.uuid4()}@x.com", senha_hash="-")
+    db.add(usuario)
+    db.flush()
+    cliente = ClienteLead(nome="Cliente Dono", id_usuario=usuario.id_usuario)
+    db.add(cliente)
+    db.flush()
+    chamada = Chamada(id_usuario=usuario.id_usuario, id_cliente=cliente.id_cliente)
+    db.add(chamada)
+    db.commit()
+
+    # Banco antes da coluna obrigatória: sugestões antigas sem dono
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE sugestoesia ALTER id_usuario DROP NOT NULL"))
+        conn.execute(text("DROP TRIGGER sugestoesia_preencher_usuario ON sugestoesia"))
+        conn.execute(
+            insert(SugestaoIA.__table__),
+            [
+                {
+                    "id_sugestao": uuid.uuid4(),
+                    "conteudo": f"s{i}",
+                    "id_chamada": chamada.id_chamada,
+                }
+                for i in range(7)
+            ],
+        )
+
+    try:
+        assert preencher_dono_sugestoes(engine, lote=3) == 7
+        migrar(engine)
+        assert coluna_obrigatoria(engine, "sugestoesia", "id_usuario")
+
+        # Versão anterior da aplicação, durante o deploy: grava sem o dono
+        with engine.begin() as conn:
+            conn.execute(
+                insert(SugestaoIA.__table__).values(
+                    id_sugestao=uuid.uuid4(),
+                    conteudo="nova",
+                    id_chamada=chamada.id_chamada,
+                )
+            )
+            donos = conn.scalars(
+                select(SugestaoIA.id_usuario).where(
+                    SugestaoIA.id_chamada == chamada.id_chamada
+                )
+            ).all()
+        assert donos == [usuario.id_usuario] * 8
+    finally:
+        migrar(engine)  # volta ao esquema atual se algo falhou no meio
+        db.execute(delete(User).where(User.id_usuario == usuario.id_usuario))
+        db.commit()
+        db.close()
@@ -0,0 +1,133 @@
+"""
+Testes da paginação por cursor (keyset): ida e volta do cursor entre páginas,
+empates na chave de ordenação e chaves NULL (contra o Postgres de DATABASE_URL).
+
+    cd backend && python -m pytest tests/test_pagination.py
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.models.chamada import Chamada
+from app.models.cliente import ClienteLead
+from app.models.sugestao_ia import SugestaoIA
+from app.models.user import User
+from app.models.venda import Venda
+from app.utils.database import SessionLocal, engine
+from app.utils.migracoes import migrar
+from app.utils.pagination import NEXT_CURSOR_HEADER, definir_proximo_cursor, paginar
+
+
+@pytest.fixture
+def db():
+    try:
+        migrar(engine)
+    except OperationalError as e:
+        pytest.skip(f"Banco indisponível: {e}")
+    sessao = SessionLocal()
+    usuario = User(nome="Cursor", e_mail=f"cursor-{uuid.uuid4()}@x.com", senha_hash="-")
+    sessao.add(usuario)
+    sessao.flush()
+    cliente = ClienteLead(nome="Cliente Cursor", id_usuario=usuario.id_usuario)
+    sessao.add(cliente)
+    sessao.flush()
+    yield sessao, usuario, cliente
+    sessao.rollback()
+    sessao.execute(delete(User).where(User.id_usuario == usuario.id_usuario))
+    sessao.commit()
+    sessao.close()
+
+
+def _todas_as_paginas(query, ordem, limit: int, desc: bool) -> list:
+    """Segue o X-Next-Cursor até a última página"""
+    itens, cursor = [], None
+    while True:
+        pagina = paginar(query, ordem, cursor, desc=desc).limit(limit).all()
+        response = Response()
+        definir_proximo_cursor(response, pagina, limit, ordem)
+        itens.extend(pagina)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return itens
+
+
+def test_vendas_com_datas_repetidas(db):
+    sessao, usuario, cliente = db
+    agora = datetime.utcnow().replace(microsecond=0)
+    for i in range(7):
+        sessao.add(
+            Venda(
+                titulo=f"Venda {i}",
+                valor=Decimal("1.00"),
+                id_cliente=cliente.id_cliente,
+                id_usuario=usuario.id_usuario,
+                data_criacao=agora - timedelta(days=i // 3),  # empates por dia
+            )
+        )
+    sessao.commit()
+
+    query = sessao.query(Venda).filter(Venda.id_usuario == usuario.id_usuario)
+    ordem = (Venda.data_criacao, Venda.id_venda)
+    esperado = paginar(query, ordem, None, desc=True).all()
+    assert len(esperado) == 7
+
+    for limit in (1, 2, 3, 7):
+        assert _todas_as_paginas(query, ordem, limit, desc=True) == esperado
+
+
+def test_vendas_nao_aceitam_data_criacao_nula(db):
+    sessao, usuario, cliente = db
+    with pytest.raises(IntegrityError):
+        sessao.execute(
+            insert(Venda).values(
+                titulo="Sem data",
+                valor=Decimal("1.00"),
+                id_cliente=cliente.id_cliente,
+                id_usuario=usuario.id_usuario,
+                data_criacao=None,
+            )
+        )
+
+
+def test_sugestoes_sem_momento_entram_na_paginacao(db):
+    sessao, usuario, cliente = db
+    chamada = Chamada(id_usuario=usuario.id_usuario, id_cliente=cliente.id_cliente)
+    sessao.add(chamada)
+    sessao.flush()
+    for momento in (None, 5, None, 0, 5, None, 12):
+        sessao.add(
+            SugestaoIA(
+                conteudo="Sugestão",
+                momento=momento,
+                id_chamada=chamada.id_chamada,
+                id_usuario=usuario.id_usuario,
+            )
+        )
+    sessao.commit()
+
+    query = sessao.query(SugestaoIA).filter(SugestaoIA.id_usuario == usuario.id_usuario)
+    ordem = (SugestaoIA.id_chamada, SugestaoIA.momento_ordem, SugestaoIA.id_sugestao)
+    for limit in (1, 2, 4):
+        sugestoes = _todas_as_paginas(query, ordem, limit, desc=False)
+        assert len(sugestoes) == 7
+        assert len({s.id_sugestao for s in sugestoes}) == 7
+        assert [s.momento for s in sugestoes][:3] == [None, None, None]
+        assert [s.momento for s in sugestoes][3:] == [0, 5, 5, 12]
+
+
+def test_cursor_com_skip_e_cursor_invalido(db):
+    sessao, usuario, _ = db
+    query = sessao.query(Venda).filter(Venda.id_usuario == usuario.id_usuario)
+    ordem = (Venda.data_criacao, Venda.id_venda)
+    cursor = "W10"  # lista vazia: formato inesperado
+
+    for argumentos in ({"skip": 10}, {}):
+        with pytest.raises(HTTPException) as erro:
+            paginar(query, ordem, cursor, desc=True, **argumentos)
+        assert erro.value.status_code == 400
@@ -0,0 +1,241 @@
+"""
+Testes de regressão de plano de execução para os acessos por usuário.
+
+Rodam EXPLAIN contra o Postgres configurado em DATABASE_URL (banco local de
+desenvolvimento) e falham se uma consulta quente cair em Seq Scan.
+
+    cd backend && python -m pytest tests/test_query_plans.py
+
+Com enable_seqscan=off o planejador só escolhe Seq Scan quando nenhum índice
+atende a consulta, então o resultado não depende do volume de dados semeado.
+"""
+
+import re
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+
+from app.models.chamada import Chamada
+from app.models.cliente import ClienteLead
+from app.models.historico_chat import HistoricoChat
+from app.models.sugestao_ia import SugestaoIA
+from app.models.transcricao_segmento import TranscricaoSegmento
+from app.models.user import User
+from app.models.venda import Venda
+from app.models.venda_resumo import VendaResumoMensal
+from app.utils.busca import filtro_busca
+from app.utils.database import (
+    Base,
+    SessionLocal,
+    create_missing_columns,
+    create_missing_indexes,
+    engine,
+)
+from app.utils.historico_chat import garantir_particoes
+from app.utils.migracoes import converter_colunas_comprimidas
+from app.utils.pagination import paginar
+
+TABELAS_QUENTES = {
+    "usuarios",
+    "clientesleads",
+    "vendas",
+    "vendas_resumo_mensal",
+    "chamadas",
+    "sugestoesia",
+    "historicochat",
+    "transcricao_segmentos",
+}
+
+# Partições (historicochat_2026_01, _padrao, _legado) contam como a tabela
+_PARTICAO = re.compile(r"_(\d{4}_\d{2}|padrao|legado)$")
+
+if engine.dialect.name != "postgresql":
+    pytest.skip("Testes de plano requerem PostgreSQL", allow_module_level=True)
+
+
+@pytest.fixture(scope="module")
+def dados():
+    try:
+        Base.metadata.create_all(bind=engine)
+        create_missing_columns(engine)
+        converter_colunas_comprimidas(engine, 500, 0)
+        create_missing_indexes(engine)
+        garantir_particoes(engine, 0)
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL indisponível: {e}")
+
+    db = SessionLocal()
+    usuario = User(nome="Plano", e_mail=f"plano-{uuid.uuid4()}@x.com", senha_hash="-")
+    db.add(usuario)
+    db.flush()
+
+    cliente = ClienteLead(nome="Cliente Plano", id_usuario=usuario.id_usuario)
+    db.add(cliente)
+    db.flush()
+
+    agora = datetime.utcnow()
+    for i in range(20):
+        venda = Venda(
+            titulo=f"Venda {i}",
+            valor=Decimal("10.00"),
+            status="fechada" if i % 2 else "em_negociacao",
+            id_cliente=cliente.id_cliente,
+            id_usuario=usuario.id_usuario,
+            data_criacao=agora - timedelta(days=i),
+        )
+        chamada = Chamada(
+            id_usuario=usuario.id_usuario,
+            id_cliente=cliente.id_cliente,
+            resultado="sucesso",
+            data_hora=agora - timedelta(hours=i),
+        )
+        db.add_all([venda, chamada])
+        db.flush()
+        db.add(
+            SugestaoIA(
+                conteudo="Sugestão de teste",
+                momento=i,
+                id_chamada=chamada.id_chamada,
+                id_usuario=usuario.id_usuario,
+            )
+        )
+        db.add(HistoricoChat(interacao=f"mensagem {i}", id_usuario=usuario.id_usuario))
+    db.commit()
+
+    for tabela in TABELAS_QUENTES:
+        db.connection().exec_driver_sql(f"ANALYZE {tabela}")
+    db.commit()
+
+    yield db, usuario, cliente, chamada
+
+    db.rollback()
+    db.execute(delete(User).where(User.id_usuario == usuario.id_usuario))
+    db.commit()
+    db.close()
+
+
+def _seq_scans(db, query) -> list[str]:
+    """Tabelas quentes lidas com Seq Scan no plano da consulta"""
+    sql = query.statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    conn = db.connection()
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plano = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+
+    encontrados = []
+    pendentes = [plano[0]["Plan"]]
+    while pendentes:
+        no = pendentes.pop()
+        tabela = _PARTICAO.sub("", no.get("Relation Name", ""))
+        if no.get("Node Type") == "Seq Scan" and tabela in TABELAS_QUENTES:
+            encontrados.append(no["Relation Name"])
+        pendentes.extend(no.get("Plans", []))
+    db.rollback()
+    return encontrados
+
+
+def test_listar_chamadas(dados):
+    db, usuario, cliente, _ = dados
+    query = db.query(Chamada).filter(Chamada.id_usuario == usuario.id_usuario)
+    ordem = (Chamada.data_hora, Chamada.id_chamada)
+    assert _seq_scans(db, paginar(query, ordem, None, desc=True).limit(100)) == []
+
+    por_resultado = query.filter(Chamada.resultado == "sucesso")
+    assert _seq_scans(db, paginar(por_resultado, ordem, None, desc=True)) == []
+
+    por_cliente = query.filter(Chamada.id_cliente == cliente.id_cliente)
+    assert _seq_scans(db, paginar(por_cliente, ordem, None, desc=True)) == []
+
+
+def test_listar_vendas(dados):
+    db, usuario, _, _ = dados
+    query = db.query(Venda).filter(Venda.id_usuario == usuario.id_usuario)
+    ordem = (Venda.data_criacao, Venda.id_venda)
+    assert _seq_scans(db, paginar(query, ordem, None, desc=True).limit(100)) == []
+
+    por_status = query.filter(Venda.status == "fechada")
+    assert _seq_scans(db, paginar(por_status, ordem, None, desc=True)) == []
+
+
+def test_vendas_por_cliente(dados):
+    db, _, cliente, _ = dados
+    query = db.query(Venda).filter(Venda.id_cliente == cliente.id_cliente)
+    assert _seq_scans(db, query) == []
+
+
+def test_listar_clientes(dados):
+    db, usuario, _, _ = dados
+    query = db.query(ClienteLead).filter(ClienteLead.id_usuario == usuario.id_usuario)
+    ordem = (ClienteLead.nome, ClienteLead.id_cliente)
+    assert _seq_scans(db, paginar(query, ordem, None).limit(100)) == []
+
+    por_email = query.filter(ClienteLead.e_mail == "x@x.com")
+    assert _seq_scans(db, por_email) == []
+
+
+def test_listar_sugestoes(dados):
+    db, usuario, _, chamada = dados
+    query = db.query(SugestaoIA).filter(SugestaoIA.id_usuario == usuario.id_usuario)
+    ordem = (SugestaoIA.id_chamada, SugestaoIA.momento_ordem, SugestaoIA.id_sugestao)
+    assert _seq_scans(db, paginar(query, ordem, None).limit(100)) == []
+
+    por_chamada = query.filter(SugestaoIA.id_chamada == chamada.id_chamada)
+    assert _seq_scans(db, paginar(por_chamada, ordem, None).limit(100)) == []
+
+
+def test_listar_mensagens(dados):
+    db, usuario, _, _ = dados
+    query = db.query(HistoricoChat).filter(
+        HistoricoChat.id_usuario == usuario.id_usuario
+    )
+    ordem = (HistoricoChat.data_envio, HistoricoChat.id_mensagem)
+    assert _seq_scans(db, paginar(query, ordem, None, desc=True).limit(100)) == []
+
+
+def test_resumo_do_dashboard(dados):
+    db, usuario, _, _ = dados
+    query = db.query(VendaResumoMensal).filter(
+        VendaResumoMensal.id_usuario == usuario.id_usuario
+    )
+    assert _seq_scans(db, query) == []
+
+
+def test_login_por_email(dados):
+    db, usuario, _, _ = dados
+    query = db.query(User).filter(User.e_mail == usuario.e_mail)
+    assert _seq_scans(db, query) == []
+
+
+def test_buscar_clientes(dados):
+    db, usuario, _, _ = dados
+    for coluna in (ClienteLead.nome_busca, ClienteLead.empresa_busca):
+        query = db.query(ClienteLead).filter(
+            ClienteLead.id_usuario == usuario.id_usuario,
+            filtro_busca(coluna, "joao sil"),
+        )
+        assert _seq_scans(db, query) == []
+
+
+def test_buscar_por_telefone(dados):
+    db, usuario, _, _ = dados
+    query = db.query(ClienteLead).filter(
+        ClienteLead.id_usuario == usuario.id_usuario,
+        ClienteLead.telefone_e164 == "+5511987654321",
+    )
+    assert _seq_scans(db, query) == []
+
+
+def test_montar_transcricao(dados):
+    db, _, _, chamada = dados
+    query = (
+        db.query(TranscricaoSegmento.texto)
+        .filter(TranscricaoSegmento.id_chamada == chamada.id_chamada)
+        .order_by(TranscricaoSegmento.momento, TranscricaoSegmento.id_segmento)
+    )
+    assert _seq_scans(db, query) == []
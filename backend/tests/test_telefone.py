@@ -0,0 +1,65 @@
+"""
+Testes da normalização de telefones para E.164 (sem banco).
+
+    cd backend && python -m pytest tests/test_telefone.py
+"""
+
+import pytest
+
+from app.utils.telefone import normalizar_telefone
+
+
+@pytest.mark.parametrize(
+    "numero, esperado",
+    [
+        # Nacionais: DDD + celular (11 dígitos) ou fixo (10)
+        ("(11) 98765-4321", "+5511987654321"),
+        ("11987654321", "+5511987654321"),
+        ("11 3456-7890", "+551134567890"),
+        # Longa distância: 0 + DDD, ou 0 + operadora + DDD
+        ("011 98765-4321", "+5511987654321"),
+        ("0 21 11 98765-4321", "+5511987654321"),
+        ("0 15 11 3456-7890", "+551134567890"),
+        # Já com o DDI: "+", "00" ou só os dígitos
+        ("+55 (11) 98765-4321", "+5511987654321"),
+        ("0055 11 98765-4321", "+5511987654321"),
+        ("55 11 98765-4321", "+5511987654321"),
+        ("551134567890", "+551134567890"),
+        # Outros países: só com "+" ou "00"
+        ("+1 (415) 555-2671", "+14155552671"),
+        ("00 351 912 345 678", "+351912345678"),
+        ("  +44 20 7946 0958  ", "+442079460958"),
+    ],
+)
+def test_formatos_aceitos(numero, esperado):
+    assert normalizar_telefone(numero) == esperado
+
+
+@pytest.mark.parametrize(
+    "numero",
+    [
+        None,
+        "",
+        "   ",
+        "sem número",
+        "98765-4321",  # sem DDD
+        "1234567",  # curto demais
+        "123456789012",  # 12 dígitos sem o DDI 55
+        "11 98765-4321 ramal 123",  # dígitos a mais
+        "+0 11 98765-4321",  # DDI não começa com 0
+        "+1234567",  # menos de 8 dígitos
+        "+1234567890123456",  # mais de 15 dígitos
+    ],
+)
+def test_numeros_invalidos(numero):
+    assert normalizar_telefone(numero) is None
+
+
+def test_ddi_padrao():
+    assert normalizar_telefone("(11) 98765-4321", ddi_padrao="351") == (
+        "+35111987654321"
+    )
+    # Com DDI explícito, o padrão não é usado
+    assert normalizar_telefone("+55 11 98765-4321", ddi_padrao="351") == (
+        "+5511987654321"
+    )
@@ -0,0 +1,175 @@
+"""
+Testes do buffer de trechos da transcrição ao vivo (em memória) e da
+gravação dos trechos concorrendo com o finalizar (contra o Postgres de
+DATABASE_URL).
+
+    cd backend && python -m pytest tests/test_transcricao.py
+"""
+
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.exc import OperationalError
+
+from app.models.chamada import Chamada
+from app.models.cliente import ClienteLead
+from app.models.transcricao_segmento import TranscricaoSegmento
+from app.models.user import User
+from app.routers import chamada as rotas_chamada
+from app.schemas.chamada import TranscricaoSegmentoCreate
+from app.utils.database import SessionLocal, engine
+from app.utils.migracoes import migrar
+from app.utils.transcricao import (
+    BufferTranscricoes,
+    buffer_transcricoes,
+    gravar_pendentes,
+    montar_transcricao,
+    novos_segmentos,
+)
+
+
+def _trecho(texto: str) -> dict:
+    return {"texto": texto}
+
+
+def test_dois_websockets_da_mesma_chamada():
+    buffer = BufferTranscricoes(lote=10, intervalo=60)
+    id_chamada = uuid.uuid4()
+    buffer.registrar(id_chamada)
+    buffer.registrar(id_chamada)  # reconexão antes de a primeira fechar
+
+    buffer.adicionar(id_chamada, [_trecho("a")])
+    # Finalizar não esquece a chamada: o outro WebSocket continua enviando
+    assert buffer.retirar(id_chamada) == [_trecho("a")]
+    buffer.adicionar(id_chamada, [_trecho("b")])
+
+    assert buffer.liberar(id_chamada) == [_trecho("b")]
+    buffer.adicionar(id_chamada, [_trecho("c")])  # a segunda segue aberta
+    assert buffer.liberar(id_chamada) == [_trecho("c")]
+
+    # A última conexão fechada esquece a chamada
+    assert buffer.vencidas(todos=True) == []
+    assert buffer.liberar(id_chamada) == []
+    buffer.registrar(id_chamada)
+    assert buffer.adicionar(id_chamada, [_trecho("d")] * 10)
+
+
+@pytest.fixture
+def chamada(monkeypatch):
+    if engine.dialect.name != "postgresql":
+        pytest.skip("Requer PostgreSQL (bloqueio de linhas)")
+    try:
+        migrar(engine)
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL indisponível: {e}")
+    monkeypatch.setattr(rotas_chamada, "_publicar_chamada", lambda *a: None)
+    db = SessionLocal()
+    usuario = User(nome="Finalizar", e_mail=f"fin-{uuid.uuid4()}@x.com", senha_hash="-")
+    db.add(usuario)
+    db.flush()
+    cliente = ClienteLead(nome="Cliente Finalizar", id_usuario=usuario.id_usuario)
+    db.add(cliente)
+    db.flush()
+    nova = Chamada(id_usuario=usuario.id_usuario, id_cliente=cliente.id_cliente)
+    db.add(nova)
+    db.commit()
+    ids = (nova.id_chamada, usuario.id_usuario)
+    buffer_transcricoes.registrar(nova.id_chamada)
+    yield ids
+    buffer_transcricoes.liberar(ids[0])
+    db.execute(delete(User).where(User.id_usuario == ids[1]))
+    db.commit()
+    db.close()
+
+
+def _adicionar(id_chamada, *textos: str) -> None:
+    trechos = [TranscricaoSegmentoCreate(texto=t) for t in textos]
+    buffer_transcricoes.adicionar(id_chamada, novos_segmentos(id_chamada, trechos))
+
+
+def _finalizar(id_chamada, id_usuario, resultado: dict) -> None:
+    with SessionLocal() as db:
+        chamada = rotas_chamada._finalizar_transcricao(db, id_chamada, id_usuario)
+        resultado["transcricao"] = chamada.transcricao
+
+
+def _gravados(id_chamada) -> list[str]:
+    with SessionLocal() as db:
+        return db.scalars(
+            select(TranscricaoSegmento.texto).where(
+                TranscricaoSegmento.id_chamada == id_chamada
+            )
+        ).all()
+
+
+def test_finalizar_espera_a_gravacao_em_andamento(chamada):
+    id_chamada, id_usuario = chamada
+    _adicionar(id_chamada, "a", "b")
+
+    retirados, continuar = threading.Event(), threading.Event()
+
+    def retirar_e_esperar(id_chamada):
+        # Trechos fora da memória e ainda não gravados
+        segmentos = buffer_transcricoes.retirar(id_chamada)
+        retirados.set()
+        continuar.wait(5)
+        return segmentos
+
+    def descarregar():
+        with SessionLocal() as db:
+            gravar_pendentes(db, [id_chamada], retirar_e_esperar)
+
+    gravacao = threading.Thread(target=descarregar)
+    gravacao.start()
+    assert retirados.wait(5)
+
+    resultado = {}
+    finalizar = threading.Thread(
+        target=_finalizar, args=(id_chamada, id_usuario, resultado)
+    )
+    finalizar.start()
+    finalizar.join(0.5)
+    assert finalizar.is_alive()  # esperando a gravação
+
+    continuar.set()
+    gravacao.join(5)
+    finalizar.join(5)
+    assert resultado["transcricao"] == "a\nb"
+    assert _gravados(id_chamada) == []
+
+
+def test_gravacao_espera_o_finalizar_em_andamento(chamada):
+    id_chamada, id_usuario = chamada
+    _adicionar(id_chamada, "a", "b")
+
+    # Finalizar com a chamada bloqueada e os trechos já juntados, sem commit
+    db = SessionLocal()
+    bloqueada = (
+        db.query(Chamada)
+        .filter(Chamada.id_chamada == id_chamada)
+        .with_for_update()
+        .one()
+    )
+    montar_transcricao(db, bloqueada)
+    _adicionar(id_chamada, "c")  # chegou depois de juntar
+
+    def descarregar():
+        with SessionLocal() as sessao:
+            gravar_pendentes(sessao, [id_chamada])
+
+    gravacao = threading.Thread(target=descarregar)
+    gravacao.start()
+    gravacao.join(0.5)
+    assert gravacao.is_alive()  # esperando o finalizar
+
+    db.commit()
+    db.close()
+    gravacao.join(5)
+    assert _gravados(id_chamada) == ["c"]  # fica para o próximo finalizar
+
+    resultado = {}
+    _finalizar(id_chamada, id_usuario, resultado)
+    assert resultado["transcricao"] == "a\nb\nc"
+    assert _gravados(id_chamada) == []